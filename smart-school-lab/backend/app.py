@@ -1,38 +1,235 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
 from flask import Flask, request
 from flask_cors import CORS
 
-# ✅ Import Blueprints
-from controllers.device_controller import device_bp
-from controllers.user_controller import user_bp
-from controllers.log_controller import log_bp
-from controllers.auth_controller import auth_bp  # ✅ Add authentication blueprint
-
-app = Flask(__name__)
-
-# ✅ Apply CORS globally
-CORS(app, resources={r"/*": {
-    "origins": "*", 
-    "methods": ["GET", "POST", "OPTIONS", "PUT", "DELETE"], 
-    "allow_headers": ["Content-Type", "Authorization"]
-}})
-
-# ✅ Register Blueprints
-app.register_blueprint(device_bp, url_prefix="/devices")
-app.register_blueprint(user_bp, url_prefix="/users")
-app.register_blueprint(log_bp, url_prefix="/logs")
-app.register_blueprint(auth_bp, url_prefix="/auth")  # ✅ Register authentication routes
-
-# ✅ Handle OPTIONS requests globally
-@app.before_request
-def handle_options_request():
-    """ Handles preflight OPTIONS requests globally for CORS compliance """
-    if request.method == "OPTIONS":
-        response = app.make_response("")
-        response.headers.add("Access-Control-Allow-Origin", "*")
-        response.headers.add("Access-Control-Allow-Methods", "GET, POST, OPTIONS, PUT, DELETE")
-        response.headers.add("Access-Control-Allow-Headers", "Content-Type, Authorization")
-        return response, 200
+# ---------------------------------------------
+# 🔹 Configuration
+# ---------------------------------------------
+# AUTH_REQUIRED → reject anonymous device/log calls
+# DATA_DIR      → where every store keeps its files (default: data/)
+# STORAGE       → "disk" (DATA_DIR) or "memory" (a throwaway directory on tmpfs, e.g. for tests)
+# PREWARM       → open stores & build indexes in a background thread once the server socket is bound
+MEMORY_ROOT = "/dev/shm"  # ✅ RAM-backed on Linux; the system temp dir elsewhere
+
+
+def default_config():
+    """ ✅ Settings read from the environment (create_app's ``config`` overrides them) """
+    return {
+        "AUTH_REQUIRED": os.environ.get("AUTH_REQUIRED", "0") == "1",
+        "DATA_DIR": os.environ.get("DATA_DIR") or None,
+        "STORAGE": os.environ.get("STORAGE", "disk"),
+        "PREWARM": os.environ.get("PREWARM", "1") == "1",
+    }
+
+
+def _memory_data_dir():
+    """ ✅ Fresh data directory in RAM, removed at exit """
+    root = MEMORY_ROOT if os.path.isdir(MEMORY_ROOT) and os.access(MEMORY_ROOT, os.W_OK) else None
+    path = tempfile.mkdtemp(prefix="smart-school-", dir=root)
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def use_data_dir(data_dir):
+    """ ✅ Points every store at ``data_dir``; each reopens there lazily on first use.
+
+    The stores are process-wide singletons, so this affects every app in the
+    process. Derived indexes (dedup, usage, analytics) follow the log store.
+    """
+    from models import log_model
+    from models.access_model import set_access_queue
+    from models.device_model import set_device_registry
+    from models.log_model import set_log_store
+    from models.schedule_model import set_scheduler
+    from models.user_model import set_user_repository
+
+    log_model.DATA_DIR = os.path.abspath(data_dir)
+    for reset in (set_log_store, set_device_registry, set_user_repository):
+        reset(None)
+    for reset in (set_scheduler, set_access_queue):
+        previous = reset(None)
+        if previous is not None:
+            previous.stop()  # ✅ Its thread would keep firing schedules / expiries against the new stores
+    telemetry = sys.modules.get("models.telemetry_model")  # ✅ Not imported yet → nothing to reset (keeps NumPy unloaded)
+    if telemetry is not None:
+        pipeline = telemetry.set_telemetry_pipeline(None)
+        if pipeline is not None:
+            pipeline.stop()  # ✅ Buffered readings land in the old directory's store
+
+
+# ---------------------------------------------
+# 🔹 Application Factory
+# ---------------------------------------------
+def create_app(config=None):
+    """ ✅ Builds the Flask app without opening any store.
+
+    Registering blueprints is all that happens here: the log store, device
+    registry, user database, scheduler and NumPy-backed analytics / telemetry
+    load on first use (or in the background, see ``start_prewarm``).
+    """
+    from controllers.auth_controller import auth_bp, authenticate_request
+    from controllers.device_controller import device_bp
+    from controllers.log_controller import log_bp
+    from controllers.metrics_controller import instrument_app, metrics_bp
+    from controllers.telemetry_controller import telemetry_bp
+    from controllers.user_controller import user_bp
+    from utils.json_codec import FastJSONProvider
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)  # ✅ jsonify & cached bodies via orjson when installed (JSON_ENCODER=json|orjson)
+    app.config.update(default_config())
+    app.config.update(config or {})
+    if app.config["STORAGE"] == "memory":
+        use_data_dir(_memory_data_dir())
+    elif app.config["DATA_DIR"]:
+        use_data_dir(app.config["DATA_DIR"])
+    instrument_app(app)  # ✅ First hooks registered: every request is timed (incl. CORS preflight & auth failures)
+
+    # ✅ Apply CORS globally
+    CORS(app, resources={r"/*": {
+        "origins": "*",
+        "methods": ["GET", "POST", "OPTIONS", "PUT", "DELETE"],
+        "allow_headers": ["Content-Type", "Authorization"]
+    }})
+
+    # ✅ Register Blueprints
+    app.register_blueprint(device_bp, url_prefix="/devices")
+    app.register_blueprint(user_bp, url_prefix="/users")
+    app.register_blueprint(log_bp, url_prefix="/logs")
+    app.register_blueprint(auth_bp, url_prefix="/auth")  # ✅ Register authentication routes
+    app.register_blueprint(metrics_bp, url_prefix="/metrics")  # ✅ Prometheus scrape endpoint
+    app.register_blueprint(telemetry_bp, url_prefix="/telemetry")  # ✅ Batched device readings
+
+    # ✅ Handle OPTIONS requests globally
+    @app.before_request
+    def handle_options_request():
+        """ Handles preflight OPTIONS requests globally for CORS compliance """
+        if request.method == "OPTIONS":
+            response = app.make_response("")
+            response.headers.add("Access-Control-Allow-Origin", "*")
+            response.headers.add("Access-Control-Allow-Methods", "GET, POST, OPTIONS, PUT, DELETE")
+            response.headers.add("Access-Control-Allow-Headers", "Content-Type, Authorization")
+            return response, 200
+
+    # ✅ Verify bearer tokens (cached) & enforce role permissions on device/log routes
+    app.before_request(authenticate_request)
+
+    return app
+
+
+# ---------------------------------------------
+# 🔹 Background Pre-warm (after the socket is bound)
+# ---------------------------------------------
+def _prewarm_steps():
+    """ ✅ (name, loader) pairs in dependency order: stores first, then the indexes built from them """
+    from controllers.device_controller import get_event_broadcaster
+    from controllers.log_controller import get_dedup_index
+    from models.analytics_model import get_hourly_rollup
+    from models.device_model import get_device_registry
+    from models.log_model import get_log_store
+    from models.retention_model import get_retention_manager
+    from models.schedule_model import get_scheduler
+    from models.usage_model import get_usage_tracker
+    from models.user_model import get_user_repository
+
+    return [("log_store", get_log_store), ("device_registry", get_device_registry),
+            ("user_repository", get_user_repository), ("dedup_index", get_dedup_index),
+            ("usage_tracker", get_usage_tracker), ("hourly_rollup", get_hourly_rollup),
+            ("scheduler", get_scheduler), ("event_broadcaster", get_event_broadcaster),
+            ("retention_manager", get_retention_manager)]
+
+
+def start_prewarm(app):
+    """ ✅ Loads stores & indexes on a daemon thread so the first requests don't pay for them.
+
+    Seconds per step land in ``app.extensions["prewarm"]["seconds"]``; its
+    ``done`` event is set when all steps have run. A failing step is reported
+    and skipped (the request that needs it retries the load).
+    """
+    state = app.extensions.setdefault("prewarm", {"done": threading.Event(), "seconds": {}, "errors": {}})
+
+    def warm():
+        for name, load in _prewarm_steps():
+            started = time.perf_counter()
+            try:
+                load()
+            except Exception as e:
+                state["errors"][name] = str(e)
+                print(f"⚠️ Pre-warm of {name} failed: {e}")
+                continue
+            state["seconds"][name] = round(time.perf_counter() - started, 4)
+        state["done"].set()
+
+    thread = threading.Thread(target=warm, name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def start_background_services(app):
+    """ ✅ Once per serving process: starts the scheduler, live event fan-out & the hourly log retention sweep.
+
+    Called by the server entry points after the socket is bound, never from a
+    request hook, so a request only loads the stores it uses. With PREWARM the
+    pre-warm thread starts them along with every other store & index.
+    """
+    if app.config["PREWARM"]:
+        return start_prewarm(app)
+    from controllers.device_controller import get_event_broadcaster
+    from models.retention_model import get_retention_manager
+    from models.schedule_model import get_scheduler
+
+    get_scheduler()
+    get_event_broadcaster()
+    get_retention_manager()
+    return None
+
+
+def serve(app, host="127.0.0.1", port=5000, debug=False):
+    """ ✅ Single-process server: binds the socket, then pre-warms while already accepting connections """
+    from werkzeug.serving import make_server
+
+    if debug:
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            start_background_services(app)  # ✅ Reloader child: the parent has already bound the socket
+        app.run(host=host, port=port, debug=True)
+        return
+    server = make_server(host, port, app, threaded=True)
+    start_background_services(app)
+    print(f"✅ Serving on http://{host}:{port}")
+    server.serve_forever()
+
+
+# ---------------------------------------------
+# 🔹 Module-level app (``from app import app``, e.g. gunicorn app:app), built on first access
+# ---------------------------------------------
+_app_lock = threading.Lock()
+
+
+def __getattr__(name):
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _app_lock:
+        if "app" not in globals():
+            globals()["app"] = create_app()
+            start_background_services(globals()["app"])  # ✅ Loaded by the WSGI server in each worker
+    return globals()["app"]
+
 
 # ✅ Start Flask application
 if __name__ == '__main__':
-    app.run(debug=True)
+    from utils.interprocess import serve_prefork
+
+    app = create_app()
+    host, port = os.environ.get("HOST", "127.0.0.1"), int(os.environ.get("PORT", "5000"))
+    workers = int(os.environ.get("WORKERS", "1"))
+    if workers > 1:
+        # ✅ Pre-fork mode: state lives in data/state.db & users.db (SQLite WAL), shared by every worker
+        serve_prefork(app, host=host, port=port, workers=workers, on_worker_start=start_background_services)
+    else:
+        serve(app, host=host, port=port, debug=os.environ.get("DEBUG", "1") == "1")
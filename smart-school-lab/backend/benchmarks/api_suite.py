@@ -0,0 +1,282 @@
+### `benchmarks/api_suite.py`
+"""
+🔹 Reproducible API benchmark suite
+
+For each synthetic history size it writes a legacy data/logs.json of that
+many entries into a fresh temp data directory, starts the backend on it (the
+log store migrates & indexes the file, which is timed) and then drives a
+realistic request mix through the Flask test client and/or a real threaded
+WSGI server:
+
+    toggles · schedule sets · access requests · log reads · logins
+
+It also times the ``load_logs`` / ``save_log`` helpers directly. Everything is
+seeded, and the result is one JSON document (stdout or --output) meant to be
+diffed release over release.
+
+Run from smart-school-lab/backend:
+    python -m benchmarks.api_suite --sizes 1000,10000,100000 --requests 2000
+    python -m benchmarks.api_suite --sizes 1000000 --modes server --output bench.json
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+import models.log_model as log_model
+from models.access_model import AccessQueue, set_access_queue
+from models.device_model import DeviceRegistry, set_device_registry
+from models.log_model import LogStore, set_log_store
+from models.schedule_model import Scheduler, set_scheduler
+from models.toggle_model import ToggleGuard, set_toggle_guard
+from models.user_model import UserRepository, set_user_repository
+from utils.password_pool import PasswordHashPool, get_password_pool, set_password_pool
+
+# ✅ Request mix: (operation, weight)
+MIX = [("toggle", 30), ("log_read", 35), ("access_request", 15), ("schedule_set", 10), ("login", 10)]
+DEVICES = 12
+USERS = 50
+BENCH_HASH_METHOD = "pbkdf2:sha256:1000"  # ✅ Cheap by default so the mix measures the app, not the KDF
+
+
+def _percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {"requests": 0}
+    return {
+        "requests": len(samples),
+        "p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# ---------------------------------------------
+# 🔹 Synthetic data
+# ---------------------------------------------
+def write_synthetic_logs(path, size, seed=0):
+    """ ✅ Streams ``size`` legacy log entries (time-ordered) into a logs.json array """
+    rng = random.Random(seed)
+    moment = datetime(2025, 1, 6, 7, 0, 0)
+    actions = ["on", "off", "request", "schedule_set"]
+    with open(path, "w") as file:
+        file.write("[")
+        for n in range(size):
+            moment += timedelta(seconds=rng.randint(1, 90))
+            entry = {"action": rng.choice(actions), "device": f"Device {rng.randrange(DEVICES) + 1}",
+                     "username": f"user{rng.randrange(USERS)}", "timestamp": moment.strftime(log_model.TIMESTAMP_FORMAT)}
+            file.write(("," if n else "") + json.dumps(entry))
+        file.write("]")
+
+
+def _setup(data_dir, size, seed):
+    """ ✅ Builds a fresh backend over ``data_dir``; returns (app, store, users, startup seconds) """
+    write_synthetic_logs(os.path.join(data_dir, "logs.json"), size, seed)
+    started = time.perf_counter()
+    store = LogStore(data_dir=data_dir, fsync=False)  # ✅ Migrates & indexes logs.json
+    startup = time.perf_counter() - started
+
+    registry = DeviceRegistry(path=os.path.join(data_dir, "devices.json"))
+    for n in range(DEVICES - len(registry)):
+        registry.add({"name": f"Device {len(registry) + 1}"})
+    users = UserRepository(path=os.path.join(data_dir, "users.db"), seed=False)
+    password_hash = generate_password_hash("pass123", BENCH_HASH_METHOD)
+    for n in range(USERS):
+        users.add(f"user{n}", f"user{n}@lab", password_hash, "teacher" if n % 10 == 0 else "student")
+
+    set_log_store(store)
+    set_device_registry(registry)
+    set_user_repository(users)
+    set_scheduler(Scheduler(path=os.path.join(data_dir, "schedules.json")))  # ✅ Not started: sets only
+    set_access_queue(AccessQueue(path=os.path.join(data_dir, "access_requests.json")))  # ✅ Not started: no expiry
+    set_toggle_guard(ToggleGuard(debounce=0, user_rate=0, ip_rate=0))  # ✅ One client drives every user: no rate limits, no coalescing
+    pool = PasswordHashPool(method=BENCH_HASH_METHOD)
+    set_password_pool(pool)
+    pool.check_password(password_hash, "pass123")  # ✅ Spawn the hash workers outside the measured window
+
+    from app import app
+    return app, store, users, startup
+
+
+# ---------------------------------------------
+# 🔹 Request mix
+# ---------------------------------------------
+def _plan(rng, requests):
+    operations, weights = zip(*MIX)
+    plan = []
+    for op in rng.choices(operations, weights=weights, k=requests):
+        device_id = rng.randrange(DEVICES) + 1
+        user = rng.randrange(USERS)
+        if op == "toggle":
+            plan.append((op, "POST", f"/devices/{device_id}/toggle", {"username": f"user{user}"}))
+        elif op == "log_read":
+            plan.append((op, "GET", f"/logs/?limit=100&order=desc&device=Device%20{device_id}", None))
+        elif op == "access_request":
+            plan.append((op, "POST", f"/devices/{device_id}/request-access", {"username": f"user{user}"}))
+        elif op == "schedule_set":
+            plan.append((op, "POST", f"/devices/{device_id}/schedule",
+                         {"username": f"user{user}", "on_time": f"{rng.randrange(7, 12):02d}:00",
+                          "off_time": f"{rng.randrange(13, 18):02d}:30"}))
+        else:
+            plan.append((op, "POST", "/users/login", {"email": f"user{user}@lab", "password": "pass123"}))
+    return plan
+
+
+def _client_worker(app, plan, samples, errors):
+    client = app.test_client()
+    for op, method, path, body in plan:
+        started = time.perf_counter()
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        samples.append((op, time.perf_counter() - started))
+        if response.status_code >= 400:
+            errors.append((op, response.status_code))
+
+
+def _server_worker(port, plan, samples, errors):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    for op, method, path, body in plan:
+        started = time.perf_counter()
+        connection.request(method, path, body=json.dumps(body) if body is not None else None,
+                           headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        samples.append((op, time.perf_counter() - started))
+        if response.status >= 400:
+            errors.append((op, response.status))
+    connection.close()
+
+
+def _drive(app, mode, requests, threads, seed):
+    rng = random.Random(seed)
+    plans = [_plan(rng, requests // threads) for _ in range(threads)]
+    samples, errors = [], []
+
+    http_server = None
+    if mode == "server":
+        from werkzeug.serving import make_server
+        http_server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=http_server.serve_forever, daemon=True).start()
+        workers = [threading.Thread(target=_server_worker, args=(http_server.server_port, plan, samples, errors))
+                   for plan in plans]
+    else:
+        workers = [threading.Thread(target=_client_worker, args=(app, plan, samples, errors)) for plan in plans]
+
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    if http_server:
+        http_server.shutdown()
+
+    by_op = {}
+    for op, seconds in samples:
+        by_op.setdefault(op, []).append(seconds)
+    return {
+        "mode": "wsgi-server" if mode == "server" else "test-client",
+        "threads": threads,
+        "requests": len(samples),
+        "errors": len(errors),
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "overall": _summary([seconds for _, seconds in samples]),
+        "operations": {op: _summary(values) for op, values in sorted(by_op.items())},
+    }
+
+
+def _time_helpers(iterations):
+    """ ✅ Direct timings of the controller helpers the routes are built on """
+    from controllers.device_controller import load_logs, save_log
+    load_samples, save_samples = [], []
+    for n in range(iterations):
+        started = time.perf_counter()
+        load_logs()
+        load_samples.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        save_log({"action": "on", "device": "Device 1", "username": "bench",
+                  "timestamp": datetime.now().strftime(log_model.TIMESTAMP_FORMAT)})
+        save_samples.append(time.perf_counter() - started)
+    return {"load_logs": _summary(load_samples), "save_log": _summary(save_samples)}
+
+
+# ---------------------------------------------
+# 🔹 Suite
+# ---------------------------------------------
+def run(sizes=(1000, 10000, 100000), modes=("client", "server"), requests=2000, threads=8,
+        helper_iterations=20, seed=42):
+    """ ✅ Runs every size × mode and returns one JSON-serializable document """
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    result = {
+        "benchmark": "api_suite",
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mix": dict(MIX),
+        "runs": [],
+    }
+    for size in sizes:
+        data_dir = tempfile.mkdtemp(prefix=f"api-suite-{size}-")
+        try:
+            app, store, users, startup = _setup(data_dir, size, seed)
+            run_result = {"log_entries": size, "startup_seconds": round(startup, 4),
+                          "log_store_bytes": store.size_bytes(), "modes": []}
+            for mode in modes:
+                run_result["modes"].append(_drive(app, mode, requests, threads, seed))
+            run_result["helpers"] = _time_helpers(helper_iterations)
+            result["runs"].append(run_result)
+            get_password_pool().shutdown()
+            store.close()
+            users.close()
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backend API benchmark suite (JSON output)")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated synthetic logs.json sizes, e.g. 1000,10000,100000,1000000")
+    parser.add_argument("--modes", default="client,server", help="client (test client) and/or server (WSGI)")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per size & mode")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON document to this file instead of stdout")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):  # ✅ Keep route debug prints out of the JSON
+        document = run(sizes=[int(size) for size in args.sizes.split(",")], modes=args.modes.split(","),
+                       requests=args.requests, threads=args.threads, seed=args.seed)
+    text = json.dumps(document, indent=4)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,91 @@
+### `benchmarks/auth_overhead.py`
+"""
+🔹 Per-request auth overhead microbenchmark
+
+Measures GET /devices/status through the Flask test client three ways:
+anonymous (no auth work), bearer token with the verified-token cache and
+bearer token with caching disabled (full HS256 verification every request).
+Also times the bare verify call in isolation.
+
+Run from smart-school-lab/backend:
+    python -m benchmarks.auth_overhead --requests 5000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+from controllers.auth_controller import issue_tokens, set_token_cache, verify_access_token
+from models.device_model import DeviceRegistry, set_device_registry
+from models.log_model import LogStore, set_log_store
+from utils.token_cache import VerifiedTokenCache
+
+
+def _percentiles(samples):
+    samples.sort()
+    return {
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 2),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6, 2),
+        "mean_us": round(sum(samples) / len(samples) * 1e6, 2),
+    }
+
+
+def _time_requests(client, requests, headers):
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get("/devices/status", headers=headers)
+        samples.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f"Unexpected status {response.status_code}")
+    return _percentiles(samples)
+
+
+def _time_verify(token, calls):
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        verify_access_token(token)
+        samples.append(time.perf_counter() - started)
+    return _percentiles(samples)
+
+
+def run(requests=5000):
+    """ ✅ Runs every variant and returns a JSON-serializable result dict """
+    data_dir = tempfile.mkdtemp(prefix="auth-overhead-")
+    store = LogStore(data_dir=data_dir, fsync=False)
+    set_log_store(store)
+    set_device_registry(DeviceRegistry(path=f"{data_dir}/devices.json", snapshot_delay=0))
+
+    from app import app
+    client = app.test_client()
+    token, _ = issue_tokens("bench", "teacher")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    result = {"benchmark": "auth_overhead", "requests": requests}
+    result["anonymous"] = _time_requests(client, requests, {})
+
+    set_token_cache(VerifiedTokenCache(max_entries=0))
+    result["bearer_uncached"] = _time_requests(client, requests, headers)
+    result["verify_uncached"] = _time_verify(token, requests)
+
+    cache = VerifiedTokenCache()
+    set_token_cache(cache)
+    result["bearer_cached"] = _time_requests(client, requests, headers)
+    result["verify_cached"] = _time_verify(token, requests)
+    result["cache_hit_ratio"] = round(cache.hit_ratio(), 4)
+
+    result["auth_overhead_us"] = {
+        "uncached": round(result["bearer_uncached"]["mean_us"] - result["anonymous"]["mean_us"], 2),
+        "cached": round(result["bearer_cached"]["mean_us"] - result["anonymous"]["mean_us"], 2),
+    }
+    store.close()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request JWT auth overhead with & without the token cache")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(run(requests=args.requests), indent=4))
@@ -0,0 +1,111 @@
+### `benchmarks/log_records.py`
+"""
+🔹 Log record memory & serialization benchmark (plain dicts vs LogRecord)
+
+Builds N synthetic log lines (NDJSON, as stored in data/logs/) and loads them
+twice: as the plain dicts the log store used to keep, and as compact
+LogRecords (slots, interned names, epoch timestamps). For each it reports
+load time, resident bytes per record (tracemalloc) and the time to encode the
+whole history as one JSON array:
+
+    before → json.loads into dicts; Flask's default provider (sorted keys, ASCII)
+    after  → the log store's decoder into LogRecords; utils.json_codec encoders
+             (stdlib json, orjson when installed)
+
+Run from smart-school-lab/backend:
+    python -m benchmarks.log_records --records 1000000
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from models.log_record import TIMESTAMP_FORMAT, LogRecord
+from utils.json_codec import ENCODERS, get_json_encoder, orjson
+
+DEVICES = 40
+USERS = 600
+ACTIONS = ["on", "off", "request", "schedule_set", "request_approved"]
+START_EPOCH = 1_735_689_600  # ✅ 2025-01-01 UTC
+
+
+def synthetic_lines(count, seed=42):
+    """ ✅ Seeded NDJSON lines shaped like real toggles / requests, ~7 s apart """
+    rng = random.Random(seed)
+    lines = []
+    for seq in range(count):
+        entry = {"seq": seq, "action": rng.choice(ACTIONS), "device": f"Device {rng.randrange(DEVICES) + 1}",
+                 "username": f"user{rng.randrange(USERS)}",
+                 "timestamp": datetime.fromtimestamp(START_EPOCH + seq * 7).strftime(TIMESTAMP_FORMAT)}
+        if entry["action"] == "schedule_set":
+            entry["schedule"] = {"start_time": "08:00", "end_time": "16:00", "id": seq}
+        lines.append(json.dumps(entry, separators=(",", ":")))
+    return lines
+
+
+def _timed(function, *args):
+    gc.collect()
+    started = time.perf_counter()
+    result = function(*args)
+    return result, round(time.perf_counter() - started, 3)
+
+
+def _measure_load(lines, loads, build):
+    """ ✅ (records, seconds, bytes per record); memory measured in a separate tracemalloc pass """
+    records, seconds = _timed(lambda: [build(loads(line)) for line in lines])
+    del records
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    records = [build(loads(line)) for line in lines]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return records, seconds, round(used / len(lines), 1)
+
+
+def run(count=1_000_000, seed=42):
+    lines = synthetic_lines(count, seed)
+    flask_json = DefaultJSONProvider(Flask(__name__))
+
+    dicts, dict_seconds, dict_bytes = _measure_load(lines, json.loads, lambda entry: entry)
+    body, before_seconds = _timed(lambda: flask_json.dumps(dicts).encode("utf-8"))
+    before = {"representation": "dict", "load_seconds": dict_seconds, "bytes_per_record": dict_bytes,
+              "serialize": {"flask_default": {"seconds": before_seconds, "bytes": len(body)}}}
+    del dicts, body
+
+    records, record_seconds, record_bytes = _measure_load(lines, get_json_encoder().loads, LogRecord.from_entry)
+    serialize = {}
+    for name, encoder in ENCODERS.items():
+        if name == "orjson" and orjson is None:
+            continue
+        body, seconds = _timed(encoder().dumps, records)
+        serialize[name] = {"seconds": seconds, "bytes": len(body)}
+    after = {"representation": "LogRecord", "load_seconds": record_seconds, "bytes_per_record": record_bytes,
+             "serialize": serialize}
+    fastest = min(result["seconds"] for result in serialize.values())
+
+    return {
+        "benchmark": "log_records",
+        "python": platform.python_version(),
+        "records": count,
+        "before": before,
+        "after": after,
+        "memory_ratio": round(dict_bytes / record_bytes, 2),
+        "serialize_speedup": round(before_seconds / fastest, 2) if fastest else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log record memory & serialize speed, dicts vs LogRecord (JSON output)")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    print(json.dumps(run(count=args.records, seed=args.seed), indent=4))
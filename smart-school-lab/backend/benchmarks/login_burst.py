@@ -0,0 +1,139 @@
+### `benchmarks/login_burst.py`
+"""
+🔹 Login burst load test
+
+Starts a real threaded WSGI server, then measures the latency of an unrelated
+route (GET /devices/status) twice: idle, and while many clients log in at
+once (start of a class). With hashing on the worker pool the probe's p99
+should stay roughly flat; ``--inline`` hashes on the request threads for
+comparison. Saturated logins (503 + Retry-After) are counted, not retried.
+
+Run from smart-school-lab/backend:
+    python -m benchmarks.login_burst --students 30 --logins 5
+    python -m benchmarks.login_burst --inline
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import logging
+import tempfile
+import threading
+import time
+
+from werkzeug.security import generate_password_hash
+
+from models.device_model import DeviceRegistry, set_device_registry
+from models.log_model import LogStore, set_log_store
+from models.user_model import UserRepository, set_user_repository
+from utils.password_pool import PASSWORD_HASH_METHOD, PasswordHashPool, set_password_pool
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {"requests": 0}
+    return {
+        "requests": len(samples),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+    }
+
+
+def _probe(port, stop, samples):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    while not stop.is_set():
+        started = time.perf_counter()
+        connection.request("GET", "/devices/status")
+        connection.getresponse().read()
+        samples.append(time.perf_counter() - started)
+        time.sleep(0.005)
+    connection.close()
+
+
+def _login_worker(port, email, logins, statuses):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    body = json.dumps({"email": email, "password": "pass123"})
+    for _ in range(logins):
+        connection.request("POST", "/users/login", body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        statuses.append(response.status)
+    connection.close()
+
+
+def run(students=30, logins=5, idle_seconds=1.0, inline=False, method=PASSWORD_HASH_METHOD):
+    """ ✅ Runs the idle & burst phases and returns a JSON-serializable result dict """
+    data_dir = tempfile.mkdtemp(prefix="login-burst-")
+    store = LogStore(data_dir=data_dir, fsync=False)
+    set_log_store(store)
+    set_device_registry(DeviceRegistry(path=f"{data_dir}/devices.json", snapshot_delay=0))
+    pool = PasswordHashPool(workers=0, method=method) if inline else PasswordHashPool(method=method)
+    set_password_pool(pool)
+
+    users = UserRepository(path=f"{data_dir}/users.db", seed=False)
+    set_user_repository(users)
+    from app import app
+    password_hash = generate_password_hash("pass123", method)
+    for n in range(students):
+        users.add(f"student{n}", f"student{n}@lab", password_hash, "student")
+
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    http_server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    port = http_server.server_port
+
+    # ✅ Warm-up: start the worker processes outside the measured window
+    pool.check_password(password_hash, "pass123")
+
+    idle, stop = [], threading.Event()
+    prober = threading.Thread(target=_probe, args=(port, stop, idle))
+    prober.start()
+    time.sleep(idle_seconds)
+    stop.set()
+    prober.join()
+
+    burst, statuses, stop = [], [], threading.Event()
+    prober = threading.Thread(target=_probe, args=(port, stop, burst))
+    workers = [threading.Thread(target=_login_worker, args=(port, f"student{n}@lab", logins, statuses))
+               for n in range(students)]
+    prober.start()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    http_server.shutdown()
+    pool.shutdown()
+    users.close()
+    store.close()
+
+    return {
+        "benchmark": "login_burst",
+        "mode": "inline" if inline else f"process-pool x{pool.workers}",
+        "hash_method": method,
+        "logins": len(statuses),
+        "login_seconds": round(elapsed, 3),
+        "login_ok": statuses.count(200),
+        "login_503": statuses.count(503),
+        "probe_idle": _summary(idle),
+        "probe_during_burst": _summary(burst),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Unrelated-route latency during a login burst")
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--logins", type=int, default=5, help="logins per student")
+    parser.add_argument("--inline", action="store_true", help="hash on the request threads (no pool)")
+    parser.add_argument("--method", default=PASSWORD_HASH_METHOD, help="werkzeug hash method, e.g. scrypt:32768:8:1")
+    args = parser.parse_args()
+    with contextlib.redirect_stdout(io.StringIO()):  # ✅ Keep the login route's debug prints out of the JSON
+        result = run(args.students, args.logins, inline=args.inline, method=args.method)
+    print(json.dumps(result, indent=4))
@@ -0,0 +1,187 @@
+### `benchmarks/telemetry_simulator.py`
+"""
+🔹 Simulated device fleet & sustained telemetry ingest benchmark
+
+Simulates thousands of smart plugs / projectors. Each one reports power and
+current while switched on, and a heartbeat every interval. Readings are sent
+in batches for a fixed duration, as fast as the backend accepts them (or paced
+to the fleet's real reporting rate with --realtime). A 503 (buffer full) is
+honored with its Retry-After instead of being counted as an error.
+
+Modes:
+    direct  → TelemetryPipeline.ingest in-process (no HTTP), flusher running
+    client  → POST /telemetry through the Flask test client
+    url     → POST /telemetry against a running server (--url http://127.0.0.1:5000)
+
+Run from smart-school-lab/backend:
+    python -m benchmarks.telemetry_simulator --devices 5000 --seconds 10
+    python -m benchmarks.telemetry_simulator --mode url --url http://127.0.0.1:5000 --realtime
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+import models.log_model as log_model
+from models.telemetry_model import BufferFull, TelemetryPipeline, TelemetryStore, set_telemetry_pipeline
+
+
+class SimulatedFleet:
+    """ ✅ Seeded devices with a baseline draw, on/off duty cycle & sensor noise """
+
+    def __init__(self, devices, interval=5.0, seed=42):
+        self.interval = interval
+        self.rng = random.Random(seed)
+        self.baseline = [self.rng.uniform(20, 350) for _ in range(devices)]  # ✅ Watts while on
+        self.on = [self.rng.random() < 0.4 for _ in range(devices)]
+        self._next = 0
+
+    def readings(self, count, now):
+        """ ✅ The next ``count`` readings, cycling through the fleet device by device """
+        batch = []
+        while len(batch) < count:
+            device = self._next
+            self._next = (self._next + 1) % len(self.baseline)
+            if self.rng.random() < 0.01:
+                self.on[device] = not self.on[device]
+            watts = self.baseline[device] * self.rng.uniform(0.95, 1.05) if self.on[device] else self.rng.uniform(0, 2)
+            ts = int(now)
+            batch.append({"device_id": device + 1, "metric": "heartbeat", "ts": ts})
+            batch.append({"device_id": device + 1, "metric": "power_w", "value": round(watts, 2), "ts": ts})
+            batch.append({"device_id": device + 1, "metric": "current_a", "value": round(watts / 230, 3), "ts": ts})
+        return batch[:count]
+
+    @property
+    def readings_per_second(self):
+        return 3 * len(self.baseline) / self.interval
+
+
+def _sender(mode, target):
+    """ ✅ Returns send(readings) → (accepted, retry_after or None) """
+    if mode == "direct":
+        def send(readings):
+            try:
+                return target.ingest(readings)[0], None
+            except BufferFull as e:
+                return 0, e.retry_after
+    elif mode == "client":
+        client = target.test_client()
+
+        def send(readings):
+            response = client.post("/telemetry", json={"readings": readings})
+            if response.status_code == 503:
+                return 0, int(response.headers["Retry-After"])
+            return response.get_json()["accepted"], None
+    else:
+        def send(readings):
+            request = urllib.request.Request(f"{target}/telemetry", data=json.dumps({"readings": readings}).encode(),
+                                             headers={"Content-Type": "application/json"}, method="POST")
+            try:
+                with urllib.request.urlopen(request) as response:
+                    return json.load(response)["accepted"], None
+            except urllib.error.HTTPError as e:
+                if e.code == 503:
+                    return 0, int(e.headers["Retry-After"])
+                raise
+    return send
+
+
+def run(mode="direct", devices=5000, interval=5.0, batch=500, threads=4, seconds=10.0, realtime=False, url=None,
+        seed=42):
+    data_dir = tempfile.mkdtemp(prefix="telemetry-sim-")
+    log_model.DATA_DIR = data_dir  # ✅ The app's lazily opened stores stay out of the real data/
+    pipeline = TelemetryPipeline(TelemetryStore(data_dir=data_dir)).start()
+    previous = set_telemetry_pipeline(pipeline)
+    try:
+        if mode == "client":
+            from app import app
+            target = app
+        else:
+            target = url.rstrip("/") if mode == "url" else pipeline
+
+        fleets = [SimulatedFleet(devices // threads, interval, seed + n) for n in range(threads)]
+        totals = {"accepted": 0, "requests": 0, "backoffs": 0}
+        latencies = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def worker(fleet):
+            send = _sender(mode, target)
+            pace = batch / fleet.readings_per_second if realtime else 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                accepted, retry_after = send(fleet.readings(batch, time.time()))
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    totals["requests"] += 1
+                    totals["accepted"] += accepted
+                    totals["backoffs"] += retry_after is not None
+                if retry_after is not None:
+                    time.sleep(min(retry_after, max(0.0, deadline - time.monotonic())))
+                elif pace > elapsed:
+                    time.sleep(pace - elapsed)
+
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(fleet,)) for fleet in fleets]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        pipeline.stop()  # ✅ Flushes the buffered tail
+
+        latencies.sort()
+        status = pipeline.status()
+        return {
+            "benchmark": "telemetry_simulator",
+            "mode": mode,
+            "devices": devices,
+            "batch": batch,
+            "threads": threads,
+            "realtime": realtime,
+            "fleet_readings_per_second": round(sum(fleet.readings_per_second for fleet in fleets), 1),
+            "seconds": round(elapsed, 3),
+            "requests": totals["requests"],
+            "accepted": totals["accepted"],
+            "ingest_readings_per_second": round(totals["accepted"] / elapsed, 1),
+            "backoffs_503": totals["backoffs"],
+            "request_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3) if latencies else None,
+            "request_p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 3) if latencies else None,
+            "flushes": status["flushes"],
+            "readings_per_flush": round(status["flushed"] / status["flushes"], 1) if status["flushes"] else 0,
+            "bytes_per_reading": round(pipeline.store.size_bytes() / status["flushed"], 2) if status["flushed"] else None,
+        }
+    finally:
+        set_telemetry_pipeline(previous)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated device fleet for sustained telemetry ingest (JSON output)")
+    parser.add_argument("--mode", choices=["direct", "client", "url"], default="direct")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="server for --mode url")
+    parser.add_argument("--devices", type=int, default=5000)
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between a device's reports")
+    parser.add_argument("--batch", type=int, default=500, help="readings per request")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent senders (the fleet is split between them)")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--realtime", action="store_true", help="pace each sender to its devices' reporting rate")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):  # ✅ Keep route debug prints out of the JSON
+        result = run(mode=args.mode, devices=args.devices, interval=args.interval, batch=args.batch,
+                     threads=args.threads, seconds=args.seconds, realtime=args.realtime, url=args.url,
+                     seed=args.seed)
+    print(json.dumps(result, indent=4))
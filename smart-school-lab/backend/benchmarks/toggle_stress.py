@@ -0,0 +1,146 @@
+### `benchmarks/toggle_stress.py`
+"""
+🔹 Concurrent toggle stress benchmark
+
+Hammers POST /devices/<id>/toggle from many threads and then proves that no
+update was lost: every device must end in the state implied by the number of
+toggles it received, and its log entries must alternate ON/OFF with exactly
+one entry per toggle.
+
+Run from smart-school-lab/backend:
+    python -m benchmarks.toggle_stress --threads 16 --toggles 200 --devices 4
+    python -m benchmarks.toggle_stress --server   # real threaded WSGI server
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+
+from models.device_model import DeviceRegistry, set_device_registry
+from models.log_model import LogStore, set_log_store
+from models.toggle_model import ToggleGuard, set_toggle_guard
+
+
+def _client_worker(app, device_ids, toggles, latencies, errors):
+    client = app.test_client()
+    for i in range(toggles):
+        device_id = device_ids[i % len(device_ids)]
+        started = time.perf_counter()
+        response = client.post(f"/devices/{device_id}/toggle", json={"username": "bench"})
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+def _server_worker(port, device_ids, toggles, latencies, errors):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    body = json.dumps({"username": "bench"})
+    for i in range(toggles):
+        device_id = device_ids[i % len(device_ids)]
+        started = time.perf_counter()
+        connection.request("POST", f"/devices/{device_id}/toggle", body=body,
+                           headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - started)
+        if response.status != 200:
+            errors.append(response.status)
+    connection.close()
+
+
+def run(threads=16, toggles=200, devices=4, server=False, fsync=True):
+    """ ✅ Runs the stress test and returns a JSON-serializable result dict """
+    data_dir = tempfile.mkdtemp(prefix="toggle-stress-")
+    store = LogStore(data_dir=data_dir, fsync=fsync)
+    registry = DeviceRegistry(path=f"{data_dir}/devices.json")
+    for n in range(devices - len(registry)):
+        registry.add({"name": f"Bench Device {n}"})
+    set_log_store(store)
+    set_device_registry(registry)
+    set_toggle_guard(ToggleGuard(debounce=0, user_rate=0, ip_rate=0))  # ✅ Measure the raw toggle path: no rate limits, no coalescing
+
+    from app import app
+    device_ids = [device["id"] for device in registry.all()][:devices]
+    initial = {device_id: registry.get(device_id)["status"] for device_id in device_ids}
+
+    http_server = None
+    if server:
+        from werkzeug.serving import make_server
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)  # ✅ No per-request access log lines
+        http_server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=http_server.serve_forever, daemon=True).start()
+
+    latencies, errors = [], []
+    workers = []
+    for n in range(threads):
+        # ✅ Rotate the device order per thread so every device sees contention
+        ids = device_ids[n % len(device_ids):] + device_ids[:n % len(device_ids)]
+        if server:
+            args = (http_server.server_port, ids, toggles, latencies, errors)
+            workers.append(threading.Thread(target=_server_worker, args=args))
+        else:
+            workers.append(threading.Thread(target=_client_worker, args=(app, ids, toggles, latencies, errors)))
+
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    if http_server:
+        http_server.shutdown()
+
+    # ✅ Verify: no lost updates & log order matches state order per device
+    total = threads * toggles
+    per_device = {device_id: 0 for device_id in device_ids}
+    for n in range(threads):
+        ids = device_ids[n % len(device_ids):] + device_ids[:n % len(device_ids)]
+        for i in range(toggles):
+            per_device[ids[i % len(ids)]] += 1
+
+    lost = []
+    for device_id in device_ids:
+        device = registry.get(device_id)
+        flips = per_device[device_id]
+        expected = initial[device_id] if flips % 2 == 0 else ("on" if initial[device_id] == "off" else "off")
+        actions = [log["action"] for log in store.query(device=device["name"])[0]]
+        alternating = all(a != b for a, b in zip(actions, actions[1:]))
+        if device["status"] != expected or len(actions) != flips or not alternating:
+            lost.append({"device_id": device_id, "status": device["status"], "expected": expected,
+                         "logged": len(actions), "toggles": flips, "alternating": alternating})
+
+    latencies.sort()
+    result = {
+        "benchmark": "toggle_stress",
+        "mode": "wsgi-server" if server else "test-client",
+        "threads": threads,
+        "devices": len(device_ids),
+        "requests": total,
+        "errors": len(errors),
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+        "lost_updates": lost,
+    }
+    store.close()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent /devices/<id>/toggle stress benchmark")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--toggles", type=int, default=200, help="toggles per thread")
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--server", action="store_true", help="drive a real threaded WSGI server")
+    parser.add_argument("--no-fsync", action="store_true")
+    args = parser.parse_args()
+
+    result = run(args.threads, args.toggles, args.devices, args.server, fsync=not args.no_fsync)
+    print(json.dumps(result, indent=4))
+    sys.exit(1 if result["lost_updates"] or result["errors"] else 0)
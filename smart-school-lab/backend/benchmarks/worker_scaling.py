@@ -0,0 +1,157 @@
+### `benchmarks/worker_scaling.py`
+"""
+🔹 Multi-worker throughput scaling benchmark
+
+For each worker count it starts the pre-fork server (utils.interprocess.
+serve_prefork, the same code path as ``WORKERS=N python app.py``) on a fresh
+temp data directory, then drives it from several client processes with a
+polling-dashboard mix: GET /devices/status with a share of toggles. Afterwards
+it checks that every worker reports the same device state and that the number
+of logged toggles matches the number sent.
+
+Throughput can only scale up to the number of CPU cores; cpu_count is included
+in the JSON so results from different machines are comparable.
+
+Run from smart-school-lab/backend:
+    python -m benchmarks.worker_scaling --workers 1,2,4 --clients 8 --seconds 5
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import signal
+import socket
+import tempfile
+import time
+
+import models.log_model as log_model
+
+DEVICES = 3  # ✅ The seeded registry
+TOGGLE_SHARE = 0.2  # ✅ Fraction of requests that are toggles (the rest poll /devices/status)
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _serve(data_dir, port, workers):
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)  # ✅ Keep route debug prints out of the report
+    os.dup2(devnull, 2)
+    log_model.DATA_DIR = data_dir
+    from app import app
+    from models.toggle_model import ToggleGuard, set_toggle_guard
+    from utils.interprocess import serve_prefork
+    set_toggle_guard(ToggleGuard(debounce=0, user_rate=0, ip_rate=0))  # ✅ Every toggle sent must be logged (checked afterwards)
+    serve_prefork(app, port=port, workers=workers)
+
+
+def _wait_ready(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/devices/status")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not start")
+
+
+def _client(port, seconds, seed, results):
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    latencies, toggles, errors = [], 0, 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        if rng.random() < TOGGLE_SHARE:
+            connection.request("POST", f"/devices/{rng.randrange(DEVICES) + 1}/toggle",
+                               body=json.dumps({"username": "bench"}), headers={"Content-Type": "application/json"})
+            toggles += 1
+        else:
+            connection.request("GET", "/devices/status")
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - started)
+        if response.status != 200:
+            errors += 1
+    results.put((latencies, toggles, errors))
+
+
+def _consistency(port, data_dir, toggles_sent, probes=20):
+    """ ✅ Every worker must report one device state, matching the log """
+    views = set()
+    for _ in range(probes):
+        connection = http.client.HTTPConnection("127.0.0.1", port)  # ✅ New connection: may land on any worker
+        connection.request("GET", "/devices/status", headers={"Connection": "close"})
+        views.add(connection.getresponse().read())
+    store = log_model.LogStore(data_dir=data_dir, fsync=False, shared=True)
+    logged = len(store.query(username="bench")[0])
+    store.close()
+    return {"distinct_status_views": len(views), "toggles_sent": toggles_sent, "toggles_logged": logged}
+
+
+def run_one(workers, clients, seconds, seed):
+    data_dir = tempfile.mkdtemp(prefix=f"worker-scaling-{workers}-")
+    port = _free_port()
+    context = multiprocessing.get_context("fork")
+    server = context.Process(target=_serve, args=(data_dir, port, workers))
+    server.start()
+    try:
+        _wait_ready(port)
+        results = context.Queue()
+        load = [context.Process(target=_client, args=(port, seconds, seed + n, results)) for n in range(clients)]
+        started = time.perf_counter()
+        for process in load:
+            process.start()
+        outcomes = [results.get() for _ in load]
+        elapsed = time.perf_counter() - started
+        for process in load:
+            process.join()
+
+        latencies = sorted(seconds for outcome in outcomes for seconds in outcome[0])
+        toggles = sum(outcome[1] for outcome in outcomes)
+        return {
+            "workers": workers,
+            "clients": clients,
+            "requests": len(latencies),
+            "errors": sum(outcome[2] for outcome in outcomes),
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+            "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+            "consistency": _consistency(port, data_dir, toggles),
+        }
+    finally:
+        os.kill(server.pid, signal.SIGTERM)
+        server.join(10)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput scaling with the number of worker processes (JSON output)")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--clients", type=int, default=8, help="load-generating client processes")
+    parser.add_argument("--seconds", type=float, default=5.0, help="measured duration per worker count")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    runs = [run_one(int(workers), args.clients, args.seconds, args.seed) for workers in args.workers.split(",")]
+    baseline = runs[0]["throughput_rps"]
+    for run in runs:
+        run["speedup"] = round(run["throughput_rps"] / baseline, 2)
+    print(json.dumps({
+        "benchmark": "worker_scaling",
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "toggle_share": TOGGLE_SHARE,
+        "runs": runs,
+    }, indent=4))
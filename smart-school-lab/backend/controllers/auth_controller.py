@@ -1,12 +1,128 @@
 import jwt
 import datetime
-from flask import Blueprint, request, jsonify
+import threading
+from flask import Blueprint, current_app, g, request, jsonify
+from controllers import user_controller  # ✅ Module import (user_controller imports this module too)
+from utils.token_cache import VerifiedTokenCache
 
 auth_bp = Blueprint("auth", __name__)
 
 SECRET_KEY = "your_secret_key"  # 🔒 Use a strong secret key
 TOKEN_EXPIRATION_MINUTES = 30  # ✅ Access token expires in 30 minutes
 REFRESH_TOKEN_EXPIRATION_DAYS = 7  # ✅ Refresh token lasts 7 days
+TOKEN_CACHE_SIZE = 4096  # ✅ Verified access tokens remembered (LRU, each evicted at its own expiry)
+
+# ✅ Permissions accepted per (blueprint, method); any one of them grants access
+ROUTE_PERMISSIONS = {
+    ("devices", "GET"): ("view_devices", "manage_devices"),
+    ("devices", "WRITE"): ("manage_devices",),
+    ("logs", "GET"): ("view_logs",),
+    ("logs", "WRITE"): ("view_logs", "view_devices"),
+}
+# ✅ Device routes any signed-in user may call (students ask for access)
+OPEN_DEVICE_ENDPOINTS = {"devices.request_device_access"}
+
+
+def issue_tokens(username, role):
+    """ ✅ Signs an access/refresh token pair carrying the user's role """
+    now = datetime.datetime.utcnow()
+    access_token_payload = {
+        "username": username,
+        "role": role,
+        "type": "access",
+        "exp": now + datetime.timedelta(minutes=TOKEN_EXPIRATION_MINUTES)
+    }
+    refresh_token_payload = {
+        "username": username,
+        "role": role,
+        "type": "refresh",
+        "exp": now + datetime.timedelta(days=REFRESH_TOKEN_EXPIRATION_DAYS)
+    }
+    return (jwt.encode(access_token_payload, SECRET_KEY, algorithm="HS256"),
+            jwt.encode(refresh_token_payload, SECRET_KEY, algorithm="HS256"))
+
+
+# ---------------------------------------------
+# 🔹 Verified-token cache (lazy, swappable for tests & benchmarks)
+# ---------------------------------------------
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = VerifiedTokenCache(TOKEN_CACHE_SIZE)
+    return _token_cache
+
+
+def set_token_cache(cache):
+    """ ✅ Replaces the shared VerifiedTokenCache (used by tests & benchmarks) """
+    global _token_cache
+    with _token_cache_lock:
+        previous, _token_cache = _token_cache, cache
+    return previous
+
+
+def verify_access_token(token):
+    """ ✅ Returns the claims of a valid access token, skipping signature checks for cached tokens.
+
+    Raises jwt.InvalidTokenError (incl. ExpiredSignatureError) for anything else.
+    """
+    cache = get_token_cache()
+    claims = cache.get(token)
+    if claims is not None:
+        return claims
+    claims = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    if claims.get("type") != "access":
+        raise jwt.InvalidTokenError("Not an access token")
+    if "exp" in claims:
+        cache.put(token, claims, claims["exp"])
+    return claims
+
+
+# ---------------------------------------------
+# 🔹 Auth middleware (registered as app.before_request)
+# ---------------------------------------------
+def required_permissions(blueprint, endpoint, method):
+    """ ✅ Permissions guarding a request, or None for unprotected routes """
+    if endpoint in OPEN_DEVICE_ENDPOINTS:
+        return ()  # ✅ Any valid token
+    if blueprint not in ("devices", "logs"):
+        return None
+    return ROUTE_PERMISSIONS[(blueprint, "GET" if method in ("GET", "HEAD") else "WRITE")]
+
+
+def authenticate_request():
+    """ ✅ Verifies the bearer token once per request and enforces role permissions.
+
+    401 → missing (when AUTH_REQUIRED), invalid or expired token (the frontend then calls /auth/refresh);
+    403 → valid token whose role lacks the route's permission.
+    """
+    g.user = None
+    if request.method == "OPTIONS":
+        return None
+    permissions = required_permissions(request.blueprint, request.endpoint, request.method)
+    if permissions is None:
+        return None
+
+    header = request.headers.get("Authorization", "")
+    if not header.startswith("Bearer "):
+        if current_app.config.get("AUTH_REQUIRED"):
+            return jsonify({"error": "Authorization token missing"}), 401
+        return None  # ✅ Anonymous access stays allowed until AUTH_REQUIRED is switched on
+
+    try:
+        g.user = verify_access_token(header[len("Bearer "):].strip())
+    except jwt.InvalidTokenError:
+        return jsonify({"error": "Invalid or expired token"}), 401
+
+    granted = user_controller.get_permissions_by_role(g.user.get("role"))
+    if permissions and not any(permission in granted for permission in permissions):
+        return jsonify({"error": "Insufficient permissions"}), 403
+    return None
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -20,17 +136,7 @@ def login():
 
     # ✅ Mock authentication logic (Replace with actual database validation)
     if username == "admin" and password == "securepassword":
-        access_token_payload = {
-            "username": username,
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(minutes=TOKEN_EXPIRATION_MINUTES)
-        }
-        refresh_token_payload = {
-            "username": username,
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(days=REFRESH_TOKEN_EXPIRATION_DAYS)
-        }
-
-        access_token = jwt.encode(access_token_payload, SECRET_KEY, algorithm="HS256")
-        refresh_token = jwt.encode(refresh_token_payload, SECRET_KEY, algorithm="HS256")
+        access_token, refresh_token = issue_tokens(username, "admin")
 
         return jsonify({"access_token": access_token, "refresh_token": refresh_token}), 200
     else:
@@ -48,17 +154,9 @@ def refresh_token():
 
     try:
         decoded_refresh = jwt.decode(refresh_token, SECRET_KEY, algorithms=["HS256"])
-        new_access_token_payload = {
-            "username": decoded_refresh["username"],
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(minutes=TOKEN_EXPIRATION_MINUTES)
-        }
-        new_refresh_token_payload = {
-            "username": decoded_refresh["username"],
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(days=REFRESH_TOKEN_EXPIRATION_DAYS)
-        }
-
-        new_access_token = jwt.encode(new_access_token_payload, SECRET_KEY, algorithm="HS256")
-        new_refresh_token = jwt.encode(new_refresh_token_payload, SECRET_KEY, algorithm="HS256")
+        if decoded_refresh.get("type", "refresh") != "refresh":  # ✅ Access tokens can't mint new pairs
+            return jsonify({"error": "Invalid refresh token"}), 403
+        new_access_token, new_refresh_token = issue_tokens(decoded_refresh["username"], decoded_refresh.get("role"))
 
         return jsonify({"access_token": new_access_token, "refresh_token": new_refresh_token}), 200
     except jwt.ExpiredSignatureError:
@@ -1,42 +1,68 @@
-from flask import Blueprint, jsonify, request
-from flask_cors import CORS
-from models.device_model import devices, find_device_by_id
+from flask import Blueprint, Response, g, jsonify, request
+from models.access_model import DECISIONS, get_access_queue
+from models.device_model import get_device_registry, toggle_device_statuses
+from models.log_model import get_log_store
+from models.retention_model import get_retention_manager
+from models.schedule_model import get_scheduler
+from models.toggle_model import get_toggle_guard
+from models.usage_model import get_usage_tracker, local_seconds
+from models.user_model import get_user_repository
+from utils.events import EventBroadcaster, encode_sse
+from utils.http_cache import ResponseCache
+from utils.metrics import METRICS
+from utils.rate_limit import retry_after_header
 from datetime import datetime
-import json
-import os
-from datetime import datetime, timedelta  # ✅ Add timedelta here
+import threading
+import time
 
 
 # ---------------------------------------------
 # 🔹 Global Variables & Setup
 # ---------------------------------------------
 device_bp = Blueprint('devices', __name__)  # ✅ Blueprint for device-related routes
-CORS(device_bp)  # ✅ Enable CORS globally for API access
-device_usage_timestamps = {}  # ✅ Dictionary to track device usage duration
+MAX_BULK_COMMANDS = 500  # ✅ Upper bound on commands per POST /devices/bulk
+MAX_ACCESS_DECISIONS = 500  # ✅ Upper bound on request ids per POST /devices/access-requests/<decision>
+ANALYTICS_REFRESH_SECONDS = 30  # ✅ Running usage hours grow without mutations; re-derive at most this often
+_responses = ResponseCache()  # ✅ Pre-serialized bodies per data version (ETag / 304 for polling dashboards)
+# ✅ CORS is applied app-wide by create_app; models.analytics_model (NumPy) is imported by the analytics routes on first use
 
-# ✅ Log file path for tracking device actions
-LOG_FILE = os.path.join(os.path.dirname(__file__), "../data/logs.json")
+STREAM_KEEPALIVE_SECONDS = 15  # ✅ Comment frame sent to idle SSE clients to keep proxies from closing them
+_events = {"broadcaster": EventBroadcaster(), "registry": None, "store": None, "access": None}
+_events_lock = threading.Lock()
+
+# ---------------------------------------------
+# 🔹 Live Event Fan-out (shared by every /devices/stream client)
+# ---------------------------------------------
+def get_event_broadcaster():
+    """ ✅ Returns the shared broadcaster, wired to the current device registry, log store & access queue """
+    registry, store, queue = get_device_registry(), get_log_store(), get_access_queue()
+    if _events["registry"] is not registry or _events["store"] is not store or _events["access"] is not queue:
+        with _events_lock:
+            broadcaster = _events["broadcaster"]
+            if _events["registry"] is not registry:
+                registry.add_listener(lambda device: broadcaster.publish("device", device))
+                _events["registry"] = registry
+            if _events["store"] is not store:
+                def publish_logs(records):
+                    for record in records:
+                        broadcaster.publish("log", record)
+                store.add_listener(publish_logs)
+                _events["store"] = store
+            if _events["access"] is not queue:
+                queue.add_listener(lambda access_request: broadcaster.publish("access", access_request))
+                _events["access"] = queue
+    return _events["broadcaster"]
 
 # ---------------------------------------------
 # 🔹 Utility Functions for Logging
 # ---------------------------------------------
 def load_logs():
-    """ ✅ Loads logs.json safely, creates file if missing """
-    try:
-        with open(LOG_FILE, "r") as file:
-            logs = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        logs = []  # ✅ Initializes empty list if file is missing or corrupted
-        with open(LOG_FILE, "w") as file:
-            json.dump(logs, file, indent=4)
-    return logs
+    """ ✅ Returns all logs from the shared append-only log store """
+    return get_log_store().all()
 
 def save_log(entry):
-    """ ✅ Saves an action log entry to logs.json """
-    logs = load_logs()
-    logs.append(entry)
-    with open(LOG_FILE, "w") as file:
-        json.dump(logs, file, indent=4)
+    """ ✅ Appends an action log entry to the shared log store (no full-file rewrite) """
+    return get_log_store().append(entry)
 
 # ---------------------------------------------
 # 🔹 API Routes for Device Control
@@ -55,8 +81,10 @@ def add_cors_headers(response):
 # ---------------------------------------------
 @device_bp.route('/', methods=['GET'])
 def get_all_devices():
-    """ ✅ Returns a list of all available devices """
-    return jsonify(devices), 200
+    """ ✅ Returns all available devices, optionally filtered by ?room= and/or ?type= """
+    registry = get_device_registry()
+    return _responses.respond(registry.version, lambda: registry.all(
+        room=request.args.get("room"), device_type=request.args.get("type")))
 
 # ---------------------------------------------
 # 🔹 Fetch Device Status (GET /devices/status)
@@ -64,36 +92,114 @@ def get_all_devices():
 @device_bp.route('/status', methods=['GET'])
 def get_device_status():
     """ ✅ Returns current real-time status of all devices """
-    return jsonify(devices), 200
+    registry = get_device_registry()
+    return _responses.respond(registry.version, registry.all)
+
+# ---------------------------------------------
+# 🔹 Live Device Stream (GET /devices/stream, Server-Sent Events)
+# ---------------------------------------------
+@device_bp.route('/stream', methods=['GET'])
+def stream_device_events():
+    """ ✅ Pushes device status changes & new logs as small SSE deltas.
+
+    A fresh connection first receives a "snapshot" of all devices; a reconnect
+    with Last-Event-ID (or ?last_event_id=) resumes from the shared history, or
+    gets a "resync" event if it fell too far behind.
+    """
+    broadcaster = get_event_broadcaster()
+    raw_last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    last_event_id = int(raw_last_id) if raw_last_id and raw_last_id.isdigit() else None
+
+    subscription = broadcaster.subscribe(last_event_id)
+    snapshot_id = broadcaster.last_event_id
+    snapshot = get_device_registry().all() if last_event_id is None else None
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"  # ✅ Browser reconnect delay
+            if snapshot is not None:
+                yield encode_sse(snapshot_id, "snapshot", {"devices": snapshot})
+            while not subscription.closed:
+                events = subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                if not events:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield "".join(event.frame for event in events)
+        finally:
+            broadcaster.unsubscribe(subscription)  # ✅ Client disconnected
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # ✅ Disable proxy buffering (nginx)
+    return response
 
 # ---------------------------------------------
 # 🔹 Toggle Device Status (ON/OFF) (POST /devices/<device_id>/toggle)
 # ---------------------------------------------
 @device_bp.route('/<int:device_id>/toggle', methods=['POST'])
 def toggle_device(device_id):
-    """ ✅ Toggles device ON/OFF and logs action with correct username """
+    """ ✅ Toggles device ON/OFF and logs action with correct username
+
+    Storm protection: 429 + Retry-After once the caller's user or IP token
+    bucket is empty. Toggles of a device within the debounce window are
+    coalesced (202 with the pending state): one net change, one log entry.
+    """
     data = request.json
     username = data.get("username", "Unknown")
+    claims = getattr(g, "user", None)
+    limited_as = (claims or {}).get("username") or username  # ✅ A verified token beats the body's username
 
     # ✅ Ensure username is valid before saving log
     if username.strip() == "" or username.lower() == "unknown":
         username = "System User"  # 🔹 Replace "Unknown" with a default system user
-
-    device = find_device_by_id(device_id)
+        limited_as = (claims or {}).get("username")  # 🔹 Anonymous callers are limited per IP only
+
+    guard = get_toggle_guard()
+    wait = guard.admit(username=limited_as, ip=request.remote_addr)
+    if wait:
+        METRICS.inc("device_toggle_requests_total", (("result", "rate_limited"),))
+        response = jsonify({"error": "Too many toggle requests, please slow down",
+                            "retry_after": int(retry_after_header(wait))})
+        response.headers["Retry-After"] = retry_after_header(wait)
+        return response, 429
+
+    # ✅ Flip + log under the device's lock (concurrent toggles can't interleave), debounced per device
+    device, coalesced = guard.toggle(device_id, username=username)
     if not device:
         return jsonify({"error": "Device not found"}), 404
 
-    device["status"] = "on" if device["status"] == "off" else "off"
+    METRICS.inc("device_toggle_requests_total", (("result", "coalesced" if coalesced else "applied"),))
+    if coalesced:
+        return jsonify({"message": f"{device['name']} will turn {device['status'].upper()}", "device": device,
+                        "coalesced": True}), 202
+    return jsonify({"message": f"{device['name']} turned {device['status'].upper()}!", "device": device}), 200
 
-    log_entry = {
-        "action": device["status"],
-        "device": device["name"],
-        "username": username,  # ✅ Now ensures proper username
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    save_log(log_entry)
 
-    return jsonify({"message": f"{device['name']} turned {device['status'].upper()}!", "device": device}), 200
+# ---------------------------------------------
+# 🔹 Bulk Device Commands (POST /devices/bulk)
+# ---------------------------------------------
+@device_bp.route('/bulk', methods=['POST'])
+def bulk_device_commands():
+    """ ✅ Applies explicit on/off commands to many devices at once (e.g. a whole lab at the end of the day)
+
+    Body: {"username": "...", "commands": [{"id": 1, "action": "off"}, ...]}
+    All-or-nothing: any invalid command → 400 with per-command errors and nothing changed.
+    """
+    data = request.get_json(silent=True) or {}
+    commands = data.get("commands")
+    if not isinstance(commands, list) or not commands or len(commands) > MAX_BULK_COMMANDS:
+        return jsonify({"error": f"commands must be a list of 1-{MAX_BULK_COMMANDS} {{id, action}} objects"}), 400
+
+    username = str(data.get("username") or "").strip()
+    if username == "" or username.lower() == "unknown":
+        username = "System User"
+
+    parsed = [(command.get("id"), str(command.get("action", "")).lower()) if isinstance(command, dict) else (None, None)
+              for command in commands]
+    results = toggle_device_statuses(parsed, username=username)
+    if any("error" in result for result in results):
+        return jsonify({"error": "No changes applied", "results": results}), 400
+    return jsonify({"message": f"{sum(r['changed'] for r in results)} device(s) switched", "results": results}), 200
 
 
 # ---------------------------------------------
@@ -101,12 +207,89 @@ def toggle_device(device_id):
 # ---------------------------------------------
 @device_bp.route('/analytics', methods=['GET'])
 def get_device_analytics():
-    """ ✅ Returns device analytics including usage hours """
-    analytics_data = [
-        {"name": device["name"], "status": device["status"], "total_usage_hours": device.get("total_usage_hours", 0)}
-        for device in devices
-    ]
-    return jsonify(analytics_data), 200
+    """ ✅ Returns device analytics including usage hours (computed from ON/OFF logs)
+
+    Optional rollups: ?period=day|week&by=device|user[&key=<device or username>]
+    """
+    tracker = get_usage_tracker()  # ✅ Running accumulators; no log scan per refresh
+
+    period = request.args.get("period")
+    if period is not None:
+        by = request.args.get("by", "device")
+        if period not in ("day", "week") or by not in ("device", "user"):
+            return jsonify({"error": "period must be day|week and by must be device|user"}), 400
+        usage = tracker.rollup(period=period, by=by, key=request.args.get("key"))
+        return jsonify({"period": period, "by": by, "usage_hours": usage}), 200
+
+    registry = get_device_registry()
+    version = (registry.version, get_log_store().version, int(time.time() // ANALYTICS_REFRESH_SECONDS))
+    return _responses.respond(version, lambda: [
+        {"name": device["name"], "status": device["status"], "total_usage_hours": tracker.total_hours(device["name"])}
+        for device in registry.all()
+    ])
+
+
+def _report_range():
+    """ ✅ Parses ?since/?until ("YYYY-MM-DD[ HH:MM:SS]", lab wall clock) into local seconds """
+    bounds = []
+    for name in ("since", "until"):
+        value = request.args.get(name)
+        bounds.append(local_seconds(value) if value else None)
+    return bounds
+
+
+# ---------------------------------------------
+# 🔹 Usage Heatmap (GET /devices/analytics/heatmap)
+# ---------------------------------------------
+@device_bp.route('/analytics/heatmap', methods=['GET'])
+def get_usage_heatmap():
+    """ ✅ Weekday × hour-of-day action counts from the pre-aggregated hourly buckets
+
+    Optional filters: ?since&until&device&action
+    """
+    try:
+        since, until = _report_range()
+    except ValueError:
+        return jsonify({"error": "since/until must be 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'"}), 400
+    from models.analytics_model import get_hourly_rollup
+
+    rollup = get_hourly_rollup()
+    heatmap = rollup.heatmap(since, until, device=request.args.get("device"), action=request.args.get("action"))
+    return jsonify({"weekdays": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], "heatmap": heatmap,
+                    "busiest_hours": rollup.busiest_hours(since, until)}), 200
+
+
+# ---------------------------------------------
+# 🔹 Top Users (GET /devices/analytics/top-users)
+# ---------------------------------------------
+@device_bp.route('/analytics/top-users', methods=['GET'])
+def get_top_users():
+    """ ✅ Most active users over ?since&until (default: all time), up to ?limit (default 10) """
+    try:
+        since, until = _report_range()
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        return jsonify({"error": "Invalid since/until or limit"}), 400
+    from models.analytics_model import get_hourly_rollup
+
+    return jsonify(get_hourly_rollup().top_users(since, until, limit=max(limit, 1))), 200
+
+
+# ---------------------------------------------
+# 🔹 Term Report (GET /devices/analytics/report)
+# ---------------------------------------------
+@device_bp.route('/analytics/report', methods=['GET'])
+def get_term_report():
+    """ ✅ Batch NumPy report: heatmap, top users, duty cycles & ON-session percentiles over ?since&until """
+    try:
+        since, until = _report_range()
+    except ValueError:
+        return jsonify({"error": "since/until must be 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'"}), 400
+    from models.analytics_model import run_batch_report
+
+    store = get_log_store()
+    # ✅ Built once per log version & range; earlier records are needed to know which devices were already ON
+    return _responses.respond(store.version, lambda: run_batch_report(store.all(), since, until))
 
 
 # ---------------------------------------------
@@ -131,94 +314,156 @@ def save_schedule(device_id):
         if not on_time or not off_time:
             return jsonify({"error": "Missing start or end time"}), 400
 
-        device = find_device_by_id(device_id)
+        device = get_device_registry().get(device_id)
         if not device:
             return jsonify({"error": "Device not found"}), 404
 
+        # ✅ Register with the scheduler (persisted; fires ON/OFF daily through the toggle path)
+        try:
+            schedule = get_scheduler().add(device_id, on_time, off_time, username=username)
+        except ValueError:
+            return jsonify({"error": "Times must be in HH:MM format"}), 400
+
         # ✅ Log scheduling action
         log_entry = {
             "action": "schedule_set",
             "device": device["name"],
             "username": username,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "schedule": {"start_time": on_time, "end_time": off_time}
+            "schedule": {"start_time": on_time, "end_time": off_time, "id": schedule["id"]}
         }
         save_log(log_entry)
 
-        return jsonify({"message": f"Schedule set from {on_time} to {off_time} for {device['name']}"}), 200
+        return jsonify({"message": f"Schedule set from {on_time} to {off_time} for {device['name']}",
+                        "schedule": schedule}), 200
 
     except Exception as e:
         return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
 
+# ---------------------------------------------
+# 🔹 List Schedules (GET /devices/schedules?device_id=)
+# ---------------------------------------------
+@device_bp.route('/schedules', methods=['GET'])
+def list_schedules():
+    """ ✅ Returns all active schedules with their next ON/OFF firing times """
+    device_id = request.args.get("device_id", type=int)
+    return jsonify(get_scheduler().all(device_id=device_id)), 200
+
+# ---------------------------------------------
+# 🔹 Cancel a Schedule (DELETE /devices/schedules/<schedule_id>)
+# ---------------------------------------------
+@device_bp.route('/schedules/<int:schedule_id>', methods=['DELETE'])
+def cancel_schedule(schedule_id):
+    """ ✅ Cancels a schedule so it no longer switches its device """
+    if not get_scheduler().cancel(schedule_id):
+        return jsonify({"error": "Schedule not found"}), 404
+    return jsonify({"message": f"Schedule {schedule_id} cancelled"}), 200
+
 # ---------------------------------------------
 # 🔹 Request Access to a Device (POST /devices/<device_id>/request-access)
 # ---------------------------------------------
+def _requester_role(username):
+    """ ✅ Role used to prioritize a request: the token's, else the user store's, else student """
+    if getattr(g, "user", None):
+        return g.user.get("role")
+    user = get_user_repository().get_by_username(username)
+    return user["role"] if user else "student"
+
 @device_bp.route('/<int:device_id>/request-access', methods=['POST'])
 def request_device_access(device_id):
-    """ ✅ Allows students to request access to a device and logs it """
-    data = request.json
-    username = data.get("username", "Unknown")
+    """ ✅ Queues a student's (or teacher's) request for a device and logs it
 
-    device = find_device_by_id(device_id)
+    Teachers are served before students, FIFO within a role; asking again while
+    a request is still pending returns that request ("queued": false) instead of a new one.
+    """
+    data = request.get_json(silent=True) or {}
+    username = data.get("username") or (g.user.get("username") if getattr(g, "user", None) else None) or "Unknown"
+
+    device = get_device_registry().get(device_id)
     if not device:
         return jsonify({"error": "Device not found"}), 404
 
-    # ✅ Log request action
-    log_entry = {
-        "action": "request",
-        "device": device["name"],
-        "username": username,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    save_log(log_entry)
-
-    return jsonify({"message": f"Access requested for {device['name']} by {username}"}), 200
+    access_request, created = get_access_queue().submit(device, username, role=_requester_role(username))
+    if created:
+        # ✅ Log request action
+        log_entry = {
+            "action": "request",
+            "device": device["name"],
+            "username": username,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        save_log(log_entry)
 
-@device_bp.route('/delete-logs', methods=['POST'])
-def delete_old_logs():
-    """ ✅ Debugging log deletion to identify issues """
-    try:
-        logs = load_logs()
-        print(f"🔹 Debug: Loaded {len(logs)} logs from logs.json")  # ✅ Print total logs loaded
+    return jsonify({"message": f"Access requested for {device['name']} by {username}",
+                    "request": access_request, "queued": created}), 200
 
-        cutoff_date = datetime.now() - timedelta(days=1)  # 🔹 Change from 90 days to 1 for testing
+# ---------------------------------------------
+# 🔹 Pending Access Requests (GET /devices/access-requests?device_id=&username=)
+# ---------------------------------------------
+@device_bp.route('/access-requests', methods=['GET'])
+def list_access_requests():
+    """ ✅ Returns just the open requests (one device's queue, one user's requests, or all) in serving order """
+    queue = get_access_queue()
+    username = request.args.get("username")
+    if username:
+        return jsonify(queue.for_user(username)), 200
+    return jsonify(queue.pending(device_id=request.args.get("device_id", type=int))), 200
 
-        filtered_logs = []  # ✅ Initialize empty list for cleaned logs
+# ---------------------------------------------
+# 🔹 Approve / Deny Access Requests (POST /devices/access-requests/<approve|deny>)
+# ---------------------------------------------
+@device_bp.route('/access-requests/<decision>', methods=['POST'])
+def decide_access_requests(decision):
+    """ ✅ Approves or denies many requests in one call and logs each decision
+
+    Body: {"ids": [1, 2, ...]} or {"device_id": 3} (that device's whole queue), plus optional "username".
+    Ids that are no longer pending come back with an "error" and don't fail the rest.
+    """
+    if decision not in DECISIONS:
+        return jsonify({"error": "Decision must be 'approve' or 'deny'"}), 404
+
+    data = request.get_json(silent=True) or {}
+    ids, device_id = data.get("ids"), data.get("device_id")
+    if ids is not None:
+        if (not isinstance(ids, list) or not ids or len(ids) > MAX_ACCESS_DECISIONS
+                or not all(isinstance(request_id, int) for request_id in ids)):
+            return jsonify({"error": f"ids must be a list of 1-{MAX_ACCESS_DECISIONS} request ids"}), 400
+    elif not isinstance(device_id, int):
+        return jsonify({"error": "Provide ids or device_id"}), 400
+
+    username = str(data.get("username") or (g.user.get("username") if getattr(g, "user", None) else "")).strip()
+    if username == "" or username.lower() == "unknown":
+        username = "System User"
+
+    results = get_access_queue().decide(decision, username, ids=ids, device_id=None if ids else device_id)
+    decided = [result for result in results if "error" not in result]
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    get_log_store().append_many([
+        {"action": f"request_{result['status']}", "device": result["device"], "username": username,
+         "requester": result["username"], "timestamp": timestamp}
+        for result in decided
+    ])  # ✅ One write for the whole batch
+    return jsonify({"message": f"{len(decided)} request(s) {DECISIONS[decision]}", "results": results}), 200
 
-        for log in logs:
-            try:
-                log_timestamp = datetime.strptime(log.get("timestamp", "1900-01-01"), "%Y-%m-%d %H:%M:%S")
-                if log_timestamp > cutoff_date:
-                    filtered_logs.append(log)  # ✅ Keep valid logs
-            except ValueError as e:
-                print(f"❌ Error parsing timestamp: {log.get('timestamp')} → {e}")  # ✅ Identify bad timestamps
+@device_bp.route('/delete-logs', methods=['POST'])
+def delete_old_logs():
+    """ ✅ Queues a background retention pass (never rewrites history inside the request)
 
-        print(f"✅ Debug: {len(filtered_logs)} logs remain after filtering")  # ✅ Print logs remaining
+    Optional JSON body: {"max_age_days": N} applies one cutoff to every action for
+    this pass; without it the configured per-action retention policy is used.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        max_age_days = data.get("max_age_days")
+        if max_age_days is not None and (not isinstance(max_age_days, (int, float)) or max_age_days < 0):
+            return jsonify({"error": "max_age_days must be a non-negative number"}), 400
 
-        save_logs(filtered_logs)  # ✅ Overwrite logs.json with cleaned logs
+        manager = get_retention_manager()
+        manager.trigger(override_days=max_age_days)
 
-        return jsonify({"message": "✅ Logs older than 1 day deleted successfully!"}), 200
+        scope = f"older than {max_age_days} day(s)" if max_age_days is not None else "past their retention window"
+        return jsonify({"message": f"✅ Cleanup of logs {scope} started", "retention": manager.status()}), 202
 
     except Exception as e:
         print(f"❌ Internal Server Error: {str(e)}")  # ✅ Log unexpected errors
         return jsonify({"error": f"❌ Failed to delete logs: {str(e)}"}), 500
-
-
-# ---------------------------------------------
-# 🔹 Utility Functions for Logging
-# ---------------------------------------------
-def load_logs():
-    """ ✅ Loads logs.json safely, creates file if missing """
-    try:
-        with open(LOG_FILE, "r") as file:
-            logs = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        logs = []  # ✅ Initializes empty list if file is missing or corrupted
-        with open(LOG_FILE, "w") as file:
-            json.dump(logs, file, indent=4)
-    return logs
-
-def save_logs(logs):
-    """ ✅ Saves the full list of logs to logs.json (Overwrites existing logs) """
-    with open(LOG_FILE, "w") as file:
-        json.dump(logs, file, indent=4)
@@ -1,51 +1,129 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from datetime import datetime
-import json
-import os
+import csv
+import io
+import threading
+import time
+import zlib
+from models.log_model import get_log_store, parse_timestamp
+from models.retention_model import get_retention_manager
+from utils.json_codec import get_json_encoder
+from utils.dedup import DedupIndex
+from utils.http_cache import ResponseCache
 
 # ✅ Define a Blueprint for log-related routes
 log_bp = Blueprint('logs', __name__)
 
-# ✅ Define absolute path for logs.json
-LOG_FILE = os.path.join(os.path.dirname(__file__), "../data/logs.json")
+MAX_PAGE_SIZE = 1000  # ✅ Upper bound for ?limit= on GET /logs
+EXPORT_BATCH_SIZE = 1000  # ✅ Records encoded per streamed chunk of GET /logs/export
+EXPORT_CSV_COLUMNS = ["seq", "timestamp", "device", "username", "action"]
+_responses = ResponseCache()  # ✅ Pre-serialized GET /logs pages per log-store version (ETag / 304)
+
+# ✅ Duplicate detection settings (tune for high-rate automated clients)
+DEDUP_WINDOW_SECONDS = 24 * 60 * 60  # 🔹 (timestamp, device) pairs remembered for one day
+DEDUP_MAX_KEYS = 100_000  # 🔹 Hard cap on remembered pairs, oldest evicted first
+IDEMPOTENCY_TTL_SECONDS = 10 * 60  # 🔹 How long a client may safely retry with the same Idempotency-Key
+IDEMPOTENCY_MAX_KEYS = 50_000
+
+_dedup = {"store": None, "entries": None, "requests": None}
+_dedup_lock = threading.Lock()
 
 # ---------------------------------------------
-# 🔹 Load logs safely (Prevent corruption & missing files)
+# 🔹 Duplicate detection (bounded O(1) index)
 # ---------------------------------------------
-def load_logs():
-    """ ✅ Reads logs.json safely & prevents file errors """
-    try:
-        with open(LOG_FILE, "r") as file:
-            logs = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        logs = []  # ✅ Creates an empty list if file doesn't exist or is corrupt
-        with open(LOG_FILE, "w") as file:
-            json.dump(logs, file, indent=4)
-    
-    return logs
+def get_dedup_index():
+    """ ✅ Returns the (timestamp, device) dedup index for the current log store.
+
+    Built once from the recent window of history, then kept current by a
+    log store listener so appends from any blueprint are seen.
+    """
+    store = get_log_store()
+    if _dedup["store"] is not store:
+        with _dedup_lock:
+            if _dedup["store"] is not store:
+                entries = DedupIndex(DEDUP_WINDOW_SECONDS, DEDUP_MAX_KEYS)
+
+                def track_appends(records):
+                    for log in records:
+                        entries.add(_dedup_key(log), at=log.epoch)  # ✅ LogRecord: epoch already parsed
+
+                store.add_listener(track_appends)  # ✅ Before seeding so no concurrent append is missed
+                since = int(time.time()) - DEDUP_WINDOW_SECONDS
+                track_appends(store.query(since=since)[0])
+                _dedup.update(store=store, entries=entries,
+                              requests=DedupIndex(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_KEYS))
+    return _dedup["entries"]
+
+
+def get_idempotency_index():
+    """ ✅ Returns the Idempotency-Key → stored log index """
+    get_dedup_index()
+    return _dedup["requests"]
+
+
+def _dedup_key(log):
+    return (log.get("timestamp"), log.get("device"))
 
 # ---------------------------------------------
 # 🔹 Save logs safely (Prevent duplicates)
 # ---------------------------------------------
 def save_log(entry):
-    """ ✅ Prevents duplicate logs & writes safely to logs.json """
-    logs = load_logs()
+    """ ✅ Prevents duplicate logs & appends safely to the log store """
+    entries = get_dedup_index()
 
-    # ✅ Prevent duplicate entries before appending
-    if not any(log["timestamp"] == entry["timestamp"] and log["device"] == entry["device"] for log in logs):
-        logs.append(entry)
-
-        with open(LOG_FILE, "w") as file:
-            json.dump(logs, file, indent=4)
+    # ✅ Atomic check-and-claim before appending (no scan over the history)
+    if not entries.add(_dedup_key(entry), at=parse_timestamp(entry["timestamp"])):
+        return None
+    try:
+        return get_log_store().append(entry)
+    except Exception:
+        entries.discard(_dedup_key(entry))  # ✅ Allow a retry if the write failed
+        raise
 
 # ---------------------------------------------
 # 🔹 API Endpoint: Retrieve all logs (GET /logs)
 # ---------------------------------------------
 @log_bp.route('/', methods=['GET'])
 def get_logs():
-    """ ✅ Fetch & return all usage logs dynamically """
-    logs = load_logs()
-    return jsonify(logs), 200
+    """ ✅ Fetch usage logs, filtered & paginated server-side.
+
+    Query params: device, username, action, since, until (timestamp or epoch),
+    cursor (seq of the last log already seen), limit, order (asc|desc).
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    args = request.args
+    limit = args.get("limit", type=int)
+    cursor = args.get("cursor", type=int)
+    if (args.get("limit") and limit is None) or (args.get("cursor") and cursor is None):
+        return jsonify({"error": "limit and cursor must be integers"}), 400
+    if limit is not None:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    since = parse_timestamp(args.get("since"))
+    until = parse_timestamp(args.get("until"))
+    if (args.get("since") and since is None) or (args.get("until") and until is None):
+        return jsonify({"error": "since/until must be 'YYYY-MM-DD HH:MM:SS' or epoch seconds"}), 400
+
+    order = args.get("order", "asc").lower()
+    if order not in ("asc", "desc"):
+        return jsonify({"error": "order must be 'asc' or 'desc'"}), 400
+
+    store = get_log_store()
+
+    def build():
+        logs, next_cursor = store.query(
+            device=args.get("device"),
+            username=args.get("username"),
+            action=args.get("action"),
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit,
+            order=order,
+        )
+        return logs, ({"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else {})
+
+    return _responses.respond(store.version, build)  # ✅ Unchanged polls → cached bytes or 304
 
 # ---------------------------------------------
 # 🔹 API Endpoint: Add a new log entry (POST /logs)
@@ -60,6 +138,16 @@ def add_log():
         if not data or "action" not in data or "device_id" not in data or "username" not in data:
             return jsonify({"error": "Missing required fields: action, device_id, username"}), 400
 
+        # ✅ Idempotent retries: the same key always maps to the first stored log
+        idempotency_key = request.headers.get("Idempotency-Key") or data.get("idempotency_key")
+        if idempotency_key:
+            requests_seen = get_idempotency_index()
+            if not requests_seen.add(idempotency_key):
+                original = requests_seen.get(idempotency_key)
+                if original is None:
+                    return jsonify({"error": "A request with this Idempotency-Key is still in progress"}), 409
+                return jsonify({"message": "Log entry already recorded", "log": original}), 200
+
         log_entry = {
             "action": data["action"],
             "device": f"Device {data['device_id']}",
@@ -68,10 +156,91 @@ def add_log():
         }
 
         # ✅ Save log entry safely
-        save_log(log_entry)
+        try:
+            stored = save_log(log_entry)
+        except Exception:
+            if idempotency_key:
+                requests_seen.discard(idempotency_key)
+            raise
+        if stored is None:
+            if idempotency_key:
+                requests_seen.discard(idempotency_key)
+            return jsonify({"message": "Duplicate log entry ignored", "log": log_entry}), 200
+        if idempotency_key:
+            requests_seen.set(idempotency_key, stored)
 
-        return jsonify({"message": "Log entry added successfully", "log": log_entry}), 201
+        return jsonify({"message": "Log entry added successfully", "log": stored}), 201
 
     except Exception as e:
         print(f"Error in add_log(): {str(e)}")  # ✅ Logs error for debugging
         return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
+
+# ---------------------------------------------
+# 🔹 API Endpoint: Retention & compaction status (GET /logs/retention)
+# ---------------------------------------------
+@log_bp.route('/retention', methods=['GET'])
+def get_retention_status():
+    """ ✅ Reports the retention policy, compaction progress & per-segment stats """
+    status = get_retention_manager().status()
+    status["segments"] = get_log_store().segment_info()
+    return jsonify(status), 200
+
+# ---------------------------------------------
+# 🔹 API Endpoint: Streaming export (GET /logs/export)
+# ---------------------------------------------
+def _export_chunks(batches, fmt):
+    """ ✅ Encodes one batch of records per chunk (NDJSON lines or CSV rows) """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for batch in batches:
+            writer.writerows(batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")  # ✅ Header only (empty export)
+    else:
+        encoder = get_json_encoder()
+        for batch in batches:
+            yield b"".join(encoder.dumps(record) + b"\n" for record in batch)
+
+
+def _gzip_chunks(chunks):
+    """ ✅ On-the-fly gzip: compresses each chunk as it is produced """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # ✅ wbits=31 → gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@log_bp.route('/export', methods=['GET'])
+def export_logs():
+    """ ✅ Streams the log history as NDJSON (default) or CSV with constant memory.
+
+    Query params: format (ndjson|csv), device, username, action, since, until.
+    Records are read & encoded batch by batch while the response is sent;
+    gzip is applied on the fly when the client accepts it.
+    """
+    args = request.args
+    fmt = args.get("format", "ndjson").lower()
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+    since = parse_timestamp(args.get("since"))
+    until = parse_timestamp(args.get("until"))
+    if (args.get("since") and since is None) or (args.get("until") and until is None):
+        return jsonify({"error": "since/until must be 'YYYY-MM-DD HH:MM:SS' or epoch seconds"}), 400
+
+    batches = get_log_store().iter_batches(device=args.get("device"), username=args.get("username"),
+                                           action=args.get("action"), since=since, until=until,
+                                           batch_size=EXPORT_BATCH_SIZE)
+    chunks = _export_chunks(batches, fmt)
+    headers = {"Content-Disposition": f"attachment; filename=logs-export.{fmt}", "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        chunks = _gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(chunks, mimetype=mimetype, headers=headers, direct_passthrough=True)
@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+from flask import Blueprint, Response, g, jsonify, request
+from controllers.auth_controller import get_token_cache
+from utils.metrics import METRICS, SlowRequestSampler
+
+# ✅ Define Blueprint for metrics routes
+metrics_bp = Blueprint('metrics', __name__)
+
+# ✅ Opt-in slow-request sampling profiler: set to a threshold in milliseconds (e.g. 250)
+SLOW_REQUEST_MS = float(os.environ.get("METRICS_SLOW_REQUEST_MS", 0))
+_sampler = {"instance": None}
+
+# ---------------------------------------------
+# 🔹 Request instrumentation (registered by create_app)
+# ---------------------------------------------
+def _loaded(module_name, attribute):
+    """ ✅ A lazily created singleton if its subsystem is already running, else None (a scrape never starts one) """
+    module = sys.modules.get(module_name)
+    return getattr(module, attribute, None) if module is not None else None
+
+
+def _telemetry_buffered():
+    pipeline = _loaded("models.telemetry_model", "_pipeline")  # ✅ Not loaded → no NumPy, no flusher thread
+    return len(pipeline.buffer) if pipeline is not None else 0
+
+
+def _access_requests_pending():
+    queue = _loaded("models.access_model", "_access_queue")  # ✅ Not loaded → no expiry thread
+    return len(queue) if queue is not None else 0
+
+
+def _log_store_bytes():
+    store = _loaded("models.log_model", "_store")  # ✅ Not opened yet → nothing on disk to measure
+    return store.size_bytes() if store is not None else 0
+
+
+def _password_hash_pending():
+    pool = _loaded("utils.password_pool", "_pool")  # ✅ Not created yet → no worker processes
+    return pool.pending if pool is not None else 0
+
+
+def instrument_app(app):
+    """ ✅ Times every request per blueprint & route template and registers the scrape-time gauges """
+    METRICS.describe("http_requests_total", "counter", "Requests by blueprint, route, method & status")
+    METRICS.describe("http_request_duration_seconds", "histogram", "Time to build the response (first byte for streams)")
+    METRICS.describe("log_store_append_seconds", "histogram", "Log append incl. group-committed fsync")
+    METRICS.describe("log_store_fsync_seconds", "histogram", "Flush + fsync of the active log segment")
+    METRICS.describe("log_store_records_appended_total", "counter", "Log records appended")
+    METRICS.describe("device_switches_total", "counter", "Device state changes by device & new status")
+    METRICS.describe("device_toggle_requests_total", "counter", "Toggle requests by result (applied/coalesced/rate_limited)")
+    METRICS.describe("device_toggles_coalesced_total", "counter", "Debounced toggles absorbed without their own state change")
+    METRICS.describe("telemetry_readings_total", "counter", "Telemetry readings by result (accepted/rejected/refused)")
+    METRICS.describe("telemetry_flush_seconds", "histogram", "Write of one buffered telemetry batch")
+    METRICS.gauge("telemetry_buffered_readings", _telemetry_buffered,
+                  "Readings waiting in the ingest ring")
+    METRICS.gauge("access_requests_pending", _access_requests_pending, "Open device-access requests")
+    METRICS.gauge("log_store_bytes", _log_store_bytes, "Log segment bytes on disk")
+    METRICS.gauge("auth_token_cache_hit_ratio", lambda: round(get_token_cache().hit_ratio(), 4),
+                  "Verified-token cache hits / lookups")
+    METRICS.gauge("auth_token_cache_entries", lambda: len(get_token_cache()), "Verified tokens cached")
+    METRICS.gauge("password_hash_pending", _password_hash_pending, "Queued + running hash jobs")
+
+    if SLOW_REQUEST_MS > 0 and _sampler["instance"] is None:  # ✅ One sampler per process, however many apps
+        _sampler["instance"] = SlowRequestSampler(threshold=SLOW_REQUEST_MS / 1000).start()
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        if _sampler["instance"] is not None:
+            _sampler["instance"].begin(request.url_rule.rule if request.url_rule else request.path)
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"  # ✅ Templates keep label cardinality low
+            blueprint = request.blueprint or "app"
+            METRICS.inc("http_requests_total", (("blueprint", blueprint), ("route", route),
+                                                ("method", request.method), ("status", response.status_code)))
+            METRICS.observe("http_request_duration_seconds", time.perf_counter() - started,
+                            (("blueprint", blueprint), ("route", route)))
+        return response
+
+    @app.teardown_request
+    def end_request_sampling(_error=None):
+        if _sampler["instance"] is not None:
+            _sampler["instance"].end()
+
+# ---------------------------------------------
+# 🔹 API Endpoint: Prometheus scrape (GET /metrics)
+# ---------------------------------------------
+@metrics_bp.route('', methods=['GET'])
+def scrape_metrics():
+    """ ✅ Exposes every counter, histogram & gauge in Prometheus text format """
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+# ---------------------------------------------
+# 🔹 API Endpoint: Slow-request profile (GET /metrics/slow)
+# ---------------------------------------------
+@metrics_bp.route('/slow', methods=['GET'])
+def slow_request_profile():
+    """ ✅ Folded stacks sampled from requests slower than METRICS_SLOW_REQUEST_MS """
+    sampler = _sampler["instance"]
+    if sampler is None:
+        return jsonify({"error": "Slow-request sampling is disabled (set METRICS_SLOW_REQUEST_MS)"}), 404
+    return jsonify({"threshold_ms": sampler.threshold * 1000, "stacks": sampler.top()}), 200
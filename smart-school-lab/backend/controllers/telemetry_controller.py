@@ -0,0 +1,72 @@
+from flask import Blueprint, jsonify, request
+from models.log_model import parse_timestamp
+
+# ✅ Define Blueprint for device telemetry (smart plugs, projectors reporting readings)
+telemetry_bp = Blueprint('telemetry', __name__)
+
+MAX_BATCH_READINGS = 10_000  # ✅ Upper bound on readings per POST /telemetry
+
+# ✅ models.telemetry_model (and numpy with it) is imported inside the routes: loaded on first use, not at app start
+
+# ---------------------------------------------
+# 🔹 API Endpoint: Ingest a batch of readings (POST /telemetry)
+# ---------------------------------------------
+@telemetry_bp.route('', methods=['POST'])
+def ingest_telemetry():
+    """ ✅ Accepts batched readings from one or many devices
+
+    Body: {"device_id": 3 (optional default), "readings": [{"device_id", "metric", "value", "ts"}, ...]}.
+    Valid readings are buffered & written in batches (202); invalid ones are listed by index.
+    503 + Retry-After when the ingest buffer is full.
+    """
+    from models.telemetry_model import BufferFull, get_telemetry_pipeline
+
+    data = request.get_json(silent=True)
+    readings = data.get("readings") if isinstance(data, dict) else None
+    if not isinstance(readings, list) or not readings:
+        return jsonify({"error": "readings must be a non-empty list"}), 400
+    if len(readings) > MAX_BATCH_READINGS:
+        return jsonify({"error": f"At most {MAX_BATCH_READINGS} readings per request"}), 400
+
+    try:
+        accepted, errors = get_telemetry_pipeline().ingest(readings, default_device=data.get("device_id"))
+    except BufferFull as e:
+        response = jsonify({"error": "Telemetry buffer full, please retry shortly"})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+    return jsonify({"accepted": accepted, "rejected": errors}), 202 if accepted else 400
+
+# ---------------------------------------------
+# 🔹 API Endpoint: Readings of one device (GET /telemetry/<device_id>)
+# ---------------------------------------------
+@telemetry_bp.route('/<int:device_id>', methods=['GET'])
+def get_device_telemetry(device_id):
+    """ ✅ Time-ordered points for one device
+
+    Query params: metric, since, until (timestamp or epoch; default: the last 24 hours).
+    Recent days come back raw, older days as 1-minute / 1-hour aggregates.
+    """
+    from models.telemetry_model import TELEMETRY_METRICS, get_telemetry_pipeline
+
+    metric = request.args.get("metric")
+    if metric is not None and metric not in TELEMETRY_METRICS:
+        return jsonify({"error": f"metric must be one of {sorted(TELEMETRY_METRICS)}"}), 400
+    since = parse_timestamp(request.args.get("since"))
+    until = parse_timestamp(request.args.get("until"))
+    if (request.args.get("since") and since is None) or (request.args.get("until") and until is None):
+        return jsonify({"error": "since/until must be 'YYYY-MM-DD HH:MM:SS' or epoch seconds"}), 400
+
+    pipeline = get_telemetry_pipeline()
+    return jsonify({"device_id": device_id,
+                    "points": pipeline.store.query(device_id, metric=metric, since=since, until=until)}), 200
+
+# ---------------------------------------------
+# 🔹 API Endpoint: Ingest pipeline status (GET /telemetry/status)
+# ---------------------------------------------
+@telemetry_bp.route('/status', methods=['GET'])
+def get_telemetry_status():
+    """ ✅ Buffer fill level, accepted / rejected / refused counts & bytes written """
+    from models.telemetry_model import get_telemetry_pipeline
+
+    pipeline = get_telemetry_pipeline()
+    return jsonify({**pipeline.status(), "bytes_on_disk": pipeline.store.size_bytes()}), 200
@@ -1,11 +1,12 @@
 from flask import Blueprint, jsonify, request
-from werkzeug.security import generate_password_hash, check_password_hash
+from models.user_model import UserExists, get_user_repository
+from utils.password_pool import PoolSaturated, get_password_pool
+from controllers import auth_controller  # ✅ Module import (auth_controller imports this module too)
 
 # ✅ Define Blueprint for user-related routes
 user_bp = Blueprint('users', __name__)
 
-# ✅ Sample user database (Replace with a real database)
-users = {}  # 🔹 Temporary in-memory storage (Resets after restart)
+MAX_PAGE_SIZE = 500  # ✅ Upper bound for ?limit on GET /users/users
 
 # ---------------------------------------------
 # 🔹 API Endpoint: User Signup (Registration)
@@ -23,18 +24,21 @@ def signup():
     if not username or not email or not password or not role:
         return jsonify({"error": "Missing required fields"}), 400
 
-    if email in users:
+    users = get_user_repository()
+    if users.get_by_email(email) or users.get_by_username(username):  # ✅ Cheap check before hashing
         return jsonify({"error": "User already exists"}), 400
 
-    # ✅ Store user with hashed password for security
-    users[email] = {
-        "id": len(users) + 1,  # Assign a unique ID
-        "username": username,
-        "email": email,
-        "password": generate_password_hash(password),
-        "role": role,
-        "permissions": get_permissions_by_role(role)
-    }
+    # ✅ Hash on the worker pool so a signup burst can't stall other requests
+    try:
+        password_hash = get_password_pool().hash_password(password)
+    except PoolSaturated as e:
+        return busy_response(e)
+
+    # ✅ Store user with hashed password for security (ids are assigned by the repository)
+    try:
+        users.add(username, email, password_hash, role)
+    except UserExists:
+        return jsonify({"error": "User already exists"}), 400
     return jsonify({"message": "User registered successfully", "role": role}), 201
 
 # ---------------------------------------------
@@ -47,22 +51,30 @@ def login():
     email = data.get("email")
     password = data.get("password")
 
-    user = users.get(email)
+    # ✅ Email login; legacy accounts without an email may log in by username
+    users = get_user_repository()
+    user = users.get_by_email(email) if email else users.get_by_username(data.get("username"))
 
-    if not user or not check_password_hash(user["password"], password):
+    try:
+        valid = bool(user) and bool(password) and bool(user["password"]) and get_password_pool().check_password(user["password"], password)
+    except PoolSaturated as e:
+        return busy_response(e)
+    if not valid:
         return jsonify({"error": "Invalid credentials"}), 401
 
     role = user["role"].lower()  # ✅ Normalize role
 
-    print(f"DEBUG: Logging in user {user['username']} with role: {role}")  # ✅ Print role in Flask terminal
+    access_token, refresh_token = auth_controller.issue_tokens(user["username"], role)  # ✅ Bearer tokens for device/log routes
 
     return jsonify({
         "message": f"Welcome {user['username']}, Role: {role}",
+        "access_token": access_token,
+        "refresh_token": refresh_token,
         "user": {
             "id": user["id"],
             "username": user["username"],
             "role": role,  # ✅ Ensure role is correctly sent
-            "permissions": user["permissions"]
+            "permissions": get_permissions_by_role(role)
         }
     }), 200
 
@@ -71,11 +83,34 @@ def login():
 # ---------------------------------------------
 @user_bp.route('/users', methods=['GET'])
 def list_users():
-    """ ✅ Fetches all registered users """
-    return jsonify([
+    """ ✅ Fetches registered users, one keyset page at a time
+
+    Query params: limit (default & max 500), cursor (id of the last user already seen).
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    limit = request.args.get("limit", type=int)
+    cursor = request.args.get("cursor", type=int)
+    if (request.args.get("limit") and limit is None) or (request.args.get("cursor") and cursor is None):
+        return jsonify({"error": "limit and cursor must be integers"}), 400
+    limit = MAX_PAGE_SIZE if limit is None else max(1, min(limit, MAX_PAGE_SIZE))
+
+    page, next_cursor = get_user_repository().page(cursor=cursor, limit=limit)
+    response = jsonify([
         {"id": u["id"], "username": u["username"], "role": u["role"], "email": u["email"]}
-        for u in users.values()
-    ]), 200
+        for u in page
+    ])
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return response, 200
+
+# ---------------------------------------------
+# 🔹 Helper Function: Backpressure Response
+# ---------------------------------------------
+def busy_response(error):
+    """ ✅ 503 + Retry-After when the password hashing pool is saturated """
+    response = jsonify({"error": "Server busy, please retry shortly"})
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response, 503
 
 # ---------------------------------------------
 # 🔹 Helper Function: Get Role-Based Permissions
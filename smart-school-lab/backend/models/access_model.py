@@ -0,0 +1,301 @@
+### `models/access_model.py`
+
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from datetime import datetime
+
+from . import log_model
+from utils.files import write_atomic
+from utils.interprocess import SHARED_POLL_SECONDS, InterProcessLock, shared_state_enabled
+
+ACCESS_REQUEST_TTL_SECONDS = 30 * 60  # ✅ Pending requests nobody decided on expire after 30 minutes
+ROLE_PRIORITY = {"admin": 0, "teacher": 0, "student": 1}  # ✅ Lower rank is served first
+OTHER_PRIORITY = 2  # ✅ Unknown roles queue behind students
+DECISIONS = {"approve": "approved", "deny": "denied"}
+
+
+class AccessQueue:
+    """ ✅ Pending device-access requests, queued per device by role priority.
+
+    Every device has one FIFO (an OrderedDict) per priority rank, so teachers
+    are served before students and requests of one role keep arrival order;
+    enqueue and removal are O(1). Open requests are also indexed by id and by
+    username (O(1) "what am I still waiting for?"). Expiry uses a min-heap of
+    (expires, id) with lazy deletion: decided requests are simply skipped when
+    popped, and one wakeup thread sleeps until the earliest expiry. Open
+    requests persist to data/access_requests.json.
+
+    With ``shared=True`` edits re-read the file under a cross-process lock and
+    copies reload when another worker saved it (same scheme as the Scheduler).
+    """
+
+    def __init__(self, path=None, ttl=ACCESS_REQUEST_TTL_SECONDS, clock=time.time, shared=False):
+        self.path = os.path.abspath(path or os.path.join(log_model.DATA_DIR, "access_requests.json"))
+        self.ttl = ttl
+        self._clock = clock
+        self.shared = shared
+        self._ipc_lock = InterProcessLock(self.path + ".lock") if shared else nullcontext()
+        self._mtime = None
+
+        self._cond = threading.Condition()
+        self._open = {}  # ✅ request id → request dict
+        self._queues = {}  # ✅ device id → [OrderedDict(request id → request), ...] one per rank
+        self._by_user = {}  # ✅ lowercased username → {request id: request}
+        self._heap = []  # ✅ (expires, tie_breaker, request id)
+        self._counter = itertools.count()
+        self._next_id = 1
+        self._listeners = []
+        self._thread = None
+        self._stopped = False
+
+        self._load()
+
+    # ---------------------------------------------
+    # 🔹 Persistence
+    # ---------------------------------------------
+    def _load(self):
+        try:
+            self._mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, "r") as file:
+                state = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self._next_id = state.get("next_id", 1)
+        for request in state.get("requests", []):
+            self._index(request)
+
+    def _save(self):
+        """ ✅ Atomic snapshot of the open requests (caller holds self._cond) """
+        state = {"next_id": self._next_id, "requests": sorted(self._open.values(), key=lambda r: r["id"])}
+        write_atomic(self.path, json.dumps(state, indent=4))
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def _refresh(self):
+        """ ✅ Shared mode: reloads requests another worker saved (caller holds self._cond) """
+        if not self.shared:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            self._open, self._queues, self._by_user, self._heap, self._next_id = {}, {}, {}, [], 1
+            self._load()
+
+    # ---------------------------------------------
+    # 🔹 Indexes
+    # ---------------------------------------------
+    def _index(self, request):
+        self._open[request["id"]] = request
+        queues = self._queues.setdefault(request["device_id"], [OrderedDict() for _ in range(OTHER_PRIORITY + 1)])
+        queues[ROLE_PRIORITY.get(request["role"], OTHER_PRIORITY)][request["id"]] = request
+        self._by_user.setdefault(request["username"].lower(), {})[request["id"]] = request
+        heapq.heappush(self._heap, (request["expires_at"], next(self._counter), request["id"]))
+
+    def _unindex(self, request):
+        del self._open[request["id"]]
+        queues = self._queues[request["device_id"]]
+        del queues[ROLE_PRIORITY.get(request["role"], OTHER_PRIORITY)][request["id"]]
+        if not any(queues):
+            del self._queues[request["device_id"]]
+        mine = self._by_user[request["username"].lower()]
+        del mine[request["id"]]
+        if not mine:
+            del self._by_user[request["username"].lower()]
+        if len(self._heap) > 2 * len(self._open) + 64:  # ✅ Purge decided entries once they dominate the heap
+            self._heap = [item for item in self._heap if item[2] in self._open]
+            heapq.heapify(self._heap)
+
+    def _queued(self, device_id):
+        """ ✅ A device's open requests in serving order (caller holds self._cond) """
+        return [request for queue in self._queues.get(device_id, ()) for request in queue.values()]
+
+    def _expire_due(self, now):
+        """ ✅ Pops every request past its expiry (caller holds self._cond); returns them """
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, request_id = heapq.heappop(self._heap)
+            request = self._open.get(request_id)
+            if request is None:
+                continue  # ✅ Already decided: lazy deletion
+            self._unindex(request)
+            expired.append(dict(request, status="expired"))
+        return expired
+
+    # ---------------------------------------------
+    # 🔹 Listeners (live "access" events)
+    # ---------------------------------------------
+    def add_listener(self, callback):
+        """ ✅ callback(request) after a request is queued, decided or expired (carries its new status) """
+        self._listeners.append(callback)
+
+    def _notify(self, requests):
+        for request in requests:
+            for callback in self._listeners:
+                try:
+                    callback(request)
+                except Exception as e:
+                    print(f"❌ Access request listener failed: {str(e)}")
+
+    # ---------------------------------------------
+    # 🔹 Public API
+    # ---------------------------------------------
+    def submit(self, device, username, role=None):
+        """ ✅ Queues a request for ``device`` and returns (request, created).
+
+        Asking again for a device you are already waiting on returns the open
+        request instead of queueing a duplicate.
+        """
+        now = self._clock()
+        with self._cond, self._ipc_lock:
+            self._refresh()
+            expired = self._expire_due(now)
+            mine = self._by_user.get(username.lower(), {}).values()
+            request = next((r for r in mine if r["device_id"] == device["id"]), None)
+            created = request is None
+            if created:
+                request = {
+                    "id": self._next_id,
+                    "device_id": device["id"],
+                    "device": device["name"],
+                    "username": username,
+                    "role": role or "student",
+                    "status": "pending",
+                    "created": datetime.fromtimestamp(now).strftime(log_model.TIMESTAMP_FORMAT),
+                    "expires_at": now + self.ttl,
+                }
+                self._next_id += 1
+                self._index(request)
+                self._cond.notify()  # ✅ Wake the expiry thread in case this is the new earliest
+            if created or expired:
+                self._save()
+            request = dict(request)
+        self._notify(expired + ([request] if created else []))
+        return request, created
+
+    def pending(self, device_id=None):
+        """ ✅ Open requests in serving order: one device's queue, or every device's by device id """
+        with self._cond:
+            self._refresh()
+            if device_id is not None:
+                return [dict(request) for request in self._queued(device_id)]
+            return [dict(request) for device in sorted(self._queues) for request in self._queued(device)]
+
+    def for_user(self, username):
+        """ ✅ A user's open requests (oldest first) """
+        with self._cond:
+            self._refresh()
+            mine = self._by_user.get(str(username).lower(), {})
+            return [dict(request) for request in sorted(mine.values(), key=lambda r: r["id"])]
+
+    def decide(self, decision, decided_by, ids=None, device_id=None):
+        """ ✅ Approves or denies many requests in one call.
+
+        ``ids`` decides exactly those requests (unknown or already closed ones
+        come back with an "error"); ``device_id`` decides that device's whole
+        queue in serving order. One save covers the batch. Returns per-request results.
+        """
+        status = DECISIONS[decision]
+        now = self._clock()
+        decided_at = datetime.fromtimestamp(now).strftime(log_model.TIMESTAMP_FORMAT)
+        with self._cond, self._ipc_lock:
+            self._refresh()
+            expired = self._expire_due(now)
+            if ids is None:
+                ids = [request["id"] for request in self._queued(device_id)]
+            results, decided = [], []
+            for request_id in ids:
+                request = self._open.get(request_id)
+                if request is None:
+                    results.append({"id": request_id, "error": "Request not found or no longer pending"})
+                    continue
+                self._unindex(request)
+                request = dict(request, status=status, decided_by=decided_by, decided=decided_at)
+                decided.append(request)
+                results.append(request)
+            if decided or expired:
+                self._save()
+        self._notify(expired + decided)
+        return results
+
+    def expire(self, now=None):
+        """ ✅ Drops every request past its expiry and returns them (used by tests & the wakeup thread) """
+        with self._cond, self._ipc_lock:
+            self._refresh()
+            expired = self._expire_due(self._clock() if now is None else now)
+            if expired:
+                self._save()
+        self._notify(expired)
+        return expired
+
+    def __len__(self):
+        with self._cond:
+            self._refresh()
+            return len(self._open)
+
+    # ---------------------------------------------
+    # 🔹 Expiry thread
+    # ---------------------------------------------
+    def start(self):
+        """ ✅ Starts the single wakeup thread (idempotent) """
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._loop, name="access-expiry", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _loop(self):
+        with self._cond:
+            while not self._stopped:
+                self._refresh()
+                now = self._clock()
+                if self._heap and self._heap[0][0] <= now:
+                    self._cond.release()  # ✅ expire() takes the cross-process lock first
+                    try:
+                        self.expire(now)
+                    except Exception as e:
+                        print(f"❌ Access request expiry failed: {str(e)}")
+                    finally:
+                        self._cond.acquire()
+                    continue
+                timeout = self._heap[0][0] - now if self._heap else None
+                if self.shared:
+                    timeout = SHARED_POLL_SECONDS * 10 if timeout is None else min(timeout, SHARED_POLL_SECONDS * 10)
+                self._cond.wait(timeout)
+
+
+# ---------------------------------------------
+# 🔹 Shared access queue instance
+# ---------------------------------------------
+_access_queue = None
+_access_queue_lock = threading.Lock()
+
+
+def get_access_queue():
+    """ ✅ Returns the process-wide AccessQueue, reloading open requests & starting expiry on first use """
+    global _access_queue
+    if _access_queue is None:
+        with _access_queue_lock:
+            if _access_queue is None:
+                _access_queue = AccessQueue(shared=shared_state_enabled()).start()
+    return _access_queue
+
+
+def set_access_queue(queue):
+    """ ✅ Replaces the shared AccessQueue (used by tests) """
+    global _access_queue
+    with _access_queue_lock:
+        previous, _access_queue = _access_queue, queue
+    return previous
@@ -0,0 +1,289 @@
+### `models/analytics_model.py`
+
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from . import log_model
+from .log_model import get_log_store
+from .usage_model import local_seconds
+from utils.exit_hooks import register_exit_hook
+from utils.files import write_atomic
+
+HOUR_SECONDS = 60 * 60
+ROLLUP_SNAPSHOT_DELAY_SECONDS = 5  # ✅ Coalesce rollup persistence after bursts of appends
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def weekday_hour(hour_number):
+    """ ✅ Local hour number (hours since epoch) → (weekday Mon=0, hour of day) """
+    return (hour_number // 24 + 3) % 7, hour_number % 24  # 🔹 1970-01-01 was a Thursday
+
+
+# ---------------------------------------------
+# 🔹 Columnar view of the event log
+# ---------------------------------------------
+class LogColumns:
+    """ ✅ Event log as NumPy columns with categorical codes for device / user / action """
+
+    def __init__(self, records):
+        devices, users, actions = {}, {}, {}
+        moments, device_codes, user_codes, action_codes = [], [], [], []
+        for record in records:
+            try:
+                moment = local_seconds(record["timestamp"])
+            except (KeyError, ValueError):
+                continue
+            moments.append(moment)
+            device_codes.append(devices.setdefault(record.get("device") or "", len(devices)))
+            user_codes.append(users.setdefault(record.get("username") or "", len(users)))
+            action_codes.append(actions.setdefault(record.get("action") or "", len(actions)))
+
+        self.moments = np.array(moments, dtype=np.float64)
+        self.device = np.array(device_codes, dtype=np.int32)
+        self.user = np.array(user_codes, dtype=np.int32)
+        self.action = np.array(action_codes, dtype=np.int32)
+        self.devices = np.array(list(devices), dtype=object)
+        self.users = np.array(list(users), dtype=object)
+        self.actions = np.array(list(actions), dtype=object)
+
+    def __len__(self):
+        return len(self.moments)
+
+    def action_code(self, action):
+        matches = np.nonzero(self.actions == action)[0]
+        return int(matches[0]) if len(matches) else -1
+
+
+def run_batch_report(records, since=None, until=None, top=10):
+    """ ✅ Term utilization report computed in vectorized passes over the log columns.
+
+    Returns the weekday×hour heatmap, busiest hours, top users, per-device
+    duty cycles over [since, until] and ON-session length percentiles.
+    """
+    columns = LogColumns(records)
+    result = {"events": len(columns), "heatmap": [[0] * 24 for _ in range(7)], "busiest_hours": [],
+              "top_users": [], "duty_cycles": {}, "session_minutes": {}}
+    if not len(columns):
+        return result
+
+    start = columns.moments.min() if since is None else since
+    end = columns.moments.max() if until is None else until
+    window = (columns.moments >= start) & (columns.moments <= end)
+
+    # ✅ Heatmap & busiest hours: one bincount over weekday*24 + hour
+    hours = np.floor_divide(columns.moments[window], HOUR_SECONDS).astype(np.int64)
+    cells = np.bincount(((hours // 24 + 3) % 7) * 24 + hours % 24, minlength=7 * 24).reshape(7, 24)
+    result["heatmap"] = cells.tolist()
+    for flat in np.argsort(-cells, axis=None, kind="stable")[:top]:
+        if cells.flat[flat]:
+            result["busiest_hours"].append({"weekday": WEEKDAYS[flat // 24], "hour": int(flat % 24),
+                                            "events": int(cells.flat[flat])})
+
+    # ✅ Top users by number of actions
+    per_user = np.bincount(columns.user[window], minlength=len(columns.users))
+    ranked = sorted((-int(per_user[code]), columns.users[code]) for code in np.nonzero(per_user)[0] if columns.users[code])
+    result["top_users"] = [{"username": username, "actions": -count} for count, username in ranked[:top]]
+
+    # ✅ ON sessions: consecutive events of one device where the earlier one left it ON
+    on_code, off_code = columns.action_code("on"), columns.action_code("off")
+    switch = (columns.action == on_code) | (columns.action == off_code)
+    codes, moments = columns.device[switch], columns.moments[switch]
+    is_on = columns.action[switch] == on_code
+    order = np.argsort(codes, kind="stable")
+    codes, moments, is_on = codes[order], moments[order], is_on[order]
+    same = codes[1:] == codes[:-1]
+    counted = is_on[:-1] & same
+    session_device = codes[:-1][counted]
+    session_start, session_end = moments[:-1][counted], moments[1:][counted]
+    still_on = is_on & np.append(~same, True)  # ✅ last event of its device is ON → runs until `end`
+    session_device = np.concatenate([session_device, codes[still_on]])
+    session_start = np.concatenate([session_start, moments[still_on]])
+    session_end = np.concatenate([session_end, np.full(int(still_on.sum()), end)])
+
+    clipped = np.clip(np.minimum(session_end, end) - np.maximum(session_start, start), 0, None)
+    on_seconds = np.bincount(session_device, weights=clipped, minlength=len(columns.devices))
+    span = max(end - start, 1)
+    durations = (session_end - session_start) / 60
+    for code, name in enumerate(columns.devices):
+        if not name:
+            continue
+        result["duty_cycles"][name] = round(float(on_seconds[code]) / span, 4)
+        mine = durations[(session_device == code) & (clipped > 0)]  # ✅ Sessions overlapping the window
+        if len(mine):
+            p50, p90, p99 = np.percentile(mine, [50, 90, 99])
+            result["session_minutes"][name] = {"sessions": int(len(mine)), "p50": round(float(p50), 1),
+                                               "p90": round(float(p90), 1), "p99": round(float(p99), 1)}
+    return result
+
+
+# ---------------------------------------------
+# 🔹 Pre-aggregated hourly buckets (persisted, updated on append)
+# ---------------------------------------------
+class HourlyRollup:
+    """ ✅ Event counts per (local hour, device, user, action), kept incrementally.
+
+    Persisted to data/analytics/hourly_rollups.json together with the last
+    log seq it covers, so a restart only replays the records appended since.
+    Heatmap / top-user reports read these buckets instead of the raw log.
+    """
+
+    def __init__(self, path=None, snapshot_delay=ROLLUP_SNAPSHOT_DELAY_SECONDS):
+        self.path = os.path.abspath(path or os.path.join(log_model.DATA_DIR, "analytics", "hourly_rollups.json"))
+        self.snapshot_delay = snapshot_delay
+        self.through_seq = -1  # ✅ Highest log seq already counted
+        self._buckets = {}  # ✅ hour number → {(device, username, action): count}
+        self._hours = []  # ✅ Sorted hour numbers for range queries
+        self._lock = threading.Lock()
+        self._timer = None
+        self._load()
+
+    # ---------------------------------------------
+    # 🔹 Persistence
+    # ---------------------------------------------
+    def _load(self):
+        try:
+            with open(self.path, "r") as file:
+                state = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.through_seq = state.get("through_seq", -1)
+        for hour, device, username, action, count in state.get("buckets", []):
+            self._add(hour, (device, username, action), count)
+
+    def flush(self):
+        """ ✅ Atomically writes the buckets & covered seq """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            state = {"through_seq": self.through_seq, "buckets": [
+                [hour, *key, count] for hour in self._hours for key, count in self._buckets[hour].items()]}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_atomic(self.path, json.dumps(state, separators=(",", ":")))
+
+    def _schedule_flush(self):
+        """ ✅ Coalesced snapshot (caller holds self._lock) """
+        if self.snapshot_delay <= 0:
+            return
+        if self._timer is None:
+            self._timer = threading.Timer(self.snapshot_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # ---------------------------------------------
+    # 🔹 Updates
+    # ---------------------------------------------
+    def _add(self, hour, key, count):
+        bucket = self._buckets.get(hour)
+        if bucket is None:
+            bucket = self._buckets[hour] = {}
+            if not self._hours or hour > self._hours[-1]:
+                self._hours.append(hour)
+            else:
+                self._hours.insert(bisect_left(self._hours, hour), hour)
+        bucket[key] = bucket.get(key, 0) + count
+
+    def observe_many(self, records):
+        """ ✅ O(1) per record: bump its hourly bucket """
+        with self._lock:
+            for record in records:
+                if record.get("seq", -1) <= self.through_seq:
+                    continue  # ✅ Already counted (replay after restart)
+                try:
+                    hour = int(local_seconds(record["timestamp"]) // HOUR_SECONDS)
+                except (KeyError, ValueError):
+                    continue
+                self._add(hour, (record.get("device"), record.get("username"), record.get("action")), 1)
+                self.through_seq = max(self.through_seq, record.get("seq", self.through_seq))
+            self._schedule_flush()
+
+    def rebuild(self, records):
+        """ ✅ Vectorized bulk load: one np.unique over (hour, device, user, action) codes.
+
+        Holds the rollup lock throughout. ``records`` may be a callable; it is
+        then loaded under the lock too, so a record appended meanwhile is either
+        in the load or observed after it (skipped by seq if already counted).
+        """
+        with self._lock:
+            if callable(records):
+                records = records()
+            columns = LogColumns(records)
+            seqs = [record["seq"] for record in records if "seq" in record]
+            self._buckets, self._hours = {}, []
+            if len(columns):
+                hours = np.floor_divide(columns.moments, HOUR_SECONDS).astype(np.int64)
+                stacked = np.stack([hours, columns.device, columns.user, columns.action], axis=1)
+                keys, counts = np.unique(stacked, axis=0, return_counts=True)
+                for (hour, device, user, action), count in zip(keys.tolist(), counts.tolist()):
+                    self._add(hour, (columns.devices[device] or None, columns.users[user] or None,
+                                     columns.actions[action] or None), count)
+            self.through_seq = max(seqs, default=-1)
+        self.flush()
+
+    # ---------------------------------------------
+    # 🔹 Reports served from the buckets
+    # ---------------------------------------------
+    def _iter_range(self, since=None, until=None):
+        lo = 0 if since is None else bisect_left(self._hours, int(since // HOUR_SECONDS))
+        hi = len(self._hours) if until is None else bisect_right(self._hours, int(until // HOUR_SECONDS))
+        for hour in self._hours[lo:hi]:
+            for key, count in self._buckets[hour].items():
+                yield hour, key, count
+
+    def heatmap(self, since=None, until=None, device=None, action=None):
+        """ ✅ 7×24 matrix (Mon..Sun × hour of day) of action counts """
+        cells = [[0] * 24 for _ in range(7)]
+        with self._lock:
+            for hour, (bucket_device, _, bucket_action), count in self._iter_range(since, until):
+                if (device is None or bucket_device == device) and (action is None or bucket_action == action):
+                    weekday, hour_of_day = weekday_hour(hour)
+                    cells[weekday][hour_of_day] += count
+        return cells
+
+    def top_users(self, since=None, until=None, limit=10):
+        totals = {}
+        with self._lock:
+            for _, (_, username, _), count in self._iter_range(since, until):
+                if username:
+                    totals[username] = totals.get(username, 0) + count
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{"username": username, "actions": count} for username, count in ranked]
+
+    def busiest_hours(self, since=None, until=None, limit=5):
+        cells = self.heatmap(since, until)
+        ranked = sorted((-cells[d][h], d, h) for d in range(7) for h in range(24))[:limit]
+        return [{"weekday": WEEKDAYS[d], "hour": h, "events": -count} for count, d, h in ranked if count]
+
+
+# ---------------------------------------------
+# 🔹 Shared rollup (caught up from the log once, then fed by its append listener)
+# ---------------------------------------------
+_analytics = {"store": None, "rollup": None}
+_analytics_lock = threading.Lock()
+
+
+def get_hourly_rollup():
+    """ ✅ Returns the HourlyRollup for the current log store, replaying only unseen records """
+    store = get_log_store()
+    if _analytics["store"] is not store:
+        with _analytics_lock:
+            if _analytics["store"] is not store:
+                rollup = HourlyRollup(path=os.path.join(store.data_dir, "analytics", "hourly_rollups.json"))
+                store.add_listener(rollup.observe_many)  # ✅ Before the catch-up so no append is missed
+                register_exit_hook(_flush_rollup_at_exit)
+                if rollup.through_seq < 0:
+                    rollup.rebuild(store.all)
+                else:
+                    rollup.observe_many(store.query(cursor=rollup.through_seq)[0])
+                _analytics.update(store=store, rollup=rollup)
+    return _analytics["rollup"]
+
+
+def _flush_rollup_at_exit():
+    """ ✅ Persists the current rollup's pending snapshot on shutdown """
+    if _analytics["rollup"] is not None:
+        _analytics["rollup"].flush()
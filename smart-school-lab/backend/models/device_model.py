@@ -1,21 +1,553 @@
 ### `models/device_model.py`
 
-from .log_model import logs
+import itertools
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 
+from . import log_model
+from .log_model import get_log_store
+from utils.exit_hooks import register_exit_hook
+from utils.files import write_atomic
+from utils.interprocess import SHARED_POLL_SECONDS, InterProcessLock, shared_state_enabled
+from utils.metrics import METRICS
 
-devices = [
-    {"id": 1, "name": "Projector", "status": "off", "total_usage_hours": 0},
-    {"id": 2, "name": "Smart Light", "status": "off", "total_usage_hours": 3.5},
-    {"id": 3, "name": "Fan", "status": "on", "total_usage_hours": 1.2},
+# ✅ Seed registry used only when data/devices.json does not exist yet (mirrors the shipped file)
+DEFAULT_DEVICES = [
+    {"id": 1, "name": "Computer", "status": "off", "total_usage_hours": 0},
+    {"id": 2, "name": "Projector", "status": "off", "total_usage_hours": 0},
+    {"id": 3, "name": "Smart Board", "status": "off", "total_usage_hours": 0},
 ]
+SNAPSHOT_DELAY_SECONDS = 0.5  # ✅ Coalesce bursts of mutations into one devices.json snapshot
+
+SHARED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    doc TEXT NOT NULL  -- the device dict as JSON
+);
+"""
+SELECT_DEVICES = "SELECT id, doc FROM devices ORDER BY id"
+UPSERT_DEVICE = "INSERT INTO devices (id, doc) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET doc = excluded.doc"
+DELETE_DEVICE = "DELETE FROM devices WHERE id = ?"
+
+_versions = itertools.count(1)  # ✅ Process-wide: versions never repeat, even across swapped instances
+
+
+class DeviceRegistry:
+    """ ✅ Thread-safe device registry with an id → device hash index.
+
+    Optional ``room`` / ``type`` fields are kept in secondary indexes. Every
+    mutation marks the registry dirty and a coalesced, atomic snapshot
+    (write temp file → fsync → rename) persists it to devices.json.
+    Callers always receive copies, never the live dicts.
+    """
+
+    def __init__(self, path=None, snapshot_delay=SNAPSHOT_DELAY_SECONDS):
+        self.path = os.path.abspath(path or os.path.join(log_model.DATA_DIR, "devices.json"))
+        self.snapshot_delay = snapshot_delay
+
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._by_id = {}
+        self._by_room = {}  # ✅ room → set of device ids
+        self._by_type = {}  # ✅ type → set of device ids
+        self._dirty = False
+        self._timer = None
+        self._device_locks = {}  # ✅ device id → Lock serializing state change + its log entry
+        self._listeners = []  # ✅ Callbacks notified with a copy of every changed device
+        self.version = next(_versions)  # ✅ Re-drawn on every mutation (drives HTTP ETags)
+
+        self._load()
+
+    # ---------------------------------------------
+    # 🔹 Persistence
+    # ---------------------------------------------
+    def _load(self):
+        try:
+            with open(self.path, "r") as file:
+                devices = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            devices = [dict(device) for device in DEFAULT_DEVICES]
+            self._dirty = True
+        for device in devices:
+            self._insert(dict(device))
+        if self._dirty:
+            self.flush()
+
+    def flush(self):
+        """ ✅ Atomically writes the registry to devices.json if it changed """
+        with self._write_lock:  # ✅ Snapshots land on disk in the order they were taken
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                payload = self._serialize()
+                self._dirty = False
+            self._write(payload)
+
+    def _serialize(self):
+        return json.dumps([self._by_id[device_id] for device_id in sorted(self._by_id)], indent=4)
+
+    def _write(self, payload):
+        write_atomic(self.path, payload)  # ✅ Readers never see a half-written file
+
+    def add_listener(self, listener):
+        """ ✅ Registers ``listener(device)`` called after each mutation (deleted devices carry "deleted": True) """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _changed(self, device):
+        """ ✅ Persists & notifies listeners in mutation order (caller holds self._lock) """
+        self.version = next(_versions)
+        self._mark_dirty()
+        self._notify(device)
+        return dict(device)
+
+    def _notify(self, device):
+        for listener in list(self._listeners):
+            try:
+                listener(dict(device))
+            except Exception as e:
+                print(f"❌ Device registry listener failed: {str(e)}")
+
+    def _mark_dirty(self):
+        """ ✅ Schedules a snapshot (caller holds self._lock) """
+        self._dirty = True
+        if self.snapshot_delay <= 0:
+            self._dirty = False
+            self._write(self._serialize())  # ✅ Synchronous mode: snapshot under the registry lock
+        elif self._timer is None:
+            self._timer = threading.Timer(self.snapshot_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # ---------------------------------------------
+    # 🔹 Index maintenance
+    # ---------------------------------------------
+    def _insert(self, device):
+        self._by_id[device["id"]] = device
+        if device.get("room") is not None:
+            self._by_room.setdefault(device["room"], set()).add(device["id"])
+        if device.get("type") is not None:
+            self._by_type.setdefault(device["type"], set()).add(device["id"])
+
+    def _remove(self, device):
+        del self._by_id[device["id"]]
+        for index, key in ((self._by_room, "room"), (self._by_type, "type")):
+            ids = index.get(device.get(key))
+            if ids is not None:
+                ids.discard(device["id"])
+                if not ids:
+                    del index[device[key]]
+
+    # ---------------------------------------------
+    # 🔹 Reads
+    # ---------------------------------------------
+    def get(self, device_id):
+        """ ✅ O(1) lookup by id; returns a copy or None """
+        with self._lock:
+            device = self._by_id.get(device_id)
+            return dict(device) if device else None
+
+    def all(self, room=None, device_type=None):
+        """ ✅ Lists devices (sorted by id), optionally narrowed by room and/or type """
+        with self._lock:
+            ids = None
+            for index, value in ((self._by_room, room), (self._by_type, device_type)):
+                if value is not None:
+                    matches = index.get(value, set())
+                    ids = matches if ids is None else ids & matches
+            if ids is None:
+                ids = self._by_id.keys()
+            return [dict(self._by_id[device_id]) for device_id in sorted(ids)]
+
+    def device_lock(self, device_id):
+        """ ✅ Returns the per-device lock (created on first use) """
+        with self._lock:
+            lock = self._device_locks.get(device_id)
+            if lock is None:
+                lock = self._device_locks[device_id] = threading.Lock()
+            return lock
+
+    def rooms(self):
+        with self._lock:
+            return sorted(self._by_room)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    # ---------------------------------------------
+    # 🔹 Mutations
+    # ---------------------------------------------
+    def add(self, device):
+        """ ✅ Registers a device, assigning the next free id when none is given """
+        with self._lock:
+            device = dict(device)
+            if device.get("id") is None:
+                device["id"] = max(self._by_id, default=0) + 1
+            if device["id"] in self._by_id:
+                raise ValueError(f"Device {device['id']} already exists")
+            device.setdefault("status", "off")
+            device.setdefault("total_usage_hours", 0)
+            self._insert(device)
+            return self._changed(device)
+
+    def update(self, device_id, **fields):
+        """ ✅ Updates fields of one device (re-indexing room/type) and returns a copy """
+        with self._lock:
+            device = self._by_id.get(device_id)
+            if device is None:
+                return None
+            self._remove(device)
+            device.update(fields)
+            device["id"] = device_id
+            self._insert(device)
+            return self._changed(device)
+
+    def delete(self, device_id):
+        with self._lock:
+            device = self._by_id.get(device_id)
+            if device is None:
+                return False
+            self._remove(device)
+            self._changed({**device, "deleted": True})
+            return True
+
+    def set_status(self, device_id, status):
+        """ ✅ Sets an explicit "on"/"off" status """
+        with self._lock:
+            device = self._by_id.get(device_id)
+            if device is None:
+                return None
+            device["status"] = status
+            return self._changed(device)
+
+    def set_statuses(self, changes):
+        """ ✅ Applies several {device id: "on"|"off"} changes in one critical section; returns the changed devices """
+        with self._lock:
+            changed = []
+            for device_id, status in changes.items():
+                device = self._by_id.get(device_id)
+                if device is not None and device["status"] != status:
+                    device["status"] = status
+                    changed.append(self._changed(device))
+            return changed
+
+    def toggle(self, device_id):
+        """ ✅ Atomically flips a device ON/OFF and returns the new state """
+        with self._lock:
+            device = self._by_id.get(device_id)
+            if device is None:
+                return None
+            device["status"] = "on" if device["status"] == "off" else "off"
+            return self._changed(device)
+
+
+class SharedDeviceRegistry(DeviceRegistry):
+    """ ✅ DeviceRegistry whose source of truth is SQLite (WAL), shared by every worker process.
+
+    Each worker keeps the usual in-memory indexes as a cache. Before a read it
+    asks SQLite for ``PRAGMA data_version`` (which changes only when another
+    connection has committed) and reloads the rows if it moved. Mutations run
+    inside ``BEGIN IMMEDIATE``, so toggles from different workers are
+    serialized and always apply to the latest state. Per-device locks are
+    cross-process, which keeps the log in state-change order. Once a listener
+    is registered, a poller thread picks up other workers' changes and reports
+    them to the listeners (live /devices/stream events from every worker).
+    """
+
+    def __init__(self, path=None, poll_interval=SHARED_POLL_SECONDS):
+        self.db_path = os.path.abspath(path or os.path.join(log_model.DATA_DIR, "state.db"))
+        self.poll_interval = poll_interval
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SHARED_SCHEMA)
+        self._data_version = None
+        self._pending = []  # ✅ Devices changed by the open transaction (written & announced on commit)
+        self._poller = None
+        self._stopped = threading.Event()
+        super().__init__(path=os.path.join(os.path.dirname(self.db_path), "devices.json"))
+
+    @property
+    def version(self):
+        self._sync()
+        return self._version
+
+    @version.setter
+    def version(self, value):
+        self._version = value
+
+    # ---------------------------------------------
+    # 🔹 SQLite state
+    # ---------------------------------------------
+    def _load(self):
+        """ ✅ Seeds the table from devices.json (or the defaults) once, then loads it """
+        with self._lock, self._transaction():
+            if self._db.execute("SELECT COUNT(*) FROM devices").fetchone()[0] == 0:
+                try:
+                    with open(self.path, "r") as file:
+                        devices = json.load(file)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    devices = DEFAULT_DEVICES
+                self._db.executemany(UPSERT_DEVICE, [(device["id"], json.dumps(device)) for device in devices])
+            self._data_version = None  # ✅ Force the reload below (our own commit doesn't move data_version)
+        with self._lock:
+            self._refresh_locked()
+
+    @contextmanager
+    def _transaction(self):
+        """ ✅ Cross-process write transaction (caller holds self._lock) """
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._refresh_locked()  # ✅ Apply other workers' commits before mutating
+            yield
+            for device in self._pending:
+                if device.get("deleted"):
+                    self._db.execute(DELETE_DEVICE, (device["id"],))
+                else:
+                    self._db.execute(UPSERT_DEVICE, (device["id"], json.dumps(device)))
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            self._pending = []
+            self._data_version = None
+            self._refresh_locked()  # ✅ Undo the in-memory half of the failed mutation
+            raise
+        pending, self._pending = self._pending, []
+        for device in pending:
+            self._notify(device)
+
+    def _refresh_locked(self):
+        """ ✅ Reloads the rows if another connection committed; returns the devices that changed """
+        data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return []
+        self._data_version = data_version
+        fresh = {row[0]: json.loads(row[1]) for row in self._db.execute(SELECT_DEVICES)}
+        changed = [device for device_id, device in fresh.items() if self._by_id.get(device_id) != device]
+        changed += [{**device, "deleted": True} for device_id, device in self._by_id.items() if device_id not in fresh]
+        if changed:
+            self._by_id, self._by_room, self._by_type = {}, {}, {}
+            for device in fresh.values():
+                self._insert(device)
+            self._version = next(_versions)
+        return changed
+
+    def _sync(self):
+        """ ✅ Catches up with other workers (one PRAGMA when nothing changed) """
+        with self._lock:
+            for device in self._refresh_locked():
+                self._notify(device)
+
+    def _changed(self, device):
+        self._version = next(_versions)
+        self._pending.append(dict(device))
+        return dict(device)
+
+    def flush(self):
+        """ ✅ Nothing to do: every mutation is committed to SQLite """
+
+    def close(self):
+        self._stopped.set()
+        with self._lock:
+            self._db.close()
+
+    # ---------------------------------------------
+    # 🔹 Change notification
+    # ---------------------------------------------
+    def add_listener(self, listener):
+        super().add_listener(listener)
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="device-state-poller", daemon=True)
+                self._poller.start()
+
+    def _poll(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self._sync()
+            except sqlite3.Error as e:
+                print(f"❌ Device state poll failed: {str(e)}")
+
+    # ---------------------------------------------
+    # 🔹 Reads & mutations (always against the latest committed state)
+    # ---------------------------------------------
+    def get(self, device_id):
+        self._sync()
+        return super().get(device_id)
+
+    def all(self, room=None, device_type=None):
+        self._sync()
+        return super().all(room=room, device_type=device_type)
+
+    def rooms(self):
+        self._sync()
+        return super().rooms()
+
+    def __len__(self):
+        self._sync()
+        return super().__len__()
+
+    def device_lock(self, device_id):
+        """ ✅ Per-device lock shared by every worker (state change + log append stay in order) """
+        with self._lock:
+            lock = self._device_locks.get(device_id)
+            if lock is None:
+                lock = self._device_locks[device_id] = InterProcessLock(
+                    os.path.join(os.path.dirname(self.db_path), "locks", f"device-{device_id}.lock"))
+            return lock
+
+    def add(self, device):
+        with self._lock, self._transaction():
+            return super().add(device)
+
+    def update(self, device_id, **fields):
+        with self._lock, self._transaction():
+            return super().update(device_id, **fields)
+
+    def delete(self, device_id):
+        with self._lock, self._transaction():
+            return super().delete(device_id)
+
+    def set_status(self, device_id, status):
+        with self._lock, self._transaction():
+            return super().set_status(device_id, status)
+
+    def set_statuses(self, changes):
+        with self._lock, self._transaction():
+            return super().set_statuses(changes)
+
+    def toggle(self, device_id):
+        with self._lock, self._transaction():
+            return super().toggle(device_id)
+
+
+# ---------------------------------------------
+# 🔹 Shared registry instance (lazy, swappable for tests)
+# ---------------------------------------------
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_device_registry():
+    """ ✅ Returns the process-wide DeviceRegistry (SQLite-backed when workers share state), loading it on first use """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SharedDeviceRegistry() if shared_state_enabled() else DeviceRegistry()
+                register_exit_hook(_flush_registry_at_exit)
+    return _registry
+
+
+def set_device_registry(registry):
+    """ ✅ Replaces the shared DeviceRegistry (used by tests) """
+    global _registry
+    with _registry_lock:
+        previous, _registry = _registry, registry
+    return previous
+
+
+def _flush_registry_at_exit():
+    """ ✅ Don't lose the current registry's pending snapshot on shutdown """
+    if _registry is not None:
+        _registry.flush()
+
 
 def find_device_by_id(device_id):
-    return next((device for device in devices if device["id"] == device_id), None)
-
-def toggle_device_status(device_id, action):
-    device = find_device_by_id(device_id)
-    if device and action in ["on", "off"]:
-        device["status"] = action
-        logs.append({"device_id": device_id, "action": action})
-        return {"message": f"Device '{device['name']}' turned {action}"}
-    return {"error": "Invalid request"}
\ No newline at end of file
+    return get_device_registry().get(device_id)
+
+# ---------------------------------------------
+# 🔹 Device Commands (single code path for routes, schedules & bulk actions)
+# ---------------------------------------------
+def apply_device_action(device_id, action=None, username="System User"):
+    """ ✅ Switches a device and appends its log entry as one per-device critical section.
+
+    ``action`` is "on"/"off", or None to toggle. Holding the device's lock across
+    the state change *and* the log append keeps the log order identical to the
+    order of state changes, while different devices proceed in parallel.
+    Returns ``(device, log_record)`` or ``(None, None)`` if the device is unknown.
+    """
+    registry = get_device_registry()
+    with registry.device_lock(device_id):
+        if action is None:
+            device = registry.toggle(device_id)
+        else:
+            device = registry.set_status(device_id, action)
+        if device is None:
+            return None, None
+        METRICS.inc("device_switches_total", (("device", device["name"]), ("status", device["status"])))
+        record = get_log_store().append({
+            "action": device["status"],
+            "device": device["name"],
+            "username": username,
+            "timestamp": datetime.now().strftime(log_model.TIMESTAMP_FORMAT),
+        })
+        return device, record
+
+def toggle_device_status(device_id, action, username="System User"):
+    return toggle_device_statuses([(device_id, action)], username)[0]
+
+
+def toggle_device_statuses(commands, username="System User"):
+    """ ✅ Applies explicit (device_id, "on"|"off") commands all-or-nothing.
+
+    Every command is validated first; if any is invalid nothing is applied.
+    Otherwise the devices' locks are taken (in id order, so concurrent batches
+    can't deadlock), all states change in one registry critical section and
+    every resulting log entry goes out in one batched append. Devices already
+    in the requested state are reported with "changed": False and not logged.
+    Returns one result per command, in order.
+    """
+    registry = get_device_registry()
+    results, changes = [], {}
+    for device_id, action in commands:
+        if type(device_id) not in (int, str):  # ✅ e.g. a list from JSON: unhashable, never a device
+            results.append({"id": device_id, "error": "Invalid request"})
+            continue
+        device = registry.get(device_id)
+        if action not in ["on", "off"] or device_id in changes:
+            results.append({"id": device_id, "error": "Invalid request"})
+        elif device is None:
+            results.append({"id": device_id, "error": "Device not found"})
+        else:
+            results.append({"id": device_id})
+            changes[device_id] = action
+    if len(changes) != len(commands):
+        return results
+
+    locks = [registry.device_lock(device_id) for device_id in sorted(changes)]
+    for lock in locks:
+        lock.acquire()
+    try:
+        changed = {device["id"]: device for device in registry.set_statuses(changes)}
+        for device in changed.values():
+            METRICS.inc("device_switches_total", (("device", device["name"]), ("status", device["status"])))
+        timestamp = datetime.now().strftime(log_model.TIMESTAMP_FORMAT)
+        get_log_store().append_many([
+            {"action": device["status"], "device": device["name"], "username": username, "timestamp": timestamp}
+            for device in changed.values()
+        ])
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+    for result in results:
+        action = changes[result["id"]]
+        device = changed.get(result["id"]) or registry.get(result["id"])
+        if device is None:  # ✅ Deleted while the batch was validated
+            result["error"] = "Device not found"
+            continue
+        result.update(status=action, changed=result["id"] in changed,
+                      message=f"Device '{device['name']}' turned {action}")
+    return results
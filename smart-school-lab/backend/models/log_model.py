@@ -1,3 +1,661 @@
 ### `models/log_model.py`
 
-logs = []
\ No newline at end of file
+import gzip
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager, nullcontext
+
+from .log_record import TIMESTAMP_FORMAT, LogRecord, parse_timestamp  # ✅ Re-exported for existing callers
+
+from utils.files import write_atomic
+from utils.interprocess import InterProcessLock, shared_state_enabled
+from utils.json_codec import loads_json
+from utils.metrics import METRICS
+
+# ---------------------------------------------
+# 🔹 Storage Layout
+# ---------------------------------------------
+# data/logs/segment-<first seq>.ndjson  → append-only NDJSON segments (one record per line)
+# data/logs.json                        → legacy single-array file, migrated once on first start
+# data/logs/.append.lock, .generation   → shared mode only: cross-worker append lock & rewrite counter
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../data")
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".ndjson"
+DEFAULT_SEGMENT_MAX_BYTES = 4 * 1024 * 1024  # ✅ Roll over to a new segment after ~4 MB
+
+
+def _segment_name(first_seq):
+    return f"{SEGMENT_PREFIX}{first_seq:012d}{SEGMENT_SUFFIX}"
+
+
+def _encode(record):
+    """ ✅ Compact single-line ASCII JSON (no indent) for one LogRecord; byte offsets stay exact """
+    return record.to_json() + "\n"
+
+
+def _archive(path, archive_dir):
+    """ ✅ Copies a segment into archive_dir as .ndjson.gz and returns the archive size """
+    os.makedirs(archive_dir, exist_ok=True)
+    target = os.path.join(archive_dir, os.path.basename(path) + ".gz")
+    with open(path, "rb") as source, gzip.open(target, "wb") as archive:
+        shutil.copyfileobj(source, archive)
+    return os.path.getsize(target)
+
+
+def _archive_records(records, archive_dir, name):
+    """ ✅ Appends removed records to a gzip member in archive_dir and returns bytes written """
+    os.makedirs(archive_dir, exist_ok=True)
+    target = os.path.join(archive_dir, name + SEGMENT_SUFFIX + ".gz")
+    before = os.path.getsize(target) if os.path.exists(target) else 0
+    with gzip.open(target, "ab") as archive:
+        archive.write("".join(_encode(record) for record in records).encode("utf-8"))
+    return os.path.getsize(target) - before
+
+
+_versions = itertools.count(1)  # ✅ Process-wide: versions never repeat, even across swapped instances
+
+
+class LogStore:
+    """ ✅ Append-only, segmented log storage engine shared by every blueprint.
+
+    Each append writes one NDJSON line to the active segment instead of rewriting
+    the whole history. Durability uses group commit: concurrent writers that
+    arrive while an fsync is in flight are covered by the next single fsync.
+
+    With ``shared=True`` several worker processes use the same directory:
+    appends and rewrites take a cross-process lock, and every operation first
+    tails the segments for records other workers appended (a segment
+    rewrite by retention bumps .generation, which makes the others reload).
+    """
+
+    def __init__(self, data_dir=None, segment_max_bytes=DEFAULT_SEGMENT_MAX_BYTES, fsync=True, shared=False):
+        self.data_dir = os.path.abspath(data_dir or DATA_DIR)
+        self.segment_dir = os.path.join(self.data_dir, "logs")
+        self.legacy_file = os.path.join(self.data_dir, "logs.json")
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_enabled = fsync
+        self.shared = shared
+
+        self._lock = threading.RLock()  # ✅ Serializes writers & in-memory state
+        self._sync_cond = threading.Condition()
+        self._syncing = False
+        self._durable_seq = -1
+
+        self._entries = []  # ✅ In-memory records; position = seq - base_seq (None = removed)
+        self._epochs = []  # ✅ Time index parallel to _entries (non-decreasing epoch seconds)
+        self._live = 0  # ✅ Records in _entries that aren't None (kept by _index / _unindex & segment drops)
+        self._by_device = {}  # ✅ Secondary indexes: value → ascending list of seqs
+        self._by_user = {}
+        self._by_action = {}
+        self._base_seq = 0
+        self._next_seq = 0
+        self._segments = []  # ✅ [(first_seq, path)] oldest → newest
+        self._listeners = []  # ✅ Callbacks notified with each batch of appended records
+        self.version = next(_versions)  # ✅ Re-drawn on every change readers can observe (drives HTTP ETags)
+        self._file = None
+        self._file_bytes = 0
+        self._ipc_lock = InterProcessLock(os.path.join(self.segment_dir, ".append.lock")) if shared else None
+        self._dir_mtime = None
+        self._generation = None
+
+        os.makedirs(self.segment_dir, exist_ok=True)
+        with self._exclusive():  # ✅ Only one worker migrates logs.json
+            self._load_segments()
+            if not self._segments:
+                self._migrate_legacy_file()
+            self._open_active_segment()
+            if shared:
+                self._dir_mtime = os.stat(self.segment_dir).st_mtime_ns
+                self._generation = self._read_generation()
+
+    @property
+    def version(self):
+        self._refresh()
+        return self._version
+
+    @version.setter
+    def version(self, value):
+        self._version = value
+
+    # ---------------------------------------------
+    # 🔹 Startup: load segments & migrate logs.json
+    # ---------------------------------------------
+    def _load_segments(self):
+        """ ✅ Reads all segments in seq order, truncating a torn trailing line """
+        names = sorted(n for n in os.listdir(self.segment_dir)
+                       if n.startswith(SEGMENT_PREFIX) and n.endswith(SEGMENT_SUFFIX))
+        for name in names:
+            path = os.path.join(self.segment_dir, name)
+            first_seq = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            self._segments.append((first_seq, path))
+            if not self._entries and self._next_seq == 0:
+                self._base_seq = self._next_seq = first_seq
+
+            good_bytes = 0
+            with open(path, "rb") as file:
+                for raw in file:
+                    if not raw.endswith(b"\n"):
+                        break  # ✅ Partial write from a crash; drop it
+                    try:
+                        record = LogRecord.from_entry(loads_json(raw))
+                    except ValueError:
+                        break
+                    good_bytes += len(raw)
+                    self._place(record)
+            if good_bytes != os.path.getsize(path):
+                with open(path, "r+b") as file:
+                    file.truncate(good_bytes)
+        if self._segments:
+            self._pad_to(self._segments[-1][0])  # ✅ Compaction may have emptied the tail: never reuse a seq below it
+
+    def _place(self, record):
+        """ ✅ Puts a loaded record at its seq position, padding gaps left by compaction """
+        self._pad_to(record.seq)
+        self._entries.append(record)
+        self._index(record)
+        self._next_seq = record.seq + 1
+
+    def _pad_to(self, seq):
+        """ ✅ Fills removed positions up to ``seq`` so the next record placed / appended gets it """
+        while self._base_seq + len(self._entries) < seq:
+            self._entries.append(None)
+            self._epochs.append(self._epochs[-1] if self._epochs else 0)
+        self._next_seq = max(self._next_seq, seq)
+
+    def _migrate_legacy_file(self):
+        """ ✅ One-time import of the old logs.json array into the first segment """
+        try:
+            with open(self.legacy_file, "r") as file:
+                legacy_logs = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if not isinstance(legacy_logs, list):
+            return
+        # ✅ Import in time order so seq order matches timestamp order for the time index
+        legacy_logs.sort(key=lambda entry: parse_timestamp(entry.get("timestamp")) or 0)
+
+        path = os.path.join(self.segment_dir, _segment_name(0))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file:
+            for entry in legacy_logs:
+                record = self._new_record(entry)
+                file.write(_encode(record))
+                self._entries.append(record)
+                self._index(record)
+            file.flush()
+            if self.fsync_enabled:
+                os.fsync(file.fileno())
+        os.replace(tmp_path, path)  # ✅ Atomic: segment appears fully written or not at all
+        os.replace(self.legacy_file, self.legacy_file + ".migrated")
+        self._segments.append((0, path))
+
+    # ---------------------------------------------
+    # 🔹 Active segment management
+    # ---------------------------------------------
+    def _open_active_segment(self):
+        if not self._segments:
+            path = os.path.join(self.segment_dir, _segment_name(self._next_seq))
+            self._segments.append((self._next_seq, path))
+        path = self._segments[-1][1]
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_bytes = self._file.tell()
+
+    def _roll_over(self):
+        """ ✅ Seals the active segment (fsynced) and starts a new one """
+        self._sync_locked()
+        self._file.close()
+        path = os.path.join(self.segment_dir, _segment_name(self._next_seq))
+        self._segments.append((self._next_seq, path))
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_bytes = 0
+
+    def _sync_locked(self):
+        """ ✅ Flushes & fsyncs the active segment (caller holds self._lock) """
+        started = time.perf_counter()
+        self._file.flush()
+        if self.fsync_enabled:
+            os.fsync(self._file.fileno())
+        METRICS.observe("log_store_fsync_seconds", time.perf_counter() - started)
+        self._durable_seq = self._next_seq - 1
+
+    # ---------------------------------------------
+    # 🔹 Shared mode: other workers' appends & rewrites
+    # ---------------------------------------------
+    @contextmanager
+    def _exclusive(self):
+        """ ✅ Holds self._lock (and the cross-worker lock in shared mode) """
+        with self._lock, (self._ipc_lock if self.shared else nullcontext()):
+            yield
+
+    def _refresh(self):
+        """ ✅ Shared mode: pulls in other workers' appends before a read (two stat calls when idle) """
+        if not self.shared:
+            return
+        with self._lock:
+            records = self._catch_up_locked()
+        self._notify(records)
+
+    def _read_generation(self):
+        try:
+            with open(os.path.join(self.segment_dir, ".generation"), "r") as file:
+                return int(file.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _bump_generation_locked(self):
+        """ ✅ Tells other workers a segment was rewritten or dropped (caller holds _exclusive) """
+        if self.shared:
+            self._generation = self._read_generation() + 1
+            write_atomic(os.path.join(self.segment_dir, ".generation"), str(self._generation))
+
+    def _catch_up_locked(self):
+        """ ✅ Applies records appended by other workers; returns them (caller holds self._lock) """
+        dir_mtime = os.stat(self.segment_dir).st_mtime_ns
+        if dir_mtime != self._dir_mtime and self._read_generation() != self._generation:
+            self._reload_locked()  # ✅ Retention rewrote history: offsets are stale
+            return []
+        records = self._read_tail_locked()
+        # ✅ A full active segment means a roll-over is due (covers mtime changes within one clock tick)
+        if dir_mtime != self._dir_mtime or self._file_bytes >= self.segment_max_bytes:
+            self._dir_mtime = dir_mtime
+            for name in sorted(n for n in os.listdir(self.segment_dir)
+                               if n.startswith(SEGMENT_PREFIX) and n.endswith(SEGMENT_SUFFIX)):
+                path = os.path.join(self.segment_dir, name)
+                first_seq = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+                if first_seq <= self._segments[-1][0]:
+                    continue
+                records += self._read_tail_locked()  # ✅ Lines written just before the roll-over
+                self._file.close()  # ✅ Another worker rolled over: follow it to the new segment
+                self._segments.append((first_seq, path))
+                self._pad_to(first_seq)
+                self._file = open(path, "a", encoding="utf-8")
+                self._file_bytes = 0
+                records += self._read_tail_locked()
+        if records:
+            self.version = next(_versions)
+        return records
+
+    def _read_tail_locked(self):
+        """ ✅ Reads complete lines past our offset in the active segment """
+        path = self._segments[-1][1]
+        if os.path.getsize(path) <= self._file_bytes:
+            return []
+        with open(path, "rb") as file:
+            file.seek(self._file_bytes)
+            data = file.read()
+        end = data.rfind(b"\n") + 1  # ✅ A line still being written is picked up next time
+        records = [LogRecord.from_entry(loads_json(raw)) for raw in data[:end].splitlines()]
+        for record in records:
+            self._place(record)
+        self._file_bytes += end
+        return records
+
+    def _reload_locked(self):
+        """ ✅ Rebuilds every in-memory structure from the segments on disk """
+        self._file.close()
+        self._entries, self._epochs = [], []
+        self._live = 0
+        self._by_device, self._by_user, self._by_action = {}, {}, {}
+        self._base_seq = self._next_seq = 0
+        self._segments = []
+        self._load_segments()
+        self._open_active_segment()
+        self._durable_seq = self._next_seq - 1
+        self._dir_mtime = os.stat(self.segment_dir).st_mtime_ns
+        self._generation = self._read_generation()
+        self.version = next(_versions)
+
+    # ---------------------------------------------
+    # 🔹 Secondary indexes (maintained incrementally on append)
+    # ---------------------------------------------
+    def _index(self, record):
+        """ ✅ Adds one record (already in _entries) to the time & secondary indexes """
+        epoch = record.epoch or 0
+        if self._epochs and epoch < self._epochs[-1]:
+            epoch = self._epochs[-1]  # ✅ Keep the time index monotonic for bisect
+        self._epochs.append(epoch)
+        self._live += 1
+        seq = record.seq
+        for index, value in ((self._by_device, record.device), (self._by_user, record.username),
+                             (self._by_action, record.action)):
+            if value is not None:
+                index.setdefault(value, []).append(seq)
+
+    def _unindex(self, records):
+        """ ✅ Drops removed records from the secondary indexes.
+
+        Only the lists of values the records carry are touched, and in each only
+        the bisected slice between the lowest & highest removed seq is rewritten,
+        so the cost follows the removed segment rather than the whole history.
+        """
+        self._live -= len(records)
+        for index, field in ((self._by_device, "device"), (self._by_user, "username"), (self._by_action, "action")):
+            removed = {}
+            for record in records:
+                value = getattr(record, field)
+                if value is not None:
+                    removed.setdefault(value, set()).add(record.seq)
+            for value, removed_seqs in removed.items():
+                seqs = index.get(value)
+                if seqs is None:
+                    continue
+                lo, hi = bisect_left(seqs, min(removed_seqs)), bisect_right(seqs, max(removed_seqs))
+                seqs[lo:hi] = [seq for seq in seqs[lo:hi] if seq not in removed_seqs]
+                if not seqs:
+                    del index[value]
+
+    # ---------------------------------------------
+    # 🔹 Writes
+    # ---------------------------------------------
+    def _new_record(self, entry):
+        """ ✅ Compact LogRecord for an entry dict (interned names, epoch timestamp) at the next seq """
+        record = LogRecord.from_entry(entry, seq=self._next_seq)
+        self._next_seq += 1
+        return record
+
+    def append(self, entry):
+        """ ✅ Durably appends one log entry and returns the stored record """
+        return self.append_many([entry])[0]
+
+    def append_many(self, entries):
+        """ ✅ Appends a batch of entries with a single write + group-committed fsync """
+        started = time.perf_counter()
+        with self._exclusive():
+            caught_up = self._catch_up_locked() if self.shared else []
+            records = [self._new_record(entry) for entry in entries]
+            if not records:
+                return records
+            payload = "".join(_encode(record) for record in records)
+            self._file.write(payload)
+            if self.shared:
+                self._file.flush()  # ✅ On disk before the next worker appends behind it
+            self._file_bytes += len(payload)
+            self._entries.extend(records)
+            for record in records:
+                self._index(record)
+            self.version = next(_versions)
+            last_seq = records[-1].seq
+            if self._file_bytes >= self.segment_max_bytes:
+                self._roll_over()
+
+        self._wait_durable(last_seq)
+        METRICS.observe("log_store_append_seconds", time.perf_counter() - started)  # ✅ Write + group commit
+        METRICS.inc("log_store_records_appended_total", value=len(records))
+        self._notify(caught_up)
+        self._notify(records)
+        return records
+
+    def _notify(self, records):
+        if not records:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(records)
+            except Exception as e:
+                print(f"❌ Log store listener failed: {str(e)}")  # ✅ Never fail a durable append
+
+    def add_listener(self, listener):
+        """ ✅ Registers ``listener(records)`` to be called after every durable append """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _wait_durable(self, seq):
+        """ ✅ Group commit: one leader fsyncs for every writer queued behind it """
+        with self._sync_cond:
+            while self._durable_seq < seq:
+                if self._syncing:
+                    self._sync_cond.wait()
+                    continue
+                self._syncing = True
+                self._sync_cond.release()
+                try:
+                    with self._lock:
+                        self._sync_locked()
+                finally:
+                    self._sync_cond.acquire()
+                    self._syncing = False
+                    self._sync_cond.notify_all()
+
+    # ---------------------------------------------
+    # 🔹 Retention primitives (segment-at-a-time, used by models.retention_model)
+    # ---------------------------------------------
+    def segment_info(self):
+        """ ✅ Describes each segment: seq range, time range, live records & size """
+        self._refresh()
+        with self._lock:
+            info = []
+            for index, (first_seq, path) in enumerate(self._segments):
+                start, end = first_seq - self._base_seq, self._segment_end(index) - self._base_seq
+                live = sum(1 for record in self._entries[start:end] if record is not None)
+                info.append({
+                    "first_seq": first_seq,
+                    "end_seq": self._segment_end(index),
+                    "active": index == len(self._segments) - 1,
+                    "records": live,
+                    "bytes": self._file_bytes if index == len(self._segments) - 1 else os.path.getsize(path),
+                    "min_epoch": self._epochs[start] if end > start else None,
+                    "max_epoch": self._epochs[end - 1] if end > start else None,
+                })
+            return info
+
+    def size_bytes(self):
+        """ ✅ Bytes on disk across all segments (cheap: one stat per sealed segment) """
+        self._refresh()
+        with self._lock:
+            sealed = sum(os.path.getsize(path) for _, path in self._segments[:-1])
+            return sealed + self._file_bytes
+
+    def seal_active_segment(self):
+        """ ✅ Rolls the active segment over so its records become eligible for retention """
+        with self._exclusive():
+            self._notify(self._catch_up_locked() if self.shared else [])
+            if self._file_bytes:
+                self._roll_over()
+
+    def drop_segment(self, first_seq, archive_dir=None):
+        """ ✅ Deletes a whole sealed segment (optionally gzip-archiving it first) """
+        with self._exclusive():
+            self._notify(self._catch_up_locked() if self.shared else [])
+            index = self._segment_index(first_seq)
+            path = self._segments[index][1]
+            start, end = first_seq - self._base_seq, self._segment_end(index) - self._base_seq
+            dropped = {"records": sum(1 for r in self._entries[start:end] if r is not None),
+                       "bytes": os.path.getsize(path), "archived_bytes": 0}
+            if archive_dir:
+                dropped["archived_bytes"] = _archive(path, archive_dir)
+            os.remove(path)
+            del self._segments[index]
+            self.version = next(_versions)
+            self._bump_generation_locked()
+
+            if index == 0:
+                # ✅ Oldest segment: trim the in-memory arrays & index prefixes
+                del self._entries[:end]
+                del self._epochs[:end]
+                self._live -= dropped["records"]
+                self._base_seq += end
+                for seq_index in (self._by_device, self._by_user, self._by_action):
+                    for value in list(seq_index):
+                        seqs = seq_index[value]
+                        del seqs[:bisect_left(seqs, self._base_seq)]
+                        if not seqs:
+                            del seq_index[value]
+            else:
+                self._unindex([record for record in self._entries[start:end] if record is not None])
+                self._entries[start:end] = [None] * (end - start)
+            return dropped
+
+    def compact_segment(self, first_seq, predicate, archive_dir=None):
+        """ ✅ Rewrites one sealed segment without the records matching ``predicate`` """
+        with self._exclusive():
+            self._notify(self._catch_up_locked() if self.shared else [])
+            return self._compact_locked(self._segment_index(first_seq), predicate, archive_dir)
+
+    def _segment_index(self, first_seq):
+        for index, (seq, _) in enumerate(self._segments):
+            if seq == first_seq:
+                if index == len(self._segments) - 1:
+                    raise ValueError("The active segment cannot be dropped or compacted")
+                return index
+        raise KeyError(f"No segment starts at seq {first_seq}")
+
+    def _compact_locked(self, index, predicate, archive_dir=None):
+        first_seq, path = self._segments[index]
+        start, end = first_seq - self._base_seq, self._segment_end(index) - self._base_seq
+        hits = [i for i in range(start, end)
+                if self._entries[i] is not None and predicate(self._entries[i])]
+        result = {"records": len(hits), "bytes": 0, "archived_bytes": 0}
+        if not hits:
+            return result
+
+        if archive_dir:
+            result["archived_bytes"] = _archive_records(
+                [self._entries[i] for i in hits], archive_dir, f"compacted-{first_seq:012d}")
+        before = os.path.getsize(path)
+        self._unindex([self._entries[i] for i in hits])
+        for i in hits:
+            self._entries[i] = None
+        self.version = next(_versions)
+        self._rewrite_segment(path, self._entries[start:end])
+        self._bump_generation_locked()
+        result["bytes"] = before - os.path.getsize(path)
+        return result
+
+    def _segment_end(self, index):
+        """ ✅ Returns the seq just past the last record of segment #index """
+        if index + 1 < len(self._segments):
+            return self._segments[index + 1][0]
+        return self._next_seq
+
+    def _rewrite_segment(self, path, records):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.writelines(_encode(r) for r in records if r is not None)
+            file.flush()
+            if self.fsync_enabled:
+                os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    # ---------------------------------------------
+    # 🔹 Reads
+    # ---------------------------------------------
+    def all(self):
+        """ ✅ Returns every live record in append order """
+        self._refresh()
+        with self._lock:
+            return [record for record in self._entries if record is not None]
+
+    def query(self, device=None, username=None, action=None, since=None, until=None,
+              cursor=None, limit=None, order="asc"):
+        """ ✅ Filtered, cursor-paginated read served from the in-memory indexes.
+
+        ``since``/``until`` are inclusive epoch seconds, ``cursor`` is the seq of the
+        last record of the previous page. Returns ``(records, next_cursor)``.
+        """
+        self._refresh()
+        with self._lock:
+            lo, hi = self._base_seq, self._next_seq
+            if since is not None:
+                lo = max(lo, self._base_seq + bisect_left(self._epochs, since))
+            if until is not None:
+                hi = min(hi, self._base_seq + bisect_right(self._epochs, until))
+            if cursor is not None:
+                if order == "desc":
+                    hi = min(hi, cursor)
+                else:
+                    lo = max(lo, cursor + 1)
+            if lo >= hi:
+                return [], None
+
+            filters = [(key, value, index) for key, value, index in (  # ✅ Keys are LogRecord slots
+                ("device", device, self._by_device),
+                ("username", username, self._by_user),
+                ("action", action, self._by_action),
+            ) if value is not None]
+
+            if filters:
+                # ✅ Drive the scan from the most selective index
+                driver = min((index.get(value, []) for _, value, index in filters), key=len)
+                candidates = driver[bisect_left(driver, lo):bisect_left(driver, hi)]
+            else:
+                candidates = range(lo, hi)
+            if order == "desc":
+                candidates = reversed(candidates)
+
+            results = []
+            for seq in candidates:
+                record = self._entries[seq - self._base_seq]
+                if record is None or any(getattr(record, key) != value for key, value, _ in filters):
+                    continue
+                results.append(record)
+                if limit is not None and len(results) >= limit:
+                    return results, seq
+            return results, None
+
+    def iter_batches(self, device=None, username=None, action=None, since=None, until=None, batch_size=1000):
+        """ ✅ Yields matching records as lists of up to ``batch_size``, in seq order.
+
+        Each batch is one short indexed ``query`` page, so appends proceed between
+        batches and the caller never holds more than one batch. Only records that
+        existed when the scan started are returned (a consistent export snapshot).
+        """
+        self._refresh()
+        with self._lock:
+            end_seq = self._next_seq
+        cursor = None
+        while True:
+            records, cursor = self.query(device=device, username=username, action=action, since=since,
+                                         until=until, cursor=cursor, limit=batch_size)
+            if records and records[-1].seq >= end_seq:
+                records = [record for record in records if record.seq < end_seq]
+                cursor = None
+            if records:
+                yield records
+            if cursor is None:
+                return
+
+    def __len__(self):
+        """ ✅ Live record count in O(1) (a running total, not a scan) """
+        self._refresh()
+        with self._lock:
+            return self._live
+
+    def close(self):
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._sync_locked()
+                self._file.close()
+
+
+# ---------------------------------------------
+# 🔹 Shared store instance (lazy, swappable for tests)
+# ---------------------------------------------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_log_store():
+    """ ✅ Returns the process-wide LogStore, opening it on first use """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LogStore(shared=shared_state_enabled())
+    return _store
+
+
+def set_log_store(store):
+    """ ✅ Replaces the shared LogStore (used by tests & alternative deployments) """
+    global _store
+    with _store_lock:
+        previous, _store = _store, store
+    return previous
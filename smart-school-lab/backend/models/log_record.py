@@ -0,0 +1,191 @@
+### `models/log_record.py`
+
+import json
+import sys
+from datetime import datetime
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+CORE_FIELDS = ("seq", "action", "device", "username", "timestamp")
+_CORE_KEYS = frozenset(CORE_FIELDS)
+JSON_NAME_CACHE_SIZE = 65536  # ✅ Distinct device / user / action names kept pre-encoded
+MINUTE_CACHE_SIZE = 4096  # ✅ Minutes remembered per direction before the caches start over
+
+_minute_prefixes = {}  # ✅ Minute epoch → "YYYY-MM-DD HH:MM:"
+_minute_epochs = {}  # ✅ "YYYY-MM-DD HH:MM:" → minute epoch (-1: doesn't format back identically)
+_SECONDS = [f"{second:02d}" for second in range(60)]
+_SECOND_VALUES = {text: second for second, text in enumerate(_SECONDS)}
+
+
+def _remember(cache, key, value):
+    if len(cache) >= MINUTE_CACHE_SIZE:
+        cache.clear()
+    cache[key] = value
+    return value
+
+
+def format_epoch(epoch):
+    """ ✅ Epoch seconds → "YYYY-MM-DD HH:MM:SS" (lab wall clock).
+
+    The "YYYY-MM-DD HH:MM:" prefix is cached per minute (UTC offsets change on
+    minute boundaries), so serializing a burst of records formats each minute once.
+    """
+    seconds = epoch % 60
+    minute = epoch - seconds
+    prefix = _minute_prefixes.get(minute)
+    if prefix is None:
+        prefix = _remember(_minute_prefixes, minute, datetime.fromtimestamp(minute).strftime("%Y-%m-%d %H:%M:"))
+    return prefix + _SECONDS[seconds]
+
+
+def _exact_epoch(value):
+    """ ✅ Epoch for a "YYYY-MM-DD HH:MM:SS" string that format_epoch reproduces exactly, else None """
+    if type(value) is not str or len(value) != 19:
+        return None
+    prefix = value[:17]
+    minute = _minute_epochs.get(prefix)
+    if minute is None:
+        try:
+            minute = int(datetime.fromisoformat(prefix + "00").timestamp())
+        except ValueError:
+            minute = -1
+        if minute % 60 or format_epoch(minute) != prefix + "00":
+            minute = -1  # ✅ e.g. a wall-clock time skipped by a DST change
+        _remember(_minute_epochs, prefix, minute)
+    seconds = _SECOND_VALUES.get(value[17:])
+    if minute < 0 or seconds is None:
+        return None
+    return minute + seconds
+
+
+def parse_timestamp(value):
+    """ ✅ Converts a log timestamp ("YYYY-MM-DD HH:MM:SS", ISO or epoch) to epoch seconds """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if str(value).isdigit():
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(str(value)).timestamp())
+    except ValueError:
+        return None
+
+
+_json_names = {}  # ✅ Interned name → its JSON string literal
+
+
+def _json_name(value):
+    encoded = _json_names.get(value)
+    if encoded is None:
+        encoded = json.dumps(value)
+        if len(_json_names) < JSON_NAME_CACHE_SIZE:
+            _json_names[value] = encoded
+    return encoded
+
+
+class LogRecord:
+    """ ✅ Compact in-memory log record.
+
+    Slots instead of a per-record dict, device / username / action strings
+    interned (one copy per distinct name however many records mention it) and
+    the timestamp held as integer epoch seconds, formatted back only when the
+    record is serialized. Anything beyond the core fields (e.g. a schedule, a
+    bulk command) lives in ``extra``; so does a timestamp that would not
+    survive the round trip through epoch seconds unchanged.
+
+    Reads like the dict it replaces: ``record["device"]``, ``record.get(...)``,
+    ``"seq" in record``, ``dict(record)`` and ``==`` against a dict all work.
+    """
+
+    __slots__ = ("seq", "action", "device", "username", "epoch", "extra")
+
+    def __init__(self, seq, action=None, device=None, username=None, epoch=None, extra=None):
+        self.seq = seq
+        self.action = action
+        self.device = device
+        self.username = username
+        self.epoch = epoch
+        self.extra = extra
+
+    @classmethod
+    def from_entry(cls, entry, seq=None):
+        """ ✅ Builds a record from a log entry / decoded NDJSON line (``seq`` overrides the entry's) """
+        timestamp = entry.get("timestamp")
+        epoch = _exact_epoch(timestamp)
+        extra = None
+        if not _CORE_KEYS.issuperset(entry):
+            extra = {key: value for key, value in entry.items() if key not in _CORE_KEYS}
+        if epoch is None and "timestamp" in entry:
+            epoch = parse_timestamp(timestamp)  # ✅ Indexed by epoch, but the original string is kept verbatim
+            extra = {"timestamp": timestamp, **(extra or {})}
+        action, device, username = entry.get("action"), entry.get("device"), entry.get("username")
+        return cls(entry.get("seq") if seq is None else seq,
+                   sys.intern(action) if type(action) is str else action,
+                   sys.intern(device) if type(device) is str else device,
+                   sys.intern(username) if type(username) is str else username,
+                   epoch, extra)
+
+    # ---------------------------------------------
+    # 🔹 Dict-style access (existing callers keep working)
+    # ---------------------------------------------
+    @property
+    def timestamp(self):
+        if self.extra is not None and "timestamp" in self.extra:
+            return self.extra["timestamp"]
+        return format_epoch(self.epoch) if self.epoch is not None else None
+
+    def get(self, key, default=None):
+        if key in CORE_FIELDS:
+            value = self.timestamp if key == "timestamp" else getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra is not None else default
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None and key not in self:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        if key in CORE_FIELDS:
+            return self.get(key) is not None
+        return self.extra is not None and key in self.extra
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def to_dict(self):
+        """ ✅ The record as the plain dict stored on disk & returned by the API """
+        epoch = self.epoch
+        if epoch is None or self.action is None or self.device is None or self.username is None:
+            record = {"seq": self.seq}
+            record.update((key, self.get(key)) for key in CORE_FIELDS[1:] if self.get(key) is not None)
+        else:
+            record = {"seq": self.seq, "action": self.action, "device": self.device, "username": self.username,
+                      "timestamp": format_epoch(epoch)}
+        if self.extra is not None:
+            record.update(self.extra)
+        return record
+
+    def to_json(self):
+        """ ✅ Compact ASCII JSON for the record; the common shape skips the intermediate dict """
+        extra = self.extra
+        if (self.epoch is None or type(self.action) is not str or type(self.device) is not str
+                or type(self.username) is not str or (extra is not None and "timestamp" in extra)):
+            return json.dumps(self.to_dict(), separators=(",", ":"))
+        head = (f'{{"seq":{self.seq},"action":{_json_name(self.action)},"device":{_json_name(self.device)},'
+                f'"username":{_json_name(self.username)},"timestamp":"{format_epoch(self.epoch)}"')
+        return head + "," + json.dumps(extra, separators=(",", ":"))[1:] if extra is not None else head + "}"
+
+    def __eq__(self, other):
+        if isinstance(other, LogRecord):
+            other = other.to_dict()
+        return self.to_dict() == other if isinstance(other, dict) else NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"LogRecord({self.to_dict()!r})"
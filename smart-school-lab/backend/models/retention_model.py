@@ -0,0 +1,170 @@
+### `models/retention_model.py`
+
+import os
+import threading
+import time
+
+from .log_model import get_log_store
+
+# ---------------------------------------------
+# 🔹 Retention Policy (days to keep, per log action)
+# ---------------------------------------------
+DEFAULT_RETENTION_DAYS = {
+    "default": 90,  # ✅ Anything without a specific rule
+    "request": 30,  # 🔹 Access requests are short-lived
+    "schedule_set": 180,  # 🔹 Schedules are useful for term-long reports
+}
+RETENTION_INTERVAL_SECONDS = 60 * 60  # ✅ Background sweep every hour
+ARCHIVE_DIR_NAME = "archive"  # ✅ Removed logs are kept gzip-compressed in data/archive/
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+class RetentionManager:
+    """ ✅ Background retention & compaction for the log store.
+
+    Works one sealed segment at a time: a segment whose newest record is older
+    than the longest retention window is dropped whole (optionally archived as
+    gzip), a segment that only partly expired is rewritten without its expired
+    records. The active segment is never rewritten; it is sealed first when it
+    holds expired records, so request-path appends are never blocked by a
+    full-history rewrite.
+    """
+
+    def __init__(self, store=None, retention_days=None, archive=True,
+                 interval_seconds=RETENTION_INTERVAL_SECONDS):
+        self.store = store
+        self.retention_days = dict(retention_days or DEFAULT_RETENTION_DAYS)
+        self.archive = archive
+        self.interval_seconds = interval_seconds
+
+        self._wakeup = threading.Event()
+        self._pending_override = None
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        self.stats = {
+            "runs": 0,
+            "running": False,
+            "last_started": None,
+            "last_finished": None,
+            "last_error": None,
+            "segments_total": 0,
+            "segments_done": 0,
+            "segments_dropped": 0,
+            "segments_compacted": 0,
+            "records_removed": 0,
+            "bytes_reclaimed": 0,
+            "bytes_archived": 0,
+        }
+
+    # ---------------------------------------------
+    # 🔹 Policy helpers
+    # ---------------------------------------------
+    def _windows(self, override_days=None):
+        """ ✅ Returns {action: retention seconds}; an override applies to every action """
+        if override_days is not None:
+            return {"default": override_days * DAY_SECONDS}
+        return {action: days * DAY_SECONDS for action, days in self.retention_days.items()}
+
+    # ---------------------------------------------
+    # 🔹 One incremental pass over the sealed segments
+    # ---------------------------------------------
+    def run_once(self, override_days=None, now=None):
+        """ ✅ Applies the retention policy segment by segment and returns the stats """
+        with self._run_lock:
+            store = self.store or get_log_store()
+            now = time.time() if now is None else now
+            windows = self._windows(override_days)
+            default_window = windows.get("default", max(windows.values()))
+            all_expired_before = now - max(windows.values())  # ✅ Every record older than this expired
+            none_expired_after = now - min(windows.values())  # ✅ No record newer than this expired
+            archive_dir = os.path.join(store.data_dir, ARCHIVE_DIR_NAME) if self.archive else None
+
+            def is_expired(record):
+                window = windows.get(record.action, default_window)
+                return record.epoch is not None and record.epoch < now - window  # ✅ LogRecord: no re-parsing
+
+            self.stats.update(running=True, last_started=now, last_error=None, segments_done=0)
+            try:
+                segments = store.segment_info()
+                active = segments[-1]
+                if active["records"] and active["min_epoch"] is not None and active["min_epoch"] < none_expired_after:
+                    store.seal_active_segment()  # ✅ Turn expired live data into a sealed segment
+                    segments = store.segment_info()
+
+                sealed = [segment for segment in segments if not segment["active"]]
+                self.stats["segments_total"] = len(sealed)
+                for segment in sealed:
+                    if not segment["records"] or segment["max_epoch"] < all_expired_before:
+                        result = store.drop_segment(segment["first_seq"], archive_dir)
+                        self.stats["segments_dropped"] += 1
+                    elif segment["min_epoch"] < none_expired_after:
+                        result = store.compact_segment(segment["first_seq"], is_expired, archive_dir)
+                        if result["records"]:
+                            self.stats["segments_compacted"] += 1
+                    else:
+                        result = {"records": 0, "bytes": 0, "archived_bytes": 0}
+                    self.stats["records_removed"] += result["records"]
+                    self.stats["bytes_reclaimed"] += result["bytes"]
+                    self.stats["bytes_archived"] += result["archived_bytes"]
+                    self.stats["segments_done"] += 1
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                print(f"❌ Retention run failed: {str(e)}")
+            finally:
+                self.stats.update(running=False, last_finished=time.time())
+                self.stats["runs"] += 1
+            return self.status()
+
+    def status(self):
+        """ ✅ Snapshot of policy & compaction progress for the API """
+        return {"retention_days": dict(self.retention_days), **self.stats}
+
+    # ---------------------------------------------
+    # 🔹 Background worker
+    # ---------------------------------------------
+    def start(self):
+        """ ✅ Starts the background sweeper thread (idempotent) """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._loop, name="log-retention", daemon=True)
+            self._thread.start()
+        return self
+
+    def trigger(self, override_days=None):
+        """ ✅ Requests an immediate pass without waiting for it (request path safe) """
+        self._pending_override = override_days
+        self._wakeup.set()
+        if self._thread is None:
+            self.start()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def _loop(self):
+        while not self._stopped:
+            self._wakeup.wait(self.interval_seconds)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            override, self._pending_override = self._pending_override, None
+            self.run_once(override_days=override)
+
+
+# ---------------------------------------------
+# 🔹 Shared manager instance
+# ---------------------------------------------
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_retention_manager():
+    """ ✅ Returns the process-wide RetentionManager, starting its sweeper on first use """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = RetentionManager().start()
+    return _manager
@@ -0,0 +1,267 @@
+### `models/schedule_model.py`
+
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+from . import log_model
+from .device_model import apply_device_action
+from utils.files import write_atomic
+from utils.interprocess import SHARED_POLL_SECONDS, InterProcessLock, LeaderElection, shared_state_enabled
+
+SCHEDULER_USERNAME = "Scheduler"  # ✅ Username recorded on logs of schedule-fired actions
+
+
+def parse_clock_time(value):
+    """ ✅ Validates an "HH:MM" time of day and returns (hour, minute) """
+    hour, minute = (int(part) for part in str(value).split(":"))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time of day: {value}")
+    return hour, minute
+
+
+def next_occurrence(clock_time, now):
+    """ ✅ Next epoch (strictly after ``now``) at which the daily "HH:MM" time occurs """
+    hour, minute = parse_clock_time(clock_time)
+    current = datetime.fromtimestamp(now)
+    candidate = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate.timestamp() <= now:
+        candidate += timedelta(days=1)
+    return candidate.timestamp()
+
+
+class Scheduler:
+    """ ✅ Daily on/off schedules driven by one timer heap and one wakeup thread.
+
+    Each schedule keeps its next "on" and next "off" firing in a min-heap keyed
+    by epoch: insert is O(log n), cancel is O(1) (stale heap entries are skipped
+    when popped and purged once they outnumber live ones). The single worker
+    sleeps until the earliest firing, switches the device through
+    ``apply_device_action`` (the same path as POST /toggle) and pushes the
+    next day's occurrence. Schedules persist to data/schedules.json and are
+    rebuilt on start-up.
+
+    With ``shared=True`` every worker process keeps a copy: edits re-read the
+    file under a cross-process lock, copies reload when the file changes, and
+    only the elected leader actually fires schedules.
+    """
+
+    def __init__(self, path=None, action=apply_device_action, clock=time.time, shared=False):
+        self.path = os.path.abspath(path or os.path.join(log_model.DATA_DIR, "schedules.json"))
+        self._action = action
+        self._clock = clock
+        self.shared = shared
+        self._ipc_lock = InterProcessLock(self.path + ".lock") if shared else nullcontext()
+        self._leader = LeaderElection(self.path + ".leader") if shared else None
+        self._mtime = None
+
+        self._cond = threading.Condition()
+        self._heap = []  # ✅ (fire_at, tie_breaker, schedule_id, "on"|"off")
+        self._counter = itertools.count()
+        self._schedules = {}  # ✅ schedule id → schedule dict
+        self._next_id = 1
+        self._thread = None
+        self._stopped = False
+
+        self._load()
+
+    # ---------------------------------------------
+    # 🔹 Persistence
+    # ---------------------------------------------
+    def _load(self):
+        try:
+            self._mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, "r") as file:
+                state = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self._next_id = state.get("next_id", 1)
+        now = self._clock()
+        for schedule in state.get("schedules", []):
+            self._schedules[schedule["id"]] = schedule
+            self._push(schedule, now)
+
+    def _save(self):
+        """ ✅ Atomic snapshot of all schedules (caller holds self._cond) """
+        state = {"next_id": self._next_id, "schedules": sorted(self._schedules.values(), key=lambda s: s["id"])}
+        write_atomic(self.path, json.dumps(state, indent=4))
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def _refresh(self):
+        """ ✅ Shared mode: reloads schedules another worker saved (caller holds self._cond) """
+        if not self.shared:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            self._heap, self._schedules, self._next_id = [], {}, 1
+            self._load()
+
+    # ---------------------------------------------
+    # 🔹 Heap maintenance
+    # ---------------------------------------------
+    def _push(self, schedule, now):
+        for action, clock_time in (("on", schedule["on_time"]), ("off", schedule["off_time"])):
+            heapq.heappush(self._heap, (next_occurrence(clock_time, now), next(self._counter), schedule["id"], action))
+
+    def _purge_stale(self):
+        """ ✅ Rebuilds the heap once cancelled entries dominate it (amortized O(1) per cancel) """
+        if len(self._heap) > 2 * (2 * len(self._schedules)) + 64:
+            self._heap = [item for item in self._heap if item[2] in self._schedules]
+            heapq.heapify(self._heap)
+
+    # ---------------------------------------------
+    # 🔹 Public API
+    # ---------------------------------------------
+    def add(self, device_id, on_time, off_time, username=SCHEDULER_USERNAME):
+        """ ✅ Registers a daily schedule and returns it (raises ValueError on bad times) """
+        parse_clock_time(on_time)
+        parse_clock_time(off_time)
+        with self._cond, self._ipc_lock:
+            self._refresh()
+            schedule = {
+                "id": self._next_id,
+                "device_id": device_id,
+                "on_time": on_time,
+                "off_time": off_time,
+                "username": username,
+                "created": datetime.now().strftime(log_model.TIMESTAMP_FORMAT),
+            }
+            self._next_id += 1
+            self._schedules[schedule["id"]] = schedule
+            self._push(schedule, self._clock())
+            self._save()
+            self._cond.notify()  # ✅ Wake the worker in case this firing is the new earliest
+            return dict(schedule)
+
+    def cancel(self, schedule_id):
+        """ ✅ Cancels a schedule; its pending heap entries are skipped lazily """
+        with self._cond, self._ipc_lock:
+            self._refresh()
+            if self._schedules.pop(schedule_id, None) is None:
+                return False
+            self._purge_stale()
+            self._save()
+            return True
+
+    def all(self, device_id=None):
+        """ ✅ Lists schedules (optionally for one device) with their next firing times """
+        with self._cond:
+            self._refresh()
+            upcoming = {}
+            for fire_at, _, schedule_id, action in self._heap:
+                key = (schedule_id, action)
+                if schedule_id in self._schedules and (key not in upcoming or fire_at < upcoming[key]):
+                    upcoming[key] = fire_at
+            result = []
+            for schedule in sorted(self._schedules.values(), key=lambda s: s["id"]):
+                if device_id is not None and schedule["device_id"] != device_id:
+                    continue
+                item = dict(schedule)
+                for action in ("on", "off"):
+                    fire_at = upcoming.get((schedule["id"], action))
+                    item[f"next_{action}"] = (datetime.fromtimestamp(fire_at).strftime(log_model.TIMESTAMP_FORMAT)
+                                              if fire_at else None)
+                result.append(item)
+            return result
+
+    def __len__(self):
+        with self._cond:
+            self._refresh()
+            return len(self._schedules)
+
+    # ---------------------------------------------
+    # 🔹 Firing
+    # ---------------------------------------------
+    def _pop_due(self, now):
+        """ ✅ Pops every due firing and queues its next-day occurrence (caller holds self._cond) """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, schedule_id, action = heapq.heappop(self._heap)
+            schedule = self._schedules.get(schedule_id)
+            if schedule is None:
+                continue  # ✅ Cancelled: lazy deletion
+            due.append((schedule, action))
+            clock_time = schedule["on_time"] if action == "on" else schedule["off_time"]
+            heapq.heappush(self._heap, (next_occurrence(clock_time, now), next(self._counter), schedule_id, action))
+        return due
+
+    def _fire(self, due):
+        if self._leader is not None and not self._leader.is_leader():
+            return  # ✅ Another worker fires; this copy only keeps its heap in step
+        for schedule, action in due:
+            try:
+                self._action(schedule["device_id"], action, username=SCHEDULER_USERNAME)
+            except Exception as e:
+                print(f"❌ Schedule {schedule['id']} failed to switch device {schedule['device_id']} {action}: {str(e)}")
+
+    def run_pending(self, now=None):
+        """ ✅ Fires everything due at ``now`` synchronously (used by tests & manual ticks) """
+        with self._cond:
+            due = self._pop_due(self._clock() if now is None else now)
+        self._fire(due)
+        return len(due)
+
+    def start(self):
+        """ ✅ Starts the single wakeup thread (idempotent) """
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._loop, name="device-scheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _loop(self):
+        with self._cond:
+            while not self._stopped:
+                self._refresh()
+                now = self._clock()
+                due = self._pop_due(now)
+                if due:
+                    self._cond.release()  # ✅ Never hold the heap lock while switching devices
+                    try:
+                        self._fire(due)
+                    finally:
+                        self._cond.acquire()
+                    continue
+                timeout = self._heap[0][0] - now if self._heap else None
+                if self.shared:
+                    timeout = SHARED_POLL_SECONDS * 10 if timeout is None else min(timeout, SHARED_POLL_SECONDS * 10)
+                self._cond.wait(timeout)
+
+
+# ---------------------------------------------
+# 🔹 Shared scheduler instance
+# ---------------------------------------------
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """ ✅ Returns the process-wide Scheduler, rebuilding persisted schedules & starting it on first use """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = Scheduler(shared=shared_state_enabled()).start()
+    return _scheduler
+
+
+def set_scheduler(scheduler):
+    """ ✅ Replaces the shared Scheduler (used by tests) """
+    global _scheduler
+    with _scheduler_lock:
+        previous, _scheduler = _scheduler, scheduler
+    return previous
@@ -0,0 +1,412 @@
+### `models/telemetry_model.py`
+
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from . import log_model
+from utils.exit_hooks import register_exit_hook
+from utils.interprocess import InterProcessLock, LeaderElection, shared_state_enabled
+from utils.metrics import METRICS
+
+# ---------------------------------------------
+# 🔹 Storage Layout
+# ---------------------------------------------
+# data/telemetry/raw/<YYYYMMDD>.bin → every reading of one UTC day (fixed-size binary records)
+# data/telemetry/1m/<YYYYMMDD>.bin  → per-minute count/min/max/sum, once the day is RAW_RETENTION_DAYS old
+# data/telemetry/1h/<YYYYMMDD>.bin  → per-hour aggregates, once the day is MINUTE_RETENTION_DAYS old
+TELEMETRY_METRICS = {"power_w": 0, "heartbeat": 1, "temperature_c": 2, "current_a": 3}  # ✅ name → stored code
+METRIC_NAMES = {code: name for name, code in TELEMETRY_METRICS.items()}
+
+RAW_DTYPE = np.dtype([("ts", "<i8"), ("device", "<i4"), ("metric", "u1"), ("value", "<f4")])  # ✅ 17 bytes
+AGGREGATE_DTYPE = np.dtype([("ts", "<i8"), ("device", "<i4"), ("metric", "u1"), ("count", "<u4"),
+                            ("min", "<f4"), ("max", "<f4"), ("sum", "<f8")])  # ✅ 33 bytes
+TIERS = (("raw", None), ("1m", 60), ("1h", 3600))  # ✅ (directory, bucket seconds), finest first
+
+RAW_RETENTION_DAYS = 2  # ✅ Days kept at full resolution
+MINUTE_RETENTION_DAYS = 30  # ✅ Days kept at 1-minute resolution (hourly after that)
+MAX_FUTURE_SECONDS = 300  # ✅ Device clock skew tolerated on incoming timestamps
+MAX_VALUE = float(np.finfo(RAW_DTYPE["value"]).max)  # ✅ Largest magnitude the stored float32 holds
+DAY_SECONDS = 24 * 60 * 60
+
+BUFFER_CAPACITY = int(os.environ.get("TELEMETRY_BUFFER_CAPACITY", 200_000))  # ✅ Readings held before 503s
+FLUSH_INTERVAL_SECONDS = 1.0  # ✅ Longest a reading waits in memory
+COMPACT_INTERVAL_SECONDS = 600  # ✅ How often older days are downsampled
+
+
+def _day_name(epoch):
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y%m%d")
+
+
+class BufferFull(Exception):
+    """ ✅ Raised when a batch doesn't fit in the ingest ring (the caller answers 503) """
+
+    def __init__(self, retry_after):
+        super().__init__("Telemetry buffer full")
+        self.retry_after = retry_after
+
+
+def _stored_value(value):
+    """ ✅ ``value`` as the float that gets stored, or None if it isn't a number float32 can hold """
+    if type(value) not in (int, float):
+        return None
+    try:
+        value = float(value)  # ✅ An oversized JSON integer raises OverflowError here
+    except OverflowError:
+        return None
+    return value if math.isfinite(value) and abs(value) <= MAX_VALUE else None
+
+
+# ---------------------------------------------
+# 🔹 Validation (cheap: no registry lookups, one pass per batch)
+# ---------------------------------------------
+def parse_readings(readings, default_device=None, now=None):
+    """ ✅ Validates a batch of readings and returns (RAW_DTYPE array, [{"index", "error"}]).
+
+    A reading is {"device_id", "metric", "value", "ts"}; ``device_id`` may come
+    from the batch and ``ts`` (epoch seconds) defaults to now. Heartbeats may
+    omit ``value``.
+    """
+    now = time.time() if now is None else now
+    oldest = now - RAW_RETENTION_DAYS * DAY_SECONDS
+    rows, errors = [], []
+    for index, reading in enumerate(readings):
+        if not isinstance(reading, dict):
+            errors.append({"index": index, "error": "Reading must be an object"})
+            continue
+        device_id = reading.get("device_id", default_device)
+        metric_name = reading.get("metric")
+        metric = TELEMETRY_METRICS.get(metric_name) if isinstance(metric_name, str) else None
+        value = reading.get("value", 1 if metric == TELEMETRY_METRICS["heartbeat"] else None)
+        ts = reading.get("ts", now)
+        stored = _stored_value(value)
+        if type(device_id) is not int or device_id <= 0:
+            errors.append({"index": index, "error": "device_id must be a positive integer"})
+        elif metric is None:
+            errors.append({"index": index, "error": f"metric must be one of {sorted(TELEMETRY_METRICS)}"})
+        elif stored is None:
+            errors.append({"index": index, "error": "value must be a finite number"})
+        elif type(ts) not in (int, float) or not oldest <= ts <= now + MAX_FUTURE_SECONDS:
+            errors.append({"index": index, "error": "ts must be epoch seconds within the raw retention window"})
+        else:
+            rows.append((int(ts), device_id, metric, stored))
+    return np.array(rows, dtype=RAW_DTYPE), errors
+
+
+def aggregate(records, bucket_seconds):
+    """ ✅ Folds raw or aggregate records into (bucket, device, metric) AGGREGATE_DTYPE rows """
+    if records.dtype == RAW_DTYPE:
+        count = np.ones(len(records), dtype=np.uint32)
+        low = high = records["value"]
+        total = records["value"].astype(np.float64)
+    else:
+        count, low, high, total = records["count"], records["min"], records["max"], records["sum"]
+    bucket = records["ts"] - records["ts"] % bucket_seconds
+    order = np.lexsort((records["metric"], records["device"], bucket))
+    keys = np.stack([bucket[order], records["device"][order], records["metric"][order]], axis=1)
+    starts = np.concatenate([[0], np.nonzero(np.any(keys[1:] != keys[:-1], axis=1))[0] + 1]) if len(keys) else []
+
+    result = np.zeros(len(starts), dtype=AGGREGATE_DTYPE)
+    if len(starts):
+        result["ts"], result["device"], result["metric"] = keys[starts, 0], keys[starts, 1], keys[starts, 2]
+        result["count"] = np.add.reduceat(count[order], starts)
+        result["min"] = np.minimum.reduceat(low[order], starts)
+        result["max"] = np.maximum.reduceat(high[order], starts)
+        result["sum"] = np.add.reduceat(total[order], starts)
+    return result
+
+
+# ---------------------------------------------
+# 🔹 Compact time-series storage
+# ---------------------------------------------
+class TelemetryStore:
+    """ ✅ Append-only binary day files with automatic downsampling.
+
+    New readings are appended as fixed-size records to today's raw file (one
+    write per flush). ``compact`` rewrites days older than RAW_RETENTION_DAYS
+    into per-minute aggregates and days older than MINUTE_RETENTION_DAYS into
+    per-hour aggregates, each via temp file → rename. Reads memory-map a day
+    file and filter with NumPy.
+    """
+
+    def __init__(self, data_dir=None, fsync=True, shared=False):
+        self.root = os.path.abspath(os.path.join(data_dir or log_model.DATA_DIR, "telemetry"))
+        self.fsync_enabled = fsync
+        for tier, _ in TIERS:
+            os.makedirs(os.path.join(self.root, tier), exist_ok=True)
+        self._lock = InterProcessLock(os.path.join(self.root, ".append.lock")) if shared else threading.Lock()
+
+    def _path(self, tier, day):
+        return os.path.join(self.root, tier, f"{day}.bin")
+
+    def _read(self, tier, day):
+        dtype = RAW_DTYPE if tier == "raw" else AGGREGATE_DTYPE
+        path = self._path(tier, day)
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return np.zeros(0, dtype=dtype)
+        count = size // dtype.itemsize  # ✅ Ignores a torn trailing record
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def append(self, readings):
+        """ ✅ Appends a RAW_DTYPE batch, one write per UTC day touched; returns bytes written """
+        written = 0
+        days = readings["ts"] // DAY_SECONDS
+        with self._lock:
+            for day in np.unique(days):
+                chunk = readings[days == day]
+                path = self._path("raw", _day_name(int(day) * DAY_SECONDS))
+                torn = os.path.getsize(path) % RAW_DTYPE.itemsize if os.path.exists(path) else 0
+                if torn:
+                    os.truncate(path, os.path.getsize(path) - torn)  # ✅ Re-align after a crash mid-write
+                with open(path, "ab") as file:
+                    file.write(chunk.tobytes())
+                    file.flush()
+                    if self.fsync_enabled:
+                        os.fsync(file.fileno())
+                written += chunk.nbytes
+        return written
+
+    def compact(self, now=None):
+        """ ✅ Downsamples aged days (raw → 1m → 1h); returns {tier: days rewritten} """
+        now = time.time() if now is None else now
+        done = {"1m": 0, "1h": 0}
+        with self._lock:
+            for source, target, bucket_seconds, max_age_days in (("raw", "1m", 60, RAW_RETENTION_DAYS),
+                                                                 ("1m", "1h", 3600, MINUTE_RETENTION_DAYS)):
+                cutoff = _day_name(now - max_age_days * DAY_SECONDS)
+                for name in sorted(os.listdir(os.path.join(self.root, source))):
+                    day = name[:-len(".bin")]
+                    if not name.endswith(".bin") or day >= cutoff:
+                        continue
+                    rows = aggregate(self._read(source, day), bucket_seconds)
+                    existing = self._read(target, day)  # ✅ Late readings may already have been folded once
+                    if len(existing):
+                        rows = aggregate(np.concatenate([existing, rows]), bucket_seconds)
+                    self._write_atomic(self._path(target, day), rows)
+                    os.remove(self._path(source, day))
+                    done[target] += 1
+        return done
+
+    def _write_atomic(self, path, rows):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(rows.tobytes())
+            file.flush()
+            if self.fsync_enabled:
+                os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def query(self, device_id, metric=None, since=None, until=None):
+        """ ✅ Points for one device in time order, at whatever resolution each day is stored in.
+
+        Every point is {"ts", "metric", "resolution", "count", "min", "max", "mean"}
+        (raw readings have count 1 and min = max = mean = value).
+        """
+        until = time.time() if until is None else until
+        since = until - DAY_SECONDS if since is None else since
+        metric_code = None if metric is None else TELEMETRY_METRICS[metric]
+        points = []
+        for day_epoch in range(int(since) - int(since) % DAY_SECONDS, int(until) + 1, DAY_SECONDS):
+            day = _day_name(day_epoch)
+            for tier, _ in TIERS:
+                rows = self._read(tier, day)
+                if not len(rows):
+                    continue
+                mask = (rows["device"] == device_id) & (rows["ts"] >= since) & (rows["ts"] <= until)
+                if metric_code is not None:
+                    mask &= rows["metric"] == metric_code
+                for row in rows[mask].tolist():
+                    if tier == "raw":
+                        ts, _, code, value = row
+                        points.append({"ts": ts, "metric": METRIC_NAMES[code], "resolution": tier,
+                                       "count": 1, "min": value, "max": value, "mean": value})
+                    else:
+                        ts, _, code, count, low, high, total = row
+                        points.append({"ts": ts, "metric": METRIC_NAMES[code], "resolution": tier,
+                                       "count": count, "min": low, "max": high, "mean": total / count})
+        points.sort(key=lambda point: point["ts"])  # ✅ Late readings can leave a day in two tiers
+        return points
+
+    def size_bytes(self):
+        return sum(os.path.getsize(os.path.join(self.root, tier, name))
+                   for tier, _ in TIERS for name in os.listdir(os.path.join(self.root, tier)))
+
+
+# ---------------------------------------------
+# 🔹 Ingest ring & background flusher
+# ---------------------------------------------
+class TelemetryBuffer:
+    """ ✅ Bounded ring of RAW_DTYPE readings; a batch is taken whole or refused """
+
+    def __init__(self, capacity=BUFFER_CAPACITY):
+        self.capacity = capacity
+        self._ring = np.zeros(capacity, dtype=RAW_DTYPE)
+        self._head = 0  # ✅ Index of the oldest buffered reading
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, readings):
+        """ ✅ Copies the batch in; returns the new fill level or None when it doesn't fit """
+        count = len(readings)
+        with self._lock:
+            if self._size + count > self.capacity:
+                return None
+            start = (self._head + self._size) % self.capacity
+            first = min(count, self.capacity - start)
+            self._ring[start:start + first] = readings[:first]
+            self._ring[:count - first] = readings[first:]  # ✅ Wrap around
+            self._size += count
+            return self._size
+
+    def drain(self):
+        """ ✅ Removes & returns everything buffered, oldest first """
+        with self._lock:
+            end = self._head + self._size
+            if end <= self.capacity:
+                batch = self._ring[self._head:end].copy()
+            else:
+                batch = np.concatenate([self._ring[self._head:], self._ring[:end - self.capacity]])
+            self._head, self._size = 0, 0
+            return batch
+
+    def __len__(self):
+        return self._size
+
+
+class TelemetryPipeline:
+    """ ✅ Validate → ring buffer → batched flush to TelemetryStore.
+
+    Requests only validate and copy into the ring. One flusher thread writes
+    the ring out every ``flush_interval`` seconds, or sooner once it is a
+    quarter full, and downsamples aged days every ``compact_interval``.
+    """
+
+    def __init__(self, store=None, capacity=BUFFER_CAPACITY, flush_interval=FLUSH_INTERVAL_SECONDS,
+                 compact_interval=COMPACT_INTERVAL_SECONDS, leader=None):
+        self.store = store or TelemetryStore()
+        self.buffer = TelemetryBuffer(capacity)
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._leader = leader  # ✅ Shared mode: only the elected worker downsamples
+        self._flush_threshold = max(1, capacity // 4)
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._last_compact = 0.0
+        self._stats_lock = threading.Lock()
+        self.stats = {"accepted": 0, "rejected": 0, "refused": 0, "flushed": 0, "flushes": 0, "bytes_written": 0}
+
+    def ingest(self, readings, default_device=None):
+        """ ✅ Buffers the valid readings; returns (accepted, errors) or raises BufferFull """
+        batch, errors = parse_readings(readings, default_device)
+        self._count("rejected", len(errors))
+        if len(batch):
+            fill = self.buffer.put(batch)
+            if fill is None:
+                self._count("refused", len(batch))
+                raise BufferFull(retry_after=max(1, math.ceil(self.flush_interval)))
+            if fill >= self._flush_threshold:
+                self._wakeup.set()
+            self._count("accepted", len(batch))
+        return len(batch), errors
+
+    def _count(self, result, readings):
+        if readings:
+            with self._stats_lock:
+                self.stats[result] += readings
+            METRICS.inc("telemetry_readings_total", (("result", result),), readings)
+
+    def flush(self):
+        """ ✅ Writes everything buffered to the store; returns the number of readings written """
+        with self._flush_lock:
+            batch = self.buffer.drain()
+            if not len(batch):
+                return 0
+            started = time.perf_counter()
+            written = self.store.append(batch)
+            METRICS.observe("telemetry_flush_seconds", time.perf_counter() - started)
+            with self._stats_lock:
+                self.stats["bytes_written"] += written
+                self.stats["flushed"] += len(batch)
+                self.stats["flushes"] += 1
+            return len(batch)
+
+    def compact(self, now=None):
+        if self._leader is not None and not self._leader.is_leader():
+            return {}
+        with self._flush_lock:
+            return self.store.compact(now)
+
+    def status(self):
+        return {"buffered": len(self.buffer), "capacity": self.buffer.capacity, **self.stats}
+
+    def start(self):
+        """ ✅ Starts the background flusher (idempotent) """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._loop, name="telemetry-flusher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _loop(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if time.time() - self._last_compact >= self.compact_interval:
+                    self._last_compact = time.time()
+                    self.compact()
+            except Exception as e:
+                print(f"❌ Telemetry flush failed: {str(e)}")  # ✅ Keep the flusher alive for later batches
+
+
+# ---------------------------------------------
+# 🔹 Shared pipeline (lazy, swappable for tests)
+# ---------------------------------------------
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_telemetry_pipeline():
+    """ ✅ Returns the process-wide TelemetryPipeline, starting its flusher on first use """
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                shared = shared_state_enabled()
+                store = TelemetryStore(shared=shared)
+                leader = LeaderElection(os.path.join(store.root, ".compact.leader")) if shared else None
+                _pipeline = TelemetryPipeline(store, leader=leader).start()
+                register_exit_hook(_flush_pipeline_at_exit)
+    return _pipeline
+
+
+def set_telemetry_pipeline(pipeline):
+    """ ✅ Replaces the shared TelemetryPipeline (used by tests & the simulator) """
+    global _pipeline
+    with _pipeline_lock:
+        previous, _pipeline = _pipeline, pipeline
+    return previous
+
+
+def _flush_pipeline_at_exit():
+    """ ✅ Don't lose the buffered tail on shutdown """
+    if _pipeline is not None:
+        _pipeline.flush()
@@ -0,0 +1,188 @@
+### `models/toggle_model.py`
+
+import os
+import threading
+
+from .device_model import apply_device_action, get_device_registry
+from utils.exit_hooks import register_exit_hook
+from utils.metrics import METRICS
+from utils.rate_limit import TokenBucketLimiter
+
+# ---------------------------------------------
+# 🔹 Toggle storm protection settings (environment overrides)
+# ---------------------------------------------
+TOGGLE_DEBOUNCE_SECONDS = float(os.environ.get("TOGGLE_DEBOUNCE_MS", 500)) / 1000  # ✅ 0 → every toggle applied
+TOGGLE_USER_RATE = float(os.environ.get("TOGGLE_USER_RATE", 2))  # ✅ Sustained toggles/second per user (0 → off)
+TOGGLE_USER_BURST = int(os.environ.get("TOGGLE_USER_BURST", 10))
+TOGGLE_IP_RATE = float(os.environ.get("TOGGLE_IP_RATE", 10))  # ✅ Per client IP (a lab PC may serve several users)
+TOGGLE_IP_BURST = int(os.environ.get("TOGGLE_IP_BURST", 40))
+TOGGLE_MAX_BUCKETS = 10_000  # ✅ Buckets kept per limiter before the least recently used is evicted
+
+
+class _Window:
+    """ ✅ One device's open debounce window """
+
+    __slots__ = ("lock", "device", "applied", "target", "username", "toggles", "timer", "closed")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.device = None
+        self.applied = self.target = None
+        self.username = None
+        self.toggles = 0
+        self.timer = None
+        self.closed = False
+
+
+class ToggleGuard:
+    """ ✅ Rate limits & debounces POST /devices/<id>/toggle.
+
+    ``admit`` spends a token from the caller's user bucket and IP bucket
+    (``TokenBucketLimiter``: bounded, idle buckets evicted least recently used
+    first) and returns the seconds to wait when either is empty.
+
+    ``toggle`` is a leading + trailing debounce per device: the first toggle
+    after a quiet period is applied at once (instant feedback), every further
+    toggle within ``debounce`` seconds only flips the pending target, and when
+    the window ends the net result is applied as one state change & one log
+    entry, or nothing at all if the toggles cancelled out. A storm therefore
+    flips the relay at most once per window.
+    """
+
+    def __init__(self, debounce=TOGGLE_DEBOUNCE_SECONDS, user_rate=TOGGLE_USER_RATE, user_burst=TOGGLE_USER_BURST,
+                 ip_rate=TOGGLE_IP_RATE, ip_burst=TOGGLE_IP_BURST, max_buckets=TOGGLE_MAX_BUCKETS,
+                 action=apply_device_action, clock=None):
+        clock_kwargs = {"clock": clock} if clock is not None else {}
+        self.debounce = debounce
+        self.users = TokenBucketLimiter(user_rate, user_burst, max_buckets, **clock_kwargs)
+        self.ips = TokenBucketLimiter(ip_rate, ip_burst, max_buckets, **clock_kwargs)
+        self._action = action
+        self._windows = {}  # ✅ device id → open _Window
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------
+    # 🔹 Rate limiting
+    # ---------------------------------------------
+    def admit(self, username=None, ip=None):
+        """ ✅ 0 if the request may proceed, else seconds until it would be allowed """
+        wait = self.ips.take(ip) if ip else 0
+        if username:
+            wait = max(wait, self.users.take(username.lower()))
+        return wait
+
+    # ---------------------------------------------
+    # 🔹 Debounce / coalescing
+    # ---------------------------------------------
+    def toggle(self, device_id, username="System User"):
+        """ ✅ Returns (device as it is / will be, coalesced?); (None, False) for an unknown device """
+        if self.debounce <= 0:
+            device, _ = self._action(device_id, username=username)
+            return device, False
+        while True:
+            with self._lock:
+                window = self._windows.get(device_id)
+                leading = window is None
+                if leading:
+                    window = _Window()
+                    window.lock.acquire()  # ✅ Held before publishing: nobody sees the window half-opened
+                    self._windows[device_id] = window
+            if leading:
+                try:
+                    return self._open(device_id, window, username)
+                finally:
+                    window.lock.release()
+            with window.lock:
+                if window.closed:
+                    continue  # ✅ Closed while we waited: this toggle starts the next window
+                window.target = "off" if window.target == "on" else "on"
+                window.username = username
+                window.toggles += 1
+                return {**window.device, "status": window.target}, True
+
+    def _open(self, device_id, window, username):
+        device, _ = self._action(device_id, username=username)
+        if device is None:
+            self._close(device_id, window)
+            return None, False
+        window.device, window.applied, window.target = device, device["status"], device["status"]
+        self._arm(device_id, window)
+        return device, False
+
+    def _arm(self, device_id, window):
+        window.timer = threading.Timer(self.debounce, self._settle, args=(device_id, window))
+        window.timer.daemon = True
+        window.timer.start()
+
+    def _settle(self, device_id, window, rearm=True):
+        """ ✅ End of a window: apply the net change (then keep debouncing) or close """
+        with window.lock:
+            if window.closed:
+                return
+            current = get_device_registry().get(device_id)  # ✅ The scheduler or a bulk command may have switched it
+            if current is not None:
+                window.applied = current["status"]
+            if current is None or window.target == window.applied:
+                METRICS.inc("device_toggles_coalesced_total", (), window.toggles)  # ✅ Cancelled out
+            else:
+                device, _ = self._action(device_id, action=window.target, username=window.username)
+                METRICS.inc("device_toggles_coalesced_total", (), window.toggles - 1)
+                if device is not None and rearm:
+                    window.device, window.applied, window.target = device, device["status"], device["status"]
+                    window.toggles = 0
+                    self._arm(device_id, window)  # ✅ A storm still in progress flips at most once per window
+                    return
+            self._close(device_id, window)
+
+    def _close(self, device_id, window):
+        window.closed = True
+        with self._lock:
+            if self._windows.get(device_id) is window:
+                del self._windows[device_id]
+
+    def pending(self):
+        """ ✅ {device id: pending target status} for windows whose net result differs from the device """
+        with self._lock:
+            windows = list(self._windows.items())
+        return {device_id: window.target for device_id, window in windows
+                if window.target is not None and window.target != window.applied}
+
+    def flush(self):
+        """ ✅ Settles every open window now (tests, shutdown) """
+        with self._lock:
+            windows = list(self._windows.items())
+        for device_id, window in windows:
+            if window.timer is not None:
+                window.timer.cancel()
+            self._settle(device_id, window, rearm=False)
+
+
+# ---------------------------------------------
+# 🔹 Shared guard instance (lazy, swappable for tests & benchmarks)
+# ---------------------------------------------
+_guard = None
+_guard_lock = threading.Lock()
+
+
+def get_toggle_guard():
+    """ ✅ Returns the process-wide ToggleGuard (per worker process in pre-fork mode) """
+    global _guard
+    if _guard is None:
+        with _guard_lock:
+            if _guard is None:
+                _guard = ToggleGuard()
+                register_exit_hook(_flush_guard_at_exit)
+    return _guard
+
+
+def set_toggle_guard(guard):
+    """ ✅ Replaces the shared ToggleGuard (used by tests & benchmarks) """
+    global _guard
+    with _guard_lock:
+        previous, _guard = _guard, guard
+    return previous
+
+
+def _flush_guard_at_exit():
+    """ ✅ A pending net change still reaches the device & the log on shutdown """
+    if _guard is not None:
+        _guard.flush()
@@ -0,0 +1,242 @@
+### `models/usage_model.py`
+
+import threading
+from datetime import date, datetime, timezone
+
+from .log_model import LogRecord, get_log_store
+
+DAY_SECONDS = 24 * 60 * 60
+OFFSET_STEP_SECONDS = 15 * 60  # ✅ UTC offsets (and their DST changes) fall on quarter hours
+SWITCH_ACTIONS = ("on", "off")
+
+
+def local_seconds(value):
+    """ ✅ "YYYY-MM-DD HH:MM:SS" (local wall clock) → seconds, so day buckets follow the lab's calendar """
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _wall_clock_epoch(record):
+    """ ✅ A LogRecord's epoch seconds when its timestamp formats back from them exactly, else None """
+    if type(record) is not LogRecord or record.epoch is None:
+        return None
+    if record.extra is not None and "timestamp" in record.extra:
+        return None  # ✅ Kept verbatim (e.g. a time skipped by DST): the string is the wall clock
+    return record.epoch
+
+
+def local_offsets(epochs):
+    """ ✅ UTC offset (seconds) of the lab's wall clock at each epoch in a NumPy array.
+
+    The offset is looked up once per distinct quarter hour instead of once per record.
+    """
+    import numpy as np
+
+    quarters, inverse = np.unique(np.floor_divide(epochs, OFFSET_STEP_SECONDS), return_inverse=True)
+    offsets = np.array([local_seconds(datetime.fromtimestamp(start)) - start
+                        for start in (quarters * OFFSET_STEP_SECONDS).tolist()], dtype=np.float64)
+    return offsets[inverse]
+
+
+def bucket_key(day_number, period):
+    """ ✅ Day number (days since epoch) → "YYYY-MM-DD" or ISO week "YYYY-Www" """
+    day = date.fromordinal(date(1970, 1, 1).toordinal() + int(day_number))
+    if period == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.isoformat()
+
+
+def split_by_day(start, end):
+    """ ✅ Yields (day number, seconds) for an interval, splitting at midnight """
+    while start < end:
+        day = int(start // DAY_SECONDS)
+        boundary = min(end, (day + 1) * DAY_SECONDS)
+        yield day, boundary - start
+        start = boundary
+
+
+class UsageTracker:
+    """ ✅ Usage-hours accounting from ON/OFF transitions in the log.
+
+    ``observe`` updates the running totals in O(1) per log record; ``rebuild``
+    replays the whole history once with vectorized NumPy passes. Time spent
+    ON is attributed to the device and to the user whose action switched it on,
+    and is also accumulated into per-day buckets (weeks are derived from days).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}  # ✅ device → seconds ON (closed intervals)
+        self._on_since = {}  # ✅ device → (start seconds, username) while currently ON
+        self._daily = {"device": {}, "user": {}}  # ✅ by → key → day number → seconds
+
+    # ---------------------------------------------
+    # 🔹 Incremental path (one call per appended log record)
+    # ---------------------------------------------
+    def observe(self, record):
+        if record.get("action") not in SWITCH_ACTIONS or not record.get("device"):
+            return
+        try:
+            moment = local_seconds(record["timestamp"])
+        except (KeyError, ValueError):
+            return
+        device = record["device"]
+        with self._lock:
+            running = self._on_since.get(device)
+            if running is not None:
+                self._close(device, running, moment)
+            if record["action"] == "on":
+                self._on_since[device] = (moment, record.get("username"))
+            else:
+                self._on_since.pop(device, None)
+
+    def observe_many(self, records):
+        for record in records:
+            self.observe(record)
+
+    def _close(self, device, running, end):
+        """ ✅ Books an ON interval (caller holds self._lock) """
+        start, username = running
+        if end <= start:
+            return
+        self._totals[device] = self._totals.get(device, 0.0) + (end - start)
+        for day, seconds in split_by_day(start, end):
+            self._add_daily("device", device, day, seconds)
+            if username:
+                self._add_daily("user", username, day, seconds)
+        self._on_since[device] = (end, username)
+
+    def _add_daily(self, by, key, day, seconds):
+        days = self._daily[by].setdefault(key, {})
+        days[day] = days.get(day, 0.0) + seconds
+
+    # ---------------------------------------------
+    # 🔹 One-time vectorized rebuild from history
+    # ---------------------------------------------
+    def rebuild(self, records):
+        """ ✅ Recomputes every accumulator from the full log in a few NumPy passes.
+
+        ``records`` may be a callable; it is then loaded while holding the tracker
+        lock, so appends observed concurrently are applied after the rebuild.
+        """
+        with self._lock:
+            if callable(records):
+                records = records()
+            parsed = []
+            for record in records:
+                if record.get("action") not in SWITCH_ACTIONS or not record.get("device"):
+                    continue
+                epoch = _wall_clock_epoch(record)  # ✅ Store records: no timestamp string parsed per record
+                try:
+                    moment = local_seconds(record["timestamp"]) if epoch is None else epoch
+                except (KeyError, ValueError):
+                    continue
+                parsed.append((record["device"], record.get("username") or "", moment, epoch is not None,
+                               record["action"] == "on"))
+
+            self._totals, self._on_since = {}, {}
+            self._daily = {"device": {}, "user": {}}
+            if not parsed:
+                return
+
+            import numpy as np  # ✅ Deferred: only a rebuild needs it, so importing the model stays cheap
+
+            device_names, users, moments, from_epoch, is_on = zip(*parsed)
+            device_labels, device_codes = np.unique(np.array(device_names), return_inverse=True)
+            user_labels, user_codes = np.unique(np.array(users), return_inverse=True)
+            moments = np.array(moments, dtype=np.float64)
+            from_epoch = np.array(from_epoch, dtype=bool)
+            if from_epoch.any():
+                moments[from_epoch] += local_offsets(moments[from_epoch])  # ✅ Epoch → local wall-clock seconds
+            is_on = np.array(is_on, dtype=bool)
+
+            # ✅ Group by device, keeping log order inside each device
+            order = np.argsort(device_codes, kind="stable")
+            device_codes, user_codes, moments, is_on = device_codes[order], user_codes[order], moments[order], is_on[order]
+
+            # ✅ An interval between consecutive events of one device counts when the earlier event left it ON
+            counted = is_on[:-1] & (device_codes[1:] == device_codes[:-1])
+            starts, ends = moments[:-1][counted], moments[1:][counted]
+            owners, owner_users = device_codes[:-1][counted], user_codes[:-1][counted]
+            durations = np.clip(ends - starts, 0, None)
+
+            totals = np.bincount(owners, weights=durations, minlength=len(device_labels))
+            self._totals = {str(device_labels[i]): float(totals[i]) for i in np.nonzero(totals)[0]}
+
+            # ✅ Daily buckets: same-day intervals in one grouped pass, midnight-crossers split explicitly
+            start_days = np.floor_divide(starts, DAY_SECONDS).astype(np.int64)
+            same_day = start_days == np.floor_divide(np.maximum(ends - 1e-9, starts), DAY_SECONDS).astype(np.int64)
+            for by, codes, labels in (("device", owners, device_labels), ("user", owner_users, user_labels)):
+                keys = codes[same_day].astype(np.int64) * (1 << 32) + start_days[same_day]
+                unique_keys, inverse = np.unique(keys, return_inverse=True)
+                sums = np.bincount(inverse, weights=durations[same_day])
+                for key, seconds in zip(unique_keys.tolist(), sums.tolist()):
+                    label = str(labels[key >> 32])
+                    if by == "user" and not label:
+                        continue
+                    self._add_daily(by, label, key & 0xFFFFFFFF, seconds)
+            for i in np.nonzero(~same_day)[0]:
+                for day, seconds in split_by_day(starts[i], ends[i]):
+                    self._add_daily("device", str(device_labels[owners[i]]), day, seconds)
+                    if user_labels[owner_users[i]]:
+                        self._add_daily("user", str(user_labels[owner_users[i]]), day, seconds)
+
+            # ✅ Devices whose last event is ON are still running
+            last_of_device = np.append(device_codes[1:] != device_codes[:-1], True)
+            for i in np.nonzero(last_of_device & is_on)[0]:
+                self._on_since[str(device_labels[device_codes[i]])] = (float(moments[i]), str(user_labels[user_codes[i]]) or None)
+
+    # ---------------------------------------------
+    # 🔹 Reads (no log scan; open intervals are added up to "now")
+    # ---------------------------------------------
+    def total_hours(self, device, now=None):
+        now = local_seconds(datetime.now()) if now is None else now
+        with self._lock:
+            seconds = self._totals.get(device, 0.0)
+            running = self._on_since.get(device)
+            if running is not None and now > running[0]:
+                seconds += now - running[0]
+            return round(seconds / 3600, 2)
+
+    def rollup(self, period="day", by="device", key=None, now=None):
+        """ ✅ {device|user: {day or ISO week: hours}} including the currently running intervals """
+        now = local_seconds(datetime.now()) if now is None else now
+        with self._lock:
+            daily = {name: dict(days) for name, days in self._daily[by].items() if key is None or name == key}
+            for device, (start, username) in self._on_since.items():
+                name = device if by == "device" else username
+                if not name or (key is not None and name != key) or now <= start:
+                    continue
+                for day, seconds in split_by_day(start, now):
+                    days = daily.setdefault(name, {})
+                    days[day] = days.get(day, 0.0) + seconds
+
+        result = {}
+        for name, days in daily.items():
+            buckets = {}
+            for day, seconds in sorted(days.items()):
+                label = bucket_key(day, period)
+                buckets[label] = buckets.get(label, 0.0) + seconds
+            result[name] = {label: round(seconds / 3600, 2) for label, seconds in buckets.items()}
+        return result
+
+
+# ---------------------------------------------
+# 🔹 Shared tracker (rebuilt once per log store, then fed by its append listener)
+# ---------------------------------------------
+_usage = {"store": None, "tracker": None}
+_usage_lock = threading.Lock()
+
+
+def get_usage_tracker():
+    """ ✅ Returns the UsageTracker for the current log store, rebuilding it on first use """
+    store = get_log_store()
+    if _usage["store"] is not store:
+        with _usage_lock:
+            if _usage["store"] is not store:
+                tracker = UsageTracker()
+                store.add_listener(tracker.observe_many)  # ✅ Before the rebuild so no append is missed
+                tracker.rebuild(store.all)
+                _usage.update(store=store, tracker=tracker)
+    return _usage["tracker"]
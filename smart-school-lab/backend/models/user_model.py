@@ -1,6 +1,272 @@
 ### `models/user_model.py`
 
-users = [
-    {"id": 1, "username": "teacher1", "password": "pass123", "role": "teacher"},
-    {"id": 2, "username": "student1", "password": "pass123", "role": "student"}
-]
\ No newline at end of file
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from werkzeug.security import check_password_hash
+
+from . import log_model
+from utils.interprocess import shared_state_enabled
+
+# ✅ Demo accounts earlier users.db files were seeded with; their known password is revoked on open
+REVOKED_DEMO_LOGINS = {"teacher1": "pass123", "student1": "pass123"}
+SCHEMA_VERSION = 1  # ✅ PRAGMA user_version: 1 → demo passwords revoked
+POOL_SIZE = 4  # ✅ Pooled SQLite connections (each keeps its own prepared-statement cache)
+CACHE_SIZE = 2048  # ✅ Users kept in the read-through cache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,  -- AUTOINCREMENT: ids are never reused after a delete
+    username TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    email TEXT UNIQUE COLLATE NOCASE,
+    password TEXT,
+    role TEXT NOT NULL,
+    created TEXT NOT NULL
+);
+"""
+COLUMNS = "id, username, email, password, role, created"
+SELECT_BY_ID = f"SELECT {COLUMNS} FROM users WHERE id = ?"
+SELECT_BY_EMAIL = f"SELECT {COLUMNS} FROM users WHERE email = ?"
+SELECT_BY_USERNAME = f"SELECT {COLUMNS} FROM users WHERE username = ?"
+SELECT_PAGE = f"SELECT {COLUMNS} FROM users WHERE id > ? ORDER BY id LIMIT ?"
+INSERT_USER = "INSERT INTO users (id, username, email, password, role, created) VALUES (?, ?, ?, ?, ?, ?)"
+DELETE_USER = "DELETE FROM users WHERE id = ?"
+COUNT_USERS = "SELECT COUNT(*) FROM users"
+CLEAR_PASSWORD = "UPDATE users SET password = NULL WHERE id = ?"
+
+
+class UserExists(ValueError):
+    """ ✅ Raised when the username or email is already registered """
+
+    def __init__(self, field):
+        super().__init__(f"{field} already exists")
+        self.field = field
+
+
+class UserRepository:
+    """ ✅ Durable user store: SQLite (WAL) behind a small connection pool.
+
+    The UNIQUE username/email columns are the lookup indexes; AUTOINCREMENT
+    keeps ids monotonic. Every statement is a module-level constant, so each
+    pooled connection compiles it once and reuses the prepared statement.
+    Lookups go through an LRU read-through cache that writes invalidate. With
+    ``shared=True`` (several worker processes) the cache is also dropped
+    whenever ``PRAGMA data_version`` shows a commit from another connection.
+    """
+
+    def __init__(self, path=None, pool_size=POOL_SIZE, cache_size=CACHE_SIZE, seed=True, shared=False):
+        self.path = os.path.abspath(path or os.path.join(log_model.DATA_DIR, "users.db"))
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # ✅ ("id"|"email"|"username", key) → user dict
+        self._cache_lock = threading.Lock()
+        self._write_lock = threading.Lock()  # ✅ One writer at a time (SQLite allows one anyway)
+
+        created = not os.path.exists(self.path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+        self._watch = self._connect() if shared else None  # ✅ Dedicated connection for data_version checks
+        self._data_version = None
+        if created and seed:
+            self._import_legacy()
+        elif not created and version < 1:
+            self._revoke_demo_passwords()
+        if version < SCHEMA_VERSION:
+            with self._connection() as connection:
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10, cached_statements=64)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")  # ✅ Readers never block the writer
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def _connection(self):
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    # ---------------------------------------------
+    # 🔹 One-time reconciliation of the legacy user list
+    # ---------------------------------------------
+    def _import_legacy(self):
+        """ ✅ Imports an existing data/users.json by username (case-insensitive), once, when users.db is created.
+
+        Nothing is seeded when there is no users.json. Imported accounts get no
+        password (NULL = reset required): they can't log in until one is set,
+        whatever the file held. Permissions always follow the role.
+        """
+        try:
+            with open(os.path.join(os.path.dirname(self.path), "users.json"), "r") as file:
+                listed = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        merged = OrderedDict()
+        for user in listed:
+            merged.setdefault(user["username"].lower(), {"username": user["username"], "role": user["role"]})
+        for entry in merged.values():
+            try:
+                self.add(entry["username"], None, None, entry["role"])
+            except UserExists:
+                continue
+
+    def _revoke_demo_passwords(self):
+        """ ✅ users.db files from before SCHEMA_VERSION 1 seeded demo logins: those still on their known
+        password are reset (NULL) rather than left open with fixed credentials """
+        for username, known_password in REVOKED_DEMO_LOGINS.items():
+            user = self.get_by_username(username)
+            if user is None or not user["password"] or not check_password_hash(user["password"], known_password):
+                continue
+            with self._write_lock, self._connection() as connection:
+                with connection:
+                    connection.execute(CLEAR_PASSWORD, (user["id"],))
+            self._invalidate(user)
+
+    # ---------------------------------------------
+    # 🔹 Read-through cache
+    # ---------------------------------------------
+    def _cache_get(self, key):
+        with self._cache_lock:
+            user = self._cache.get(key)
+            if user is not None:
+                self._cache.move_to_end(key)
+                return dict(user)
+            return None
+
+    def _cache_put(self, user):
+        with self._cache_lock:
+            for key in self._keys(user):
+                self._cache[key] = user
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _invalidate(self, user):
+        with self._cache_lock:
+            for key in self._keys(user):
+                self._cache.pop(key, None)
+
+    @staticmethod
+    def _keys(user):
+        keys = [("id", user["id"]), ("username", user["username"].lower())]
+        if user.get("email"):
+            keys.append(("email", user["email"].lower()))
+        return keys
+
+    def _drop_stale_cache(self):
+        """ ✅ Shared mode: clears the cache if any other connection committed since the last check """
+        if self._watch is None:
+            return
+        with self._cache_lock:
+            data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._cache.clear()
+
+    def _lookup(self, kind, value, sql):
+        if value is None:
+            return None
+        self._drop_stale_cache()
+        key = (kind, value.lower() if isinstance(value, str) else value)
+        user = self._cache_get(key)
+        if user is not None:
+            return user
+        with self._connection() as connection:
+            row = connection.execute(sql, (value,)).fetchone()
+        if row is None:
+            return None
+        user = dict(row)
+        self._cache_put(user)
+        return dict(user)
+
+    # ---------------------------------------------
+    # 🔹 Public API
+    # ---------------------------------------------
+    def get(self, user_id):
+        return self._lookup("id", user_id, SELECT_BY_ID)
+
+    def get_by_email(self, email):
+        return self._lookup("email", email, SELECT_BY_EMAIL)
+
+    def get_by_username(self, username):
+        return self._lookup("username", username, SELECT_BY_USERNAME)
+
+    def add(self, username, email, password_hash, role):
+        """ ✅ Inserts a user and returns it (raises UserExists on a duplicate username/email) """
+        created = datetime.now().strftime(log_model.TIMESTAMP_FORMAT)
+        with self._write_lock, self._connection() as connection:
+            try:
+                with connection:
+                    cursor = connection.execute(INSERT_USER, (None, username, email, password_hash, role, created))
+            except sqlite3.IntegrityError as e:
+                raise UserExists("email" if "email" in str(e) else "username") from e
+        user = {"id": cursor.lastrowid, "username": username, "email": email,
+                "password": password_hash, "role": role, "created": created}
+        self._cache_put(user)
+        return dict(user)
+
+    def delete(self, user_id):
+        user = self.get(user_id)
+        if user is None:
+            return False
+        with self._write_lock, self._connection() as connection:
+            with connection:
+                connection.execute(DELETE_USER, (user_id,))
+        self._invalidate(user)
+        return True
+
+    def page(self, cursor=None, limit=100):
+        """ ✅ Keyset page ordered by id: returns (users, next_cursor) """
+        with self._connection() as connection:
+            rows = connection.execute(SELECT_PAGE, (cursor or 0, limit + 1)).fetchall()
+        users = [dict(row) for row in rows[:limit]]
+        return users, (users[-1]["id"] if len(rows) > limit else None)
+
+    def __len__(self):
+        with self._connection() as connection:
+            return connection.execute(COUNT_USERS).fetchone()[0]
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+        if self._watch is not None:
+            self._watch.close()
+
+
+# ---------------------------------------------
+# 🔹 Shared repository (lazy, swappable for tests)
+# ---------------------------------------------
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_user_repository():
+    """ ✅ Returns the process-wide UserRepository, creating users.db on first use """
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = UserRepository(shared=shared_state_enabled())
+    return _repository
+
+
+def set_user_repository(repository):
+    """ ✅ Replaces the shared UserRepository (used by tests) """
+    global _repository
+    with _repository_lock:
+        previous, _repository = _repository, repository
+    return previous
@@ -0,0 +1,92 @@
+import pytest
+import models.log_model as log_model
+from models.access_model import AccessQueue, set_access_queue
+from models.log_model import LogStore, set_log_store
+from models.device_model import DeviceRegistry, set_device_registry
+from models.schedule_model import Scheduler, set_scheduler
+from models.toggle_model import ToggleGuard, set_toggle_guard
+from models.user_model import UserRepository, set_user_repository
+from utils.password_pool import PasswordHashPool, set_password_pool
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_data_dir(tmp_path_factory):
+    """ ✅ Keeps every test (and background worker) away from the real data/ directory """
+    data_dir = tmp_path_factory.mktemp("data")
+    original, log_model.DATA_DIR = log_model.DATA_DIR, str(data_dir)
+    yield data_dir
+    log_model.DATA_DIR = original
+
+
+@pytest.fixture
+def log_store(tmp_path):
+    """ ✅ Points the shared log store at a temporary data directory """
+    store = LogStore(data_dir=tmp_path, fsync=False)
+    previous = set_log_store(store)
+    yield store
+    store.close()
+    set_log_store(previous)
+
+
+@pytest.fixture
+def device_registry(tmp_path):
+    """ ✅ Fresh device registry persisted to a temporary devices.json """
+    registry = DeviceRegistry(path=tmp_path / "devices.json", snapshot_delay=0)
+    previous = set_device_registry(registry)
+    yield registry
+    set_device_registry(previous)
+
+
+@pytest.fixture
+def scheduler(tmp_path, device_registry, log_store):
+    """ ✅ Scheduler persisted to a temporary file; not started (tests fire it explicitly) """
+    scheduler = Scheduler(path=tmp_path / "schedules.json")
+    previous = set_scheduler(scheduler)
+    yield scheduler
+    set_scheduler(previous)
+
+
+@pytest.fixture
+def access_queue(tmp_path):
+    """ ✅ Access-request queue persisted to a temporary file; expiry thread not started """
+    queue = AccessQueue(path=tmp_path / "access_requests.json")
+    previous = set_access_queue(queue)
+    yield queue
+    set_access_queue(previous)
+
+
+@pytest.fixture
+def toggle_guard():
+    """ ✅ Storm protection off: every toggle is applied at once (tests that need it build their own guard) """
+    guard = ToggleGuard(debounce=0, user_rate=0, ip_rate=0)
+    previous = set_toggle_guard(guard)
+    yield guard
+    set_toggle_guard(previous)
+
+
+@pytest.fixture
+def password_pool():
+    """ ✅ Cheap inline hashing so tests don't spawn worker processes """
+    pool = PasswordHashPool(workers=0, method="pbkdf2:sha256:1000")
+    previous = set_password_pool(pool)
+    yield pool
+    set_password_pool(previous)
+
+
+@pytest.fixture
+def user_repository(tmp_path):
+    """ ✅ Empty SQLite user store in a temporary directory """
+    repository = UserRepository(path=tmp_path / "users.db", seed=False)
+    previous = set_user_repository(repository)
+    yield repository
+    repository.close()
+    set_user_repository(previous)
+
+
+@pytest.fixture
+def client(log_store, device_registry, scheduler, access_queue, toggle_guard, password_pool, user_repository):
+    """ ✅ Flask test client backed by the temporary log store & device registry """
+    from app import create_app
+    app = create_app({"TESTING": True, "PREWARM": False})  # ✅ Stores come from the fixtures above
+    with app.test_client() as client:
+        yield client
@@ -0,0 +1,73 @@
+from models.access_model import AccessQueue
+
+PROJECTOR = {"id": 2, "name": "Projector"}
+BOARD = {"id": 3, "name": "Smart Board"}
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_teachers_first_then_fifo_and_idempotent_requests(tmp_path):
+    queue = AccessQueue(path=tmp_path / "access_requests.json", clock=FakeClock(1000.0))
+    first, created = queue.submit(PROJECTOR, "student1", role="student")
+    assert created and first["status"] == "pending"
+    queue.submit(PROJECTOR, "student2", role="student")
+    queue.submit(PROJECTOR, "teacher1", role="teacher")
+    queue.submit(BOARD, "Student1", role="student")
+
+    again, created = queue.submit(PROJECTOR, "STUDENT1", role="student")
+    assert not created and again["id"] == first["id"]  # ✅ Still waiting: no duplicate
+    assert [r["username"] for r in queue.pending(device_id=2)] == ["teacher1", "student1", "student2"]
+    assert [r["device_id"] for r in queue.for_user("student1")] == [2, 3]
+    assert len(queue) == 4
+
+
+def test_stale_requests_expire_and_survive_restart(tmp_path):
+    clock = FakeClock(1000.0)
+    queue = AccessQueue(path=tmp_path / "access_requests.json", ttl=60, clock=clock)
+    events = []
+    queue.add_listener(lambda request: events.append((request["username"], request["status"])))
+    queue.submit(PROJECTOR, "student1")
+    clock.now = 1030.0
+    queue.submit(PROJECTOR, "student2")
+
+    assert queue.expire(now=1059.0) == []
+    assert [r["username"] for r in queue.expire(now=1060.0)] == ["student1"]
+    assert events[-1] == ("student1", "expired")
+
+    rebuilt = AccessQueue(path=tmp_path / "access_requests.json", ttl=60, clock=clock)
+    assert [r["username"] for r in rebuilt.pending()] == ["student2"]
+    assert [r["username"] for r in rebuilt.expire(now=1090.0)] == ["student2"]
+    assert rebuilt.for_user("student2") == []
+
+
+def test_batch_approve_and_deny_routes(client, access_queue, log_store):
+    for username in ("student1", "student2", "student3"):
+        assert client.post("/devices/2/request-access", json={"username": username}).json["queued"]
+    assert client.post("/devices/1/request-access", json={"username": "student1"}).status_code == 200
+    assert not client.post("/devices/2/request-access", json={"username": "student1"}).json["queued"]
+
+    pending = client.get("/devices/access-requests").json
+    assert [(r["device_id"], r["username"]) for r in pending] == [
+        (1, "student1"), (2, "student1"), (2, "student2"), (2, "student3")]
+    assert len(client.get("/devices/access-requests?username=student1").json) == 2
+
+    first_ids = [pending[1]["id"], pending[2]["id"], 999]
+    response = client.post("/devices/access-requests/approve", json={"ids": first_ids, "username": "teacher1"})
+    assert response.status_code == 200
+    assert [r.get("status") for r in response.json["results"]] == ["approved", "approved", None]
+    assert response.json["results"][2]["error"]
+
+    response = client.post("/devices/access-requests/deny", json={"device_id": 2, "username": "teacher1"})
+    assert [r["username"] for r in response.json["results"]] == ["student3"]
+    assert [r["device_id"] for r in client.get("/devices/access-requests").json] == [1]
+
+    assert client.post("/devices/access-requests/maybe", json={"ids": [1]}).status_code == 404
+    assert client.post("/devices/access-requests/approve", json={"ids": "1"}).status_code == 400
+    decisions, _ = log_store.query(username="teacher1")
+    assert [record["action"] for record in decisions] == ["request_approved"] * 2 + ["request_denied"]
@@ -0,0 +1,117 @@
+import gc
+import threading
+import time
+import weakref
+
+from models.analytics_model import HourlyRollup, get_hourly_rollup, run_batch_report
+from models.log_model import LogStore, set_log_store
+from models.usage_model import local_seconds
+
+
+def log(action, device, username, timestamp, seq):
+    return {"action": action, "device": device, "username": username, "timestamp": timestamp, "seq": seq}
+
+
+# ✅ 2025-05-26 is a Monday
+HISTORY = [
+    log("on", "Projector", "teacher1", "2025-05-26 08:00:00", 0),
+    log("on", "Fan", "student1", "2025-05-26 08:30:00", 1),
+    log("off", "Projector", "teacher1", "2025-05-26 10:00:00", 2),
+    log("request", "Fan", "student1", "2025-05-26 10:15:00", 3),
+    log("off", "Fan", "student1", "2025-05-26 12:30:00", 4),
+    log("on", "Projector", "teacher2", "2025-05-27 08:00:00", 5),
+]
+
+
+def test_rollup_rebuild_matches_incremental_and_survives_restart(tmp_path):
+    """ ✅ Vectorized rebuild == per-append updates; a reload only replays unseen seqs """
+    path = tmp_path / "hourly_rollups.json"
+    rebuilt, incremental = HourlyRollup(path=path, snapshot_delay=0), HourlyRollup(path=tmp_path / "other.json")
+    rebuilt.rebuild(HISTORY[:4])
+    incremental.observe_many(HISTORY)
+    rebuilt.observe_many(HISTORY)  # ✅ seq 0-3 already counted, 4-5 are new
+
+    for rollup in (rebuilt, incremental):
+        heatmap = rollup.heatmap()
+        assert heatmap[0][8] == 2 and heatmap[0][10] == 2 and heatmap[1][8] == 1
+        assert rollup.top_users() == [{"username": "student1", "actions": 3},
+                                      {"username": "teacher1", "actions": 2},
+                                      {"username": "teacher2", "actions": 1}]
+        assert rollup.busiest_hours(limit=1) == [{"weekday": "Mon", "hour": 8, "events": 2}]
+
+    rebuilt.flush()
+    reloaded = HourlyRollup(path=path)
+    assert reloaded.through_seq == 5
+    reloaded.observe_many(HISTORY)  # ✅ Nothing double-counted
+    assert reloaded.heatmap() == rebuilt.heatmap()
+    assert reloaded.top_users(since=local_seconds("2025-05-27")) == [{"username": "teacher2", "actions": 1}]
+
+
+def test_appends_during_a_rebuild_are_counted_once(tmp_path):
+    """ ✅ A record observed while the history loads is neither lost nor double-counted """
+    rollup, expected = HourlyRollup(path=tmp_path / "a.json", snapshot_delay=0), HourlyRollup(path=tmp_path / "b.json")
+    expected.rebuild(HISTORY[:5])
+    appender = threading.Thread(target=rollup.observe_many, args=(HISTORY[3:5],))
+
+    def load():
+        appender.start()  # ✅ seq 3 is in the load, seq 4 was appended after it
+        time.sleep(0.05)
+        return HISTORY[:4]
+
+    rollup.rebuild(load)
+    appender.join()
+    assert rollup.heatmap() == expected.heatmap() and rollup.through_seq == 4
+
+
+def test_batch_report_duty_cycles_and_percentiles():
+    report = run_batch_report(HISTORY, since=local_seconds("2025-05-26 08:00:00"),
+                              until=local_seconds("2025-05-26 12:00:00"))
+    assert report["duty_cycles"]["Projector"] == 0.5  # ✅ 2h of the 4h window
+    assert report["duty_cycles"]["Fan"] == 0.875  # ✅ 3.5h, clipped at the window end
+    assert report["session_minutes"]["Projector"] == {"sessions": 1, "p50": 120.0, "p90": 120.0, "p99": 120.0}
+    assert report["top_users"][0] == {"username": "student1", "actions": 2}
+    assert sum(map(sum, report["heatmap"])) == 4
+
+
+def test_report_endpoints(client, log_store):
+    for entry in HISTORY:
+        log_store.append({key: value for key, value in entry.items() if key != "seq"})
+    client.post("/devices/2/toggle", json={"username": "teacher1"})  # ✅ counted on append
+
+    heatmap = client.get("/devices/analytics/heatmap?device=Projector&action=on").json
+    assert heatmap["heatmap"][0][8] == 1 and heatmap["heatmap"][1][8] == 1
+    assert client.get("/devices/analytics/top-users?limit=2").json == [{"username": "student1", "actions": 3},
+                                                                       {"username": "teacher1", "actions": 3}]
+
+    report = client.get("/devices/analytics/report?since=2025-05-26&until=2025-05-27").json
+    assert report["events"] == 7 and "Projector" in report["duty_cycles"]
+    assert client.get("/devices/analytics/heatmap?since=yesterday").status_code == 400
+
+
+def test_term_report_is_built_once_per_log_version(client, log_store, monkeypatch):
+    """ ✅ Repeated report polls reuse the batch result until the log changes """
+    for entry in HISTORY:
+        log_store.append({key: value for key, value in entry.items() if key != "seq"})
+    loads = []
+    original = log_store.all
+    monkeypatch.setattr(log_store, "all", lambda: loads.append(1) or original())
+
+    url = "/devices/analytics/report?since=2025-05-26&until=2025-05-27"
+    first = client.get(url)
+    assert client.get(url).json == first.json and len(loads) == 1
+    assert client.get(url, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    log_store.append({"action": "off", "device": "Projector", "username": "teacher2", "timestamp": "2025-05-26 09:00:00"})
+    assert client.get(url).json["events"] == first.json["events"] + 1 and len(loads) == 2
+
+
+def test_replaced_rollups_are_not_pinned_by_exit_hooks(tmp_path, log_store):
+    rollups = []
+    for name in ("a", "b"):  # ✅ Each new log store gets a new rollup; one module-level hook flushes the current one
+        store = LogStore(data_dir=tmp_path / name, fsync=False)
+        set_log_store(store)
+        rollups.append(weakref.ref(get_hourly_rollup()))
+        store.close()
+    set_log_store(log_store)
+    del store
+    gc.collect()
+    assert rollups[0]() is None and rollups[1]() is not None
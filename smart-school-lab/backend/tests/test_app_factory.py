@@ -0,0 +1,91 @@
+import json
+import os
+import subprocess
+import sys
+
+from app import create_app, start_prewarm, use_data_dir
+from models import log_model
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", 3.0))  # ✅ import + create_app, cold interpreter
+
+STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+app = create_app({"STORAGE": "memory", "TESTING": True, "PREWARM": False})
+created = time.perf_counter()
+from models import log_model
+loaded = {"numpy": "numpy" in sys.modules, "log_store": log_model._store is not None}
+client = app.test_client()
+scrape = client.get("/metrics")
+from models import access_model, schedule_model
+import threading
+scraped = {"status": scrape.status_code, "numpy": "numpy" in sys.modules,
+           "telemetry_buffered": "telemetry_buffered_readings 0" in scrape.get_data(as_text=True),
+           "opened": [name for name, value in (("log_store", log_model._store), ("scheduler", schedule_model._scheduler),
+                                               ("access_queue", access_model._access_queue)) if value is not None],
+           "threads": sorted(thread.name for thread in threading.enumerate() if thread is not threading.main_thread())}
+scraped_at = time.perf_counter()
+status = client.get("/devices/").status_code
+first_request = time.perf_counter() - scraped_at
+from app import start_background_services
+services = {"after_request": schedule_model._scheduler is not None}
+start_background_services(app)  # ✅ What serve() does once the socket is bound (PREWARM=0 → synchronous)
+services["after_start"] = sorted({"device-scheduler", "log-retention"} & {thread.name for thread in threading.enumerate()})
+print(json.dumps({"create_seconds": created - started, "first_request_seconds": first_request,
+                  "loaded_at_create": loaded, "status": status, "scraped": scraped, "services": services,
+                  "data_dir": log_model.DATA_DIR}))
+"""
+
+
+def test_create_app_is_cheap_and_defers_heavy_subsystems(record_property):
+    """ ✅ Startup time, measured in a fresh interpreter: no store opened & no NumPy until first use """
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    env.pop("STORAGE", None)
+    result = subprocess.run([sys.executable, "-c", STARTUP_PROBE], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    record_property("create_app_seconds", round(probe["create_seconds"], 4))
+    record_property("first_request_seconds", round(probe["first_request_seconds"], 4))
+    print(f"\n⏱️ import + create_app: {probe['create_seconds']:.3f}s, first request: {probe['first_request_seconds']:.3f}s")
+
+    assert probe["loaded_at_create"] == {"numpy": False, "log_store": False}
+    assert probe["status"] == 200
+    assert probe["scraped"] == {"status": 200, "numpy": False, "telemetry_buffered": True,
+                                "opened": [], "threads": []}  # ✅ A scrape starts no store & no thread
+    assert probe["services"] == {"after_request": False, "after_start": ["device-scheduler", "log-retention"]}  # ✅ Started by the server, not a request
+    assert not probe["data_dir"].startswith(os.path.join(BACKEND, "data"))  # ✅ Memory storage never touches data/
+    assert probe["create_seconds"] < STARTUP_BUDGET_SECONDS
+
+
+def test_prewarm_builds_indexes_in_the_background(log_store, device_registry, scheduler, access_queue,
+                                                  user_repository):
+    from controllers.log_controller import get_dedup_index
+    from models.analytics_model import get_hourly_rollup
+
+    log_store.append({"action": "on", "device": "Projector", "username": "teacher1",
+                      "timestamp": "2025-05-26 08:00:05"})
+    app = create_app({"TESTING": True, "PREWARM": False})
+    start_prewarm(app).join(timeout=60)
+
+    state = app.extensions["prewarm"]
+    assert state["done"].is_set() and not state["errors"]
+    assert list(state["seconds"])[:2] == ["log_store", "device_registry"]
+    assert get_hourly_rollup().through_seq == 0  # ✅ Caught up with the existing log before any request
+    assert get_dedup_index() is get_dedup_index()
+    with app.test_client() as client:
+        assert client.get("/devices/analytics/top-users").json[0]["username"] == "teacher1"
+
+
+def test_switching_data_dir_stops_the_old_background_threads(scheduler, access_queue, user_repository, tmp_path,
+                                                             monkeypatch):
+    """ ✅ The replaced scheduler & access queue don't keep firing against the new stores """
+    monkeypatch.setattr(log_model, "DATA_DIR", log_model.DATA_DIR)  # ✅ Restored after use_data_dir moves it
+    scheduler.start()
+    access_queue.start()
+    use_data_dir(tmp_path / "next")
+    for service in (scheduler, access_queue):
+        service._thread.join(timeout=5)
+        assert not service._thread.is_alive()
@@ -1,10 +1,10 @@
 import pytest
-from app import app  # ✅ Ensure correct import
+from app import create_app
 
 @pytest.fixture
 def client():
-    """ ✅ Creates a test client to interact with Flask """
-    app.config["TESTING"] = True
+    """ ✅ Creates a test client to interact with Flask (fresh in-memory stores) """
+    app = create_app({"TESTING": True, "STORAGE": "memory", "PREWARM": False})
     with app.test_client() as client:
         yield client
 
@@ -13,7 +13,7 @@ def test_successful_login(client):
     data = {"username": "admin", "password": "securepassword"}
     response = client.post("/auth/login", json=data)
     assert response.status_code == 200
-    assert "token" in response.json  # ✅ Check if a token is returned
+    assert "access_token" in response.json and "refresh_token" in response.json  # ✅ Token pair returned
 
 def test_invalid_login(client):
     """ ❌ Test login failure with incorrect credentials """
@@ -29,7 +29,7 @@ def test_missing_username(client):
     response = client.post("/auth/login", json=data)
     assert response.status_code == 400  # ✅ Should return Bad Request
     assert "error" in response.json
-    assert response.json["error"] == "Username is required"
+    assert response.json["error"] == "Username and password are required"
 
 def test_missing_password(client):
     """ ❌ Test login failure with missing password """
@@ -37,12 +37,12 @@ def test_missing_password(client):
     response = client.post("/auth/login", json=data)
     assert response.status_code == 400  # ✅ Should return Bad Request
     assert "error" in response.json
-    assert response.json["error"] == "Password is required"
+    assert response.json["error"] == "Username and password are required"
 
 def test_invalid_token_access(client):
     """ ❌ Test accessing a protected route with an invalid token """
     headers = {"Authorization": "Bearer fake_token"}
-    response = client.get("/auth/protected-route", headers=headers)
-    assert response.status_code == 403  # ✅ Should return Forbidden error
+    response = client.get("/logs/", headers=headers)
+    assert response.status_code == 401  # ✅ Unauthorized: the frontend refreshes or logs in again
     assert "error" in response.json
     assert response.json["error"] == "Invalid or expired token"
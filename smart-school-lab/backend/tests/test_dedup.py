@@ -0,0 +1,18 @@
+from utils.dedup import DedupIndex
+
+
+def test_add_reports_duplicates():
+    index = DedupIndex(window_seconds=60, max_keys=10)
+    assert index.add(("2025-05-26 10:00:00", "Fan"), at=100)
+    assert not index.add(("2025-05-26 10:00:00", "Fan"), at=100)
+
+
+def test_window_and_size_eviction():
+    """ ✅ Keys older than the window or beyond max_keys are forgotten """
+    index = DedupIndex(window_seconds=60, max_keys=3)
+    index.add("a", at=0)
+    index.add("b", at=100)
+    assert "a" not in index
+    for key in "cde":
+        index.add(key, at=100)
+    assert len(index) == 3 and "b" not in index
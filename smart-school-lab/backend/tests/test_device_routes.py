@@ -1,3 +1,105 @@
 def test_dummy():
     """ ✅ Simple test to confirm pytest setup """
     assert 1 + 1 == 2
+
+
+def test_toggle_persists_and_logs(client, device_registry, log_store):
+    """ ✅ Toggling flips the registry, writes devices.json and appends one log """
+    response = client.post("/devices/2/toggle", json={"username": "teacher1"})
+    assert response.status_code == 200
+    assert response.json["device"]["status"] == "on"
+
+    reloaded = type(device_registry)(path=device_registry.path, snapshot_delay=0)
+    assert reloaded.get(2)["status"] == "on"
+    assert [log["device"] for log in log_store.all()] == ["Projector"]
+
+
+def test_toggle_unknown_device(client):
+    """ ❌ Unknown ids are a 404 """
+    assert client.post("/devices/999/toggle", json={}).status_code == 404
+
+
+def test_list_devices_by_room(client, device_registry):
+    """ ✅ ?room= is served from the registry's room index """
+    device_registry.add({"name": "Lab B Fan", "room": "Lab B", "type": "fan"})
+    device_registry.update(1, room="Lab B")
+
+    response = client.get("/devices/?room=Lab B")
+    assert [device["id"] for device in response.json] == [1, 4]
+    assert client.get("/devices/?room=Lab B&type=fan").json[0]["name"] == "Lab B Fan"
+
+
+def test_concurrent_toggles_lose_no_updates(client, device_registry, log_store):
+    """ ✅ Parallel toggles of one device: final state & log order stay consistent """
+    import threading
+
+    def hammer():
+        local_client = client.application.test_client()
+        for _ in range(25):
+            local_client.post("/devices/1/toggle", json={"username": "bench"})
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    actions = [log["action"] for log in log_store.all()]
+    assert len(actions) == 200
+    assert all(a != b for a, b in zip(actions, actions[1:]))  # ✅ strictly alternating
+    assert device_registry.get(1)["status"] == "off"  # ✅ even number of flips from "off"
+
+
+def test_device_stream_pushes_toggle_deltas(client):
+    """ ✅ /devices/stream sends a snapshot, then the toggle's device & log deltas """
+    response = client.get("/devices/stream", buffered=False)
+    assert response.mimetype == "text/event-stream"
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b"retry:")
+    assert b"event: snapshot" in next(chunks)
+
+    client.post("/devices/3/toggle", json={"username": "teacher1"})
+    deltas = next(chunks).decode()
+    assert "event: device" in deltas and '"status":"on"' in deltas
+    if "event: log" not in deltas:
+        deltas += next(chunks).decode()
+    assert "event: log" in deltas
+    response.close()
+
+
+def _count_appends(log_store, monkeypatch):
+    batches = []
+    original = log_store.append_many
+    monkeypatch.setattr(log_store, "append_many", lambda entries: batches.append(len(entries)) or original(entries))
+    return batches
+
+
+def test_bulk_commands_apply_atomically_with_one_append(client, log_store, monkeypatch):
+    """ ✅ A valid batch applies every change and logs them in one append """
+    client.post("/devices/2/toggle", json={"username": "teacher1"})  # ✅ Projector ON
+    batches = _count_appends(log_store, monkeypatch)
+
+    response = client.post("/devices/bulk", json={"username": "teacher1", "commands": [
+        {"id": 1, "action": "on"}, {"id": 2, "action": "off"}, {"id": 3, "action": "off"}]})
+    assert response.status_code == 200
+    assert [(r["id"], r["status"], r["changed"]) for r in response.json["results"]] == [
+        (1, "on", True), (2, "off", True), (3, "off", False)]
+    assert batches == [2]  # ✅ One batched append for both changes
+    assert [log["action"] for log in log_store.query(username="teacher1")[0]] == ["on", "on", "off"]
+
+
+def test_bulk_commands_with_an_unknown_device_apply_nothing(client, log_store, monkeypatch):
+    """ ❌ One unknown id rejects the whole batch: no device changes, no logs """
+    batches = _count_appends(log_store, monkeypatch)
+
+    rejected = client.post("/devices/bulk", json={"commands": [{"id": 1, "action": "on"}, {"id": 99, "action": "off"}]})
+    assert rejected.status_code == 400 and rejected.json["results"][1]["error"] == "Device not found"
+    assert client.get("/devices/status").json[0]["status"] == "off"  # ✅ Nothing applied
+    assert batches == []
+
+
+def test_bulk_commands_with_unhashable_ids_are_rejected(client):
+    """ ❌ List / object ids are a 400 per command, not a server error """
+    response = client.post("/devices/bulk", json={"commands": [{"id": [1], "action": "on"}, {"id": {}, "action": "on"}]})
+    assert response.status_code == 400
+    assert [r["error"] for r in response.json["results"]] == ["Invalid request", "Invalid request"]
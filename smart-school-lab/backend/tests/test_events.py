@@ -0,0 +1,36 @@
+from utils.events import EventBroadcaster
+
+
+def test_fan_out_and_resume():
+    """ ✅ Every subscriber gets each event; a reconnect replays what it missed """
+    broadcaster = EventBroadcaster(history=10)
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+    broadcaster.publish("device", {"id": 1, "status": "on"})
+
+    assert [e.data["status"] for e in first.get(timeout=0)] == ["on"]
+    assert second.get(timeout=0)[0].frame.startswith("id: 1\nevent: device\n")
+
+    broadcaster.unsubscribe(first)
+    broadcaster.publish("device", {"id": 1, "status": "off"})
+    resumed = broadcaster.subscribe(last_event_id=1)
+    assert [e.id for e in resumed.get(timeout=0)] == [2]
+
+
+def test_slow_client_is_resynced_without_blocking_others():
+    """ ✅ A full client buffer is dropped and replaced by a single resync event """
+    broadcaster = EventBroadcaster(history=100, client_buffer=3)
+    slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+    for i in range(3):
+        broadcaster.publish("log", {"seq": i})
+        assert len(fast.get(timeout=0)) == 1
+    broadcaster.publish("log", {"seq": 3})
+
+    assert [e.type for e in slow.get(timeout=0)] == ["resync"]
+    assert fast.get(timeout=0)[0].data == {"seq": 3}
+
+
+def test_resume_from_evicted_id_requests_resync():
+    broadcaster = EventBroadcaster(history=2)
+    for i in range(5):
+        broadcaster.publish("log", {"seq": i})
+    assert [e.type for e in broadcaster.subscribe(last_event_id=1).get(timeout=0)] == ["resync"]
@@ -0,0 +1,37 @@
+import gzip
+
+
+def test_unchanged_polls_get_304_until_a_mutation(client, device_registry, monkeypatch):
+    first = client.get("/devices/status")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+
+    calls = []
+    original = device_registry.all
+    monkeypatch.setattr(device_registry, "all", lambda *a, **k: calls.append(1) or original(*a, **k))
+    assert client.get("/devices/status").json == first.json
+    not_modified = client.get("/devices/status", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.data == b""
+    assert calls == []  # ✅ Served from the pre-serialized body, no re-serialization
+
+    client.post("/devices/1/toggle", json={"username": "teacher1"})
+    changed = client.get("/devices/status", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json[0]["status"] == "on"
+
+
+def test_logs_are_gzipped_and_keep_paging_headers(client, log_store):
+    log_store.append_many([{"action": "on", "device": "Projector", "username": f"user{n}",
+                            "timestamp": f"2025-05-26 08:{n % 60:02d}:00"} for n in range(50)])
+    headers = {"Accept-Encoding": "gzip"}
+    page = client.get("/logs/?limit=40", headers=headers)
+    assert page.headers["Content-Encoding"] == "gzip" and page.headers["X-Next-Cursor"] == "39"
+    assert len(gzip.decompress(page.data)) > len(page.data)
+
+    again = client.get("/logs/?limit=40", headers={**headers, "If-None-Match": page.headers["ETag"]})
+    assert again.status_code == 304
+    cached = client.get("/logs/?limit=40")  # ✅ Identity encoding gets its own ETag & the cached headers
+    assert cached.headers["ETag"] != page.headers["ETag"] and cached.headers["X-Next-Cursor"] == "39"
+
+    log_store.append({"action": "off", "device": "Projector", "username": "x", "timestamp": "2025-05-26 09:00:00"})
+    assert client.get("/logs/?limit=40", headers={"If-None-Match": cached.headers["ETag"]}).status_code == 200
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from models.log_record import LogRecord, format_epoch
+from utils.json_codec import ENCODERS, orjson
+
+
+def test_record_reads_like_the_dict_it_replaces():
+    entry = {"action": "schedule_set", "device": "Projector", "username": "teacher1",
+             "timestamp": "2025-05-26 08:00:05", "schedule": {"start_time": "08:00", "end_time": "09:00"}}
+    record = LogRecord.from_entry(entry, seq=7)
+    assert record == {"seq": 7, **entry}
+    assert record["device"] == "Projector" and record.get("missing", 3) == 3
+    assert format_epoch(record.epoch) == "2025-05-26 08:00:05" and "timestamp" not in (record.extra or {})
+    assert "schedule" in record and "missing" not in record
+    with pytest.raises(KeyError):
+        record["missing"]
+
+    other = LogRecord.from_entry({"device": "".join(["Proj", "ector"]), "timestamp": "2025-05-26 08:00:06"}, seq=8)
+    assert other.device is record.device  # ✅ Interned: one copy per name
+
+
+def test_unusual_timestamps_are_kept_verbatim():
+    for value in ("2025-05-26T08:00:05", 1748246405, "not a time"):
+        record = LogRecord.from_entry({"action": "on", "timestamp": value}, seq=1)
+        assert record["timestamp"] == value
+    assert LogRecord.from_entry({"action": "on"}, seq=2).to_dict() == {"seq": 2, "action": "on"}
+
+
+def test_encoders_agree_on_records_and_plain_payloads():
+    records = [LogRecord.from_entry({"action": "on", "device": "Pé", "username": "u", "timestamp": "2025-05-26 08:00:05"}, 1),
+               LogRecord.from_entry({"action": "request", "device": "Board", "requester": "s1"}, 2)]
+    payload = {"logs": records, "count": 2}
+    expected = json.loads(json.dumps({"logs": [r.to_dict() for r in records], "count": 2}))
+    for name, encoder in ENCODERS.items():
+        if name == "orjson" and orjson is None:
+            continue
+        assert json.loads(encoder().dumps(records)) == expected["logs"]
+        assert json.loads(encoder().dumps(payload)) == expected
+        assert encoder().loads('{"value": NaN}')["value"] != 0  # ✅ Lines stdlib json wrote always parse
+
+
+def test_log_routes_serve_records_through_the_fast_provider(client, log_store):
+    client.post("/devices/1/toggle", json={"username": "teacher1"})
+    logs = client.get("/logs/").get_json()
+    assert logs[-1]["username"] == "teacher1" and len(logs[-1]["timestamp"]) == 19
+    exported = client.get("/logs/export").data.decode().splitlines()
+    assert json.loads(exported[-1]) == logs[-1]
@@ -0,0 +1,89 @@
+def test_get_logs_filters_by_device(client, log_store):
+    """ ✅ GET /logs?device= is applied server-side """
+    for device in ("Projector", "Fan", "Projector"):
+        log_store.append({"action": "on", "device": device, "username": "teacher1",
+                          "timestamp": "2025-05-26 10:00:00"})
+
+    response = client.get("/logs/?device=Projector")
+    assert response.status_code == 200
+    assert [log["device"] for log in response.json] == ["Projector", "Projector"]
+
+
+def test_get_logs_cursor_pagination(client, log_store):
+    """ ✅ limit + X-Next-Cursor walk through the history page by page """
+    for i in range(5):
+        log_store.append({"action": "on", "device": "Fan", "username": "teacher1",
+                          "timestamp": f"2025-05-26 10:00:0{i}"})
+
+    first = client.get("/logs/?limit=3")
+    assert len(first.json) == 3
+    second = client.get(f"/logs/?limit=3&cursor={first.headers['X-Next-Cursor']}")
+    assert [log["seq"] for log in second.json] == [3, 4]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_get_logs_rejects_bad_params(client):
+    """ ❌ Non-numeric limit is a 400 """
+    assert client.get("/logs/?limit=abc").status_code == 400
+
+
+def test_save_log_ignores_same_second_duplicate(log_store):
+    """ ✅ A second log for the same device & timestamp is dropped without scanning history """
+    from controllers.log_controller import save_log
+    entry = {"action": "on", "device": "Device 1", "username": "teacher1", "timestamp": "2025-05-26 10:00:00"}
+
+    assert save_log(dict(entry)) is not None
+    assert save_log(dict(entry)) is None
+    assert len(log_store) == 1
+
+
+def test_post_log_idempotency_key_retry(client, log_store):
+    """ ✅ Retrying with the same Idempotency-Key returns the original log """
+    headers = {"Idempotency-Key": "plug-7-0001"}
+    first = client.post("/logs/", json={"action": "on", "device_id": 7, "username": "plug"}, headers=headers)
+    retry = client.post("/logs/", json={"action": "on", "device_id": 7, "username": "plug"}, headers=headers)
+
+    assert first.status_code == 201
+    assert retry.status_code == 200
+    assert retry.json["log"]["seq"] == first.json["log"]["seq"]
+    assert len(log_store) == 1
+
+
+def _seed_export_logs(log_store):
+    log_store.append_many([{"action": "on" if n % 2 else "off", "device": "Fan" if n % 3 else "Projector",
+                            "username": "teacher1", "timestamp": f"2025-05-{1 + n // 100:02d} 08:00:00"}
+                           for n in range(2500)])
+
+
+def test_export_streams_filtered_ndjson_and_csv(client, log_store, monkeypatch):
+    """ ✅ /logs/export streams every matching log across batches, as NDJSON or CSV """
+    import csv
+    import io
+    import json
+    import controllers.log_controller as log_controller
+
+    _seed_export_logs(log_store)
+    monkeypatch.setattr(log_controller, "EXPORT_BATCH_SIZE", 100)
+    response = client.get("/logs/export?device=Projector&since=2025-05-15 00:00:00")
+    assert response.is_streamed
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    expected = [r for r in log_store.all() if r["device"] == "Projector" and r["timestamp"] >= "2025-05-15"]
+    assert lines == expected and len(lines) > log_controller.EXPORT_BATCH_SIZE
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/logs/export?format=csv").get_data(as_text=True))))
+    assert len(rows) == 2500 and rows[0]["seq"] == "0" and rows[-1]["device"] == "Projector"
+
+
+def test_export_gzips_when_accepted(client, log_store):
+    """ ✅ Accept-Encoding: gzip compresses the stream (an empty export is just the CSV header) """
+    import gzip
+
+    _seed_export_logs(log_store)
+    response = client.get("/logs/export?format=csv&device=None", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data).decode() == "seq,timestamp,device,username,action\r\n"
+
+
+def test_export_rejects_unknown_format(client):
+    """ ❌ Only ndjson & csv can be exported """
+    assert client.get("/logs/export?format=xml").status_code == 400
@@ -0,0 +1,142 @@
+import json
+import threading
+
+from models.log_model import LogStore, parse_timestamp
+
+
+def make_entry(i, device="Projector"):
+    return {"action": "on", "device": device, "username": "teacher1", "timestamp": f"2025-05-26 10:00:{i % 60:02d}"}
+
+
+def test_append_survives_reopen(tmp_path):
+    """ ✅ Appended entries are read back from the segments after a restart """
+    store = LogStore(data_dir=tmp_path, fsync=False)
+    store.append(make_entry(1))
+    store.append(make_entry(2, device="Fan"))
+    store.close()
+
+    reopened = LogStore(data_dir=tmp_path, fsync=False)
+    logs = reopened.all()
+    assert [log["seq"] for log in logs] == [0, 1]
+    assert logs[1]["device"] == "Fan"
+
+
+def test_segment_rollover(tmp_path):
+    """ ✅ A small segment limit produces several segment files """
+    store = LogStore(data_dir=tmp_path, segment_max_bytes=200, fsync=False)
+    for i in range(20):
+        store.append(make_entry(i))
+    store.close()
+
+    assert len(list((tmp_path / "logs").iterdir())) > 1
+    assert len(LogStore(data_dir=tmp_path, fsync=False)) == 20
+
+
+def test_migrates_legacy_logs_json(tmp_path):
+    """ ✅ An existing logs.json array is imported once and renamed """
+    (tmp_path / "logs.json").write_text(json.dumps([make_entry(1), make_entry(2)], indent=4))
+    store = LogStore(data_dir=tmp_path, fsync=False)
+
+    assert len(store) == 2
+    assert not (tmp_path / "logs.json").exists()
+    assert (tmp_path / "logs.json.migrated").exists()
+
+
+def test_torn_trailing_line_is_dropped(tmp_path):
+    """ ✅ A partially written last record (crash mid-append) is truncated on load """
+    store = LogStore(data_dir=tmp_path, fsync=False)
+    store.append(make_entry(1))
+    store.close()
+    segment = next((tmp_path / "logs").iterdir())
+    with open(segment, "a") as file:
+        file.write('{"seq":1,"action":"o')
+
+    reopened = LogStore(data_dir=tmp_path, fsync=False)
+    assert len(reopened) == 1
+    assert reopened.append(make_entry(3))["seq"] == 1
+
+
+def test_concurrent_appends_group_commit(tmp_path):
+    """ ✅ Parallel writers never lose or duplicate records """
+    store = LogStore(data_dir=tmp_path)
+
+    def writer(n):
+        for i in range(50):
+            store.append(make_entry(i, device=f"Device {n}"))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+
+    seqs = [log["seq"] for log in LogStore(data_dir=tmp_path, fsync=False).all()]
+    assert seqs == list(range(400))
+
+
+def test_compact_segment_rewrites_only_matching(tmp_path):
+    """ ✅ compact_segment drops matching records from a sealed segment and keeps seq numbers stable """
+    store = LogStore(data_dir=tmp_path, fsync=False)
+    for i in range(5):
+        store.append(make_entry(i, device="Fan" if i % 2 else "Projector"))
+    store.seal_active_segment()
+
+    assert store.compact_segment(0, lambda log: log["device"] == "Fan")["records"] == 2
+    store.append(make_entry(9))
+    store.close()
+
+    seqs = [log["seq"] for log in LogStore(data_dir=tmp_path, fsync=False).all()]
+    assert seqs == [0, 2, 4, 5]
+
+
+def test_dropping_and_compacting_middle_segments_keeps_indexes_exact(tmp_path):
+    """ ✅ Only the removed seqs leave the device / user / action indexes """
+    store = LogStore(data_dir=tmp_path, fsync=False)
+    for segment in range(3):
+        for i in range(4):
+            store.append(make_entry(segment * 4 + i, device="Fan" if i % 2 else "Projector"))
+        store.seal_active_segment()
+
+    store.drop_segment(4)
+    store.compact_segment(8, lambda log: log["device"] == "Fan")
+    assert [log["seq"] for log in store.query(device="Fan")[0]] == [1, 3]
+    assert [log["seq"] for log in store.query(device="Projector")[0]] == [0, 2, 8, 10]
+    assert [log["seq"] for log in store.query(username="teacher1")[0]] == [0, 1, 2, 3, 8, 10]
+    assert store._by_action == {"on": [0, 1, 2, 3, 8, 10]}
+
+
+def test_len_is_a_running_count(tmp_path):
+    """ ✅ len() follows appends, batch appends, segment drops & compaction without scanning """
+    store = LogStore(data_dir=tmp_path, fsync=False)
+    for i in range(4):
+        store.append(make_entry(i, device="Fan" if i % 2 else "Projector"))
+    store.seal_active_segment()
+    store.append_many([make_entry(i) for i in range(4, 8)])
+    store.seal_active_segment()
+    store.append(make_entry(8))
+    assert len(store) == 9
+
+    store.compact_segment(4, lambda log: log["seq"] % 2)
+    store.drop_segment(0)
+    assert len(store) == 3 == len(store.all())
+    store.close()
+    assert len(LogStore(data_dir=tmp_path, fsync=False)) == 3
+
+
+def test_query_filters_and_paginates(tmp_path):
+    """ ✅ Index-driven query honours filters, time range and cursor """
+    store = LogStore(data_dir=tmp_path, fsync=False)
+    for i in range(30):
+        store.append(make_entry(i, device="Fan" if i % 3 == 0 else "Projector"))
+
+    page, cursor = store.query(device="Fan", limit=4)
+    assert [log["seq"] for log in page] == [0, 3, 6, 9]
+    page, cursor = store.query(device="Fan", limit=4, cursor=cursor)
+    assert [log["seq"] for log in page] == [12, 15, 18, 21]
+
+    since = parse_timestamp(store.all()[10]["timestamp"])
+    until = parse_timestamp(store.all()[20]["timestamp"])
+    ranged, _ = store.query(since=since, until=until, device="Projector", order="desc")
+    assert [log["seq"] for log in ranged] == [20, 19, 17, 16, 14, 13, 11, 10]
+    assert store.query(username="nobody") == ([], None)
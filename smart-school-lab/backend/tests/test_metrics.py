@@ -0,0 +1,68 @@
+import threading
+
+from utils.metrics import MetricsRegistry, SlowRequestSampler
+
+
+def test_thread_shards_sum_and_survive_thread_exit():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            metrics.inc("hits", (("route", "/x"),))
+        metrics.observe("latency", 0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.observe("latency", 5)
+
+    assert metrics.value("hits", (("route", "/x"),)) == 8000
+    assert metrics.snapshot()[("latency", ())] == [0, 8, 9, 9.0]  # ✅ buckets…, count, sum
+    text = metrics.render()
+    assert 'hits{route="/x"} 8000' in text
+    assert 'latency_bucket{le="1.0"} 8' in text and 'latency_bucket{le="+Inf"} 9' in text
+
+
+def test_finished_thread_shards_are_retired_without_a_scrape():
+    metrics = MetricsRegistry()  # ✅ One thread per request must not grow the shard list when nobody scrapes
+    for _ in range(50):
+        thread = threading.Thread(target=metrics.inc, args=("hits",))
+        thread.start()
+        thread.join()
+    assert len(metrics._shards) <= 1
+    assert metrics.value("hits") == 50
+
+
+def test_sampler_folds_stacks_of_slow_requests():
+    sampler = SlowRequestSampler(threshold=0.05)
+    release, registered = threading.Event(), threading.Event()
+
+    def slow_handler():
+        sampler.begin("/devices/bulk")
+        registered.set()
+        release.wait()
+        sampler.end()
+
+    thread = threading.Thread(target=slow_handler)
+    thread.start()
+    registered.wait()
+    sampler.sample(now=float("inf"))
+    release.set()
+    thread.join()
+    [entry] = sampler.top()
+    assert entry["stack"].startswith("/devices/bulk;") and "slow_handler" in entry["stack"]
+
+
+def test_metrics_endpoint_reports_routes_devices_and_store(client):
+    client.post("/devices/1/toggle", json={"username": "teacher1"})
+    client.get("/devices/status")
+    text = client.get("/metrics").get_data(as_text=True)
+
+    assert ('http_requests_total{blueprint="devices",route="/devices/<int:device_id>/toggle",'
+            'method="POST",status="200"}') in text
+    assert 'http_request_duration_seconds_count{blueprint="devices",route="/devices/status"}' in text
+    assert 'device_switches_total{device="Computer",status="on"}' in text
+    assert "log_store_append_seconds_count" in text and "log_store_bytes " in text
+    assert "auth_token_cache_hit_ratio" in text
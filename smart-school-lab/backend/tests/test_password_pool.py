@@ -0,0 +1,59 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.password_pool import PasswordHashPool, PoolSaturated, set_password_pool
+
+
+@pytest.fixture
+def blocked_pool():
+    """ ✅ One thread worker, one pending slot, occupied until the test releases it """
+    pool = PasswordHashPool(workers=1, max_pending=1, method="pbkdf2:sha256:1000",
+                            executor_factory=ThreadPoolExecutor)
+    release = threading.Event()
+    pool._submit(release.wait)
+    yield pool
+    release.set()
+    pool.shutdown()
+
+
+def test_process_pool_hashes_and_verifies():
+    pool = PasswordHashPool(workers=1, method="pbkdf2:sha256:1000")
+    try:
+        password_hash = pool.hash_password("secret")
+        assert password_hash.startswith("pbkdf2:sha256:1000$")
+        assert pool.check_password(password_hash, "secret") is True
+        assert pool.check_password(password_hash, "wrong") is False
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+
+def test_saturated_pool_rejects_instead_of_queueing(blocked_pool):
+    with pytest.raises(PoolSaturated) as error:
+        blocked_pool.hash_password("secret")
+    assert error.value.retry_after >= 1
+
+
+def test_signup_returns_503_with_retry_after_when_saturated(client, blocked_pool):
+    previous = set_password_pool(blocked_pool)
+    try:
+        response = client.post("/users/signup", json={"username": "s", "email": "s@lab",
+                                                      "password": "pw", "role": "student"})
+    finally:
+        set_password_pool(previous)
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert client.get("/devices/status").status_code == 200  # ✅ Other routes unaffected
+
+
+def test_slow_hash_times_out_as_saturated():
+    pool = PasswordHashPool(workers=1, max_pending=2, executor_factory=ThreadPoolExecutor, timeout=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(PoolSaturated):
+            pool.run(release.wait)  # ✅ concurrent.futures.TimeoutError → 503 path, not a 500
+    finally:
+        release.set()
+        pool.shutdown()
@@ -0,0 +1,77 @@
+import gzip
+import os
+import time
+from datetime import datetime
+
+from models.log_model import LogStore
+from models.retention_model import RetentionManager
+
+DAY = 24 * 60 * 60
+
+
+def stamp(epoch):
+    return datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def fill(store, now, ages_in_days, action="on"):
+    for age in ages_in_days:
+        store.append({"action": action, "device": "Fan", "username": "teacher1", "timestamp": stamp(now - age * DAY)})
+
+
+def test_expired_segments_are_dropped_and_archived(tmp_path):
+    """ ✅ Whole expired segments are removed without touching newer data """
+    now = time.time()
+    store = LogStore(data_dir=tmp_path, segment_max_bytes=300, fsync=False)
+    fill(store, now, [200, 199, 198, 197, 196, 195, 1, 0])
+    manager = RetentionManager(store=store, retention_days={"default": 90})
+
+    status = manager.run_once(now=now)
+
+    assert status["segments_dropped"] >= 1
+    assert [log["timestamp"] for log in store.all()] == [stamp(now - DAY), stamp(now)]
+    assert any(name.endswith(".gz") for name in os.listdir(tmp_path / "archive"))
+    assert len(LogStore(data_dir=tmp_path, fsync=False)) == 2
+
+
+def test_per_action_windows_compact_partial_segments(tmp_path):
+    """ ✅ Short-lived actions expire earlier than the default window """
+    now = time.time()
+    store = LogStore(data_dir=tmp_path, fsync=False)
+    fill(store, now, [10, 5], action="request")
+    fill(store, now, [10, 5], action="on")
+    manager = RetentionManager(store=store, retention_days={"default": 90, "request": 7})
+
+    status = manager.run_once(now=now)
+
+    assert status["records_removed"] == 1
+    assert [(log["action"], log["timestamp"]) for log in store.all()] == [
+        ("request", stamp(now - 5 * DAY)), ("on", stamp(now - 10 * DAY)), ("on", stamp(now - 5 * DAY))]
+    with gzip.open(next((tmp_path / "archive").iterdir()), "rt") as archive:
+        assert '"action":"request"' in archive.read()
+
+
+def test_seqs_stay_above_the_active_segment_after_compacting_its_predecessor(tmp_path):
+    """ ✅ Sealed segment's tail compacted away, then a restart: new appends land in the active segment """
+    now = time.time()
+    store = LogStore(data_dir=tmp_path, fsync=False)
+    fill(store, now, [40, 39], action="on")
+    fill(store, now, [35, 34], action="request")  # ✅ Newest records, but expired: the segment's tail goes
+    store.seal_active_segment()
+    assert RetentionManager(store=store, retention_days={"default": 90, "request": 30}).run_once(
+        now=now)["records_removed"] == 2
+    store.close()
+
+    reopened = LogStore(data_dir=tmp_path, fsync=False)
+    record = reopened.append({"action": "on", "device": "Fan", "username": "teacher1", "timestamp": stamp(now)})
+    active = reopened.segment_info()[-1]
+    assert record["seq"] == active["first_seq"] == 4 and active["records"] == 1
+    assert RetentionManager(store=reopened, retention_days={"default": 90}).run_once(now=now)["records_removed"] == 0
+
+
+def test_override_and_status_endpoint(client, log_store):
+    """ ✅ delete-logs queues a pass and /logs/retention reports progress """
+    response = client.post("/devices/delete-logs", json={"max_age_days": 1})
+    assert response.status_code == 202
+    status = client.get("/logs/retention").json
+    assert "segments" in status and "records_removed" in status
+    assert client.post("/devices/delete-logs", json={"max_age_days": -1}).status_code == 400
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from models.schedule_model import Scheduler, next_occurrence
+
+
+def epoch(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M").timestamp()
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_next_occurrence_rolls_to_tomorrow():
+    assert next_occurrence("08:00", epoch("2025-05-26 07:59")) == epoch("2025-05-26 08:00")
+    assert next_occurrence("08:00", epoch("2025-05-26 08:00")) == epoch("2025-05-27 08:00")
+
+
+def test_schedule_fires_on_and_off_daily(tmp_path):
+    """ ✅ Due firings switch the device through the action callback, then repeat next day """
+    fired = []
+    clock = FakeClock(epoch("2025-05-26 07:00"))
+    scheduler = Scheduler(path=tmp_path / "schedules.json", clock=clock,
+                          action=lambda device_id, action, username: fired.append((device_id, action)))
+    scheduler.add(2, "08:00", "09:30")
+
+    assert scheduler.run_pending(epoch("2025-05-26 07:59")) == 0
+    scheduler.run_pending(epoch("2025-05-26 08:00"))
+    scheduler.run_pending(epoch("2025-05-26 09:30"))
+    scheduler.run_pending(epoch("2025-05-27 08:00"))
+    assert fired == [(2, "on"), (2, "off"), (2, "on")]
+
+
+def test_cancel_and_rebuild_from_disk(tmp_path):
+    """ ✅ Schedules survive a restart; cancelled ones never fire """
+    fired = []
+    clock = FakeClock(epoch("2025-05-26 07:00"))
+    first = Scheduler(path=tmp_path / "schedules.json", clock=clock)
+    keep = first.add(1, "08:00", "09:00")
+    dropped = first.add(2, "08:00", "09:00")
+    assert first.cancel(dropped["id"])
+
+    rebuilt = Scheduler(path=tmp_path / "schedules.json", clock=clock,
+                        action=lambda device_id, action, username: fired.append(device_id))
+    assert [s["id"] for s in rebuilt.all()] == [keep["id"]]
+    rebuilt.run_pending(epoch("2025-05-26 08:00"))
+    assert fired == [1]
+    assert rebuilt.add(3, "10:00", "11:00")["id"] == dropped["id"] + 1  # ✅ ids never reused
+
+
+def test_schedule_routes(client, scheduler, device_registry, log_store):
+    """ ✅ POST creates, GET lists, DELETE cancels; fired actions use the toggle path """
+    response = client.post("/devices/1/schedule", json={"on_time": "08:00", "off_time": "17:00", "username": "t1"})
+    assert response.status_code == 200
+    schedule_id = response.json["schedule"]["id"]
+    assert client.get("/devices/schedules?device_id=1").json[0]["next_on"].endswith("08:00:00")
+    assert client.post("/devices/1/schedule", json={"on_time": "8am", "off_time": "17:00"}).status_code == 400
+
+    scheduler.run_pending(next_occurrence("08:00", scheduler._clock()))
+    assert device_registry.get(1)["status"] == "on"
+    assert log_store.all()[-1]["username"] == "Scheduler"
+
+    assert client.delete(f"/devices/schedules/{schedule_id}").status_code == 200
+    assert client.delete(f"/devices/schedules/{schedule_id}").status_code == 404
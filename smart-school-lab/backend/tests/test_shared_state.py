@@ -0,0 +1,108 @@
+import multiprocessing
+import time
+
+from models.device_model import SharedDeviceRegistry, apply_device_action, set_device_registry
+from models.log_model import LogStore, set_log_store
+from models.schedule_model import Scheduler
+from models.user_model import UserRepository
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_registries_on_one_database_see_each_others_changes(tmp_path):
+    first = SharedDeviceRegistry(path=tmp_path / "state.db", poll_interval=0.01)
+    second = SharedDeviceRegistry(path=tmp_path / "state.db", poll_interval=0.01)  # ✅ Stands in for another worker
+    assert len(second) == 3  # ✅ Seeded once, not per worker
+    seen = []
+    second.add_listener(seen.append)
+    version = second.version
+
+    first.toggle(2)
+    assert second.get(2)["status"] == "on"
+    assert second.version != version  # ✅ ETags of cached /devices/status responses move too
+    assert wait_for(lambda: seen) and seen[0]["id"] == 2
+
+    second.toggle(2)  # ✅ Applied to the latest committed state, not a stale copy
+    assert [device["status"] for device in first.all()] == ["off", "off", "off"]
+    first.add({"name": "Speaker", "room": "B1"})
+    assert second.all(room="B1")[0]["name"] == "Speaker"
+    first.close()
+    second.close()
+
+
+def test_shared_log_stores_interleave_appends_and_follow_roll_overs(tmp_path):
+    first = LogStore(data_dir=tmp_path, fsync=False, shared=True, segment_max_bytes=300)
+    second = LogStore(data_dir=tmp_path, fsync=False, shared=True, segment_max_bytes=300)
+    observed = []
+    second.add_listener(observed.extend)
+    for n in range(20):
+        (first if n % 2 else second).append({"action": "on", "device": f"Device {n}", "username": "u",
+                                             "timestamp": f"2025-01-06 08:00:{n:02d}"})
+
+    for store in (first, second):
+        records = store.all()
+        assert [record["seq"] for record in records] == list(range(20))  # ✅ No duplicate or skipped seqs
+        assert [record["device"] for record in records] == [f"Device {n}" for n in range(20)]
+    assert len(first.segment_info()) > 2
+    assert sorted(record["seq"] for record in observed) == list(range(20))  # ✅ Listeners see every worker's appends
+
+    first.seal_active_segment()
+    first.drop_segment(first.segment_info()[0]["first_seq"])
+    assert len(second) == len(first) < 20  # ✅ Retention in one worker reloads the others
+    first.close()
+    second.close()
+
+
+def test_user_cache_is_dropped_after_another_workers_write(tmp_path):
+    first = UserRepository(path=tmp_path / "users.db", seed=False, shared=True)
+    second = UserRepository(path=tmp_path / "users.db", seed=False, shared=True)
+    user = first.add("alice", "alice@lab", "hash", "teacher")
+    assert first.get_by_username("alice")  # ✅ Now cached
+    second.delete(user["id"])
+    assert first.get_by_username("alice") is None
+    first.close()
+    second.close()
+
+
+def test_shared_schedulers_reload_edits_and_fire_once(tmp_path):
+    fired = []
+    action = lambda device_id, action, username: fired.append((device_id, action))
+    first = Scheduler(path=tmp_path / "schedules.json", action=action, shared=True)
+    second = Scheduler(path=tmp_path / "schedules.json", action=action, shared=True)
+    first.add(1, "07:00", "08:00")
+    second.add(2, "07:00", "08:00")
+    assert [schedule["id"] for schedule in first.all()] == [1, 2]  # ✅ No id clash across workers
+
+    later = time.time() + 2 * 86400
+    first.run_pending(now=later)
+    second.run_pending(now=later)
+    assert sorted(fired) == [(1, "off"), (1, "on"), (2, "off"), (2, "on")]  # ✅ Only the leader switched devices
+
+
+def _toggle_worker(data_dir, times):
+    set_device_registry(SharedDeviceRegistry(path=f"{data_dir}/state.db"))
+    set_log_store(LogStore(data_dir=data_dir, fsync=False, shared=True))
+    for _ in range(times):
+        apply_device_action(1, username="worker")
+
+
+def test_worker_processes_keep_state_and_log_in_step(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_toggle_worker, args=(str(tmp_path), 16)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    registry = SharedDeviceRegistry(path=tmp_path / "state.db")
+    assert registry.get(1)["status"] == "off"  # ✅ 48 toggles, none lost
+    records = LogStore(data_dir=tmp_path, fsync=False, shared=True).all()
+    assert [record["seq"] for record in records] == list(range(48))
+    assert [record["action"] for record in records] == ["on", "off"] * 24  # ✅ Log order = state order
+    registry.close()
@@ -0,0 +1,94 @@
+import time
+
+import numpy as np
+import pytest
+
+from models.telemetry_model import (DAY_SECONDS, RAW_DTYPE, TelemetryBuffer, TelemetryPipeline,
+                                    TelemetryStore, parse_readings, set_telemetry_pipeline)
+
+
+@pytest.fixture
+def telemetry(tmp_path):
+    """ ✅ Pipeline over a temporary store; not started (tests flush explicitly) """
+    pipeline = TelemetryPipeline(TelemetryStore(data_dir=tmp_path, fsync=False), capacity=100)
+    previous = set_telemetry_pipeline(pipeline)
+    yield pipeline
+    set_telemetry_pipeline(previous)
+
+
+def test_validation_rejects_bad_readings_by_index():
+    now = 1_736_150_400
+    batch, errors = parse_readings([
+        {"device_id": 1, "metric": "power_w", "value": 41.5, "ts": now},
+        {"metric": "heartbeat"},  # ✅ Device from the batch, value & ts defaulted
+        {"device_id": 1, "metric": "volts", "value": 1},
+        {"device_id": 1, "metric": "power_w", "value": float("nan")},
+        {"device_id": 1, "metric": "power_w", "value": 1, "ts": now - 10 * DAY_SECONDS},
+        {"device_id": "1", "metric": "power_w", "value": 1},
+        "junk",
+    ], default_device=7, now=now)
+    assert batch.tolist() == [(now, 1, 0, 41.5), (now, 7, 1, 1.0)]
+    assert [error["index"] for error in errors] == [2, 3, 4, 5, 6]
+
+
+def test_oversized_values_are_rejected_not_overflowed(client, telemetry):
+    _, errors = parse_readings([
+        {"device_id": 1, "metric": "power_w", "value": 10 ** 400},  # ✅ Too big for a float at all
+        {"device_id": 1, "metric": "power_w", "value": 1e39},  # ✅ A float, but inf once stored as float32
+    ])
+    assert [error["index"] for error in errors] == [0, 1]
+
+    response = client.post("/telemetry", data='{"device_id": 1, "readings": [{"metric": "power_w", "value": 1%s}]}'
+                           % ("0" * 400), content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json()["rejected"][0]["error"] == "value must be a finite number"
+
+
+def test_ring_buffer_wraps_and_refuses_what_does_not_fit():
+    ring = TelemetryBuffer(capacity=10)
+    rows = np.array([(n, 1, 0, n) for n in range(8)], dtype=RAW_DTYPE)
+    assert ring.put(rows[:6]) == 6
+    assert ring.drain()["ts"].tolist() == list(range(6))
+    assert ring.put(rows[:6]) == 6
+    ring.drain()
+    assert ring.put(rows) == 8  # ✅ Wraps past the end of the ring
+    assert ring.put(rows[:3]) is None  # ✅ Whole batch refused, nothing partially buffered
+    assert ring.drain()["ts"].tolist() == list(range(8))
+
+
+def test_old_days_are_downsampled_to_minutes_then_hours(tmp_path):
+    store = TelemetryStore(data_dir=tmp_path, fsync=False)
+    now = 1_736_150_400  # ✅ Midnight UTC
+    recent, aged, ancient = now - 3600, now - 3 * DAY_SECONDS, now - 40 * DAY_SECONDS
+    rows = [(recent, 1, 0, 10.0)]
+    rows += [(aged + offset, 1, 0, value) for offset, value in ((0, 10.0), (20, 30.0), (59, 20.0), (60, 5.0))]
+    rows += [(ancient + offset, 1, 0, 8.0) for offset in (0, 600, 3599)]
+    store.append(np.array(rows, dtype=RAW_DTYPE))
+
+    assert store.compact(now=now) == {"1m": 2, "1h": 1}
+    points = store.query(1, metric="power_w", since=ancient, until=now)
+    assert [(point["resolution"], point["count"]) for point in points] == [("1h", 3), ("1m", 3), ("1m", 1), ("raw", 1)]
+    assert points[1]["min"] == 10.0 and points[1]["max"] == 30.0 and points[1]["mean"] == 20.0
+    assert store.compact(now=now) == {"1m": 0, "1h": 0}  # ✅ Idempotent
+
+
+def test_ingest_route_buffers_then_flushes(client, telemetry):
+    now = int(time.time())
+    response = client.post("/telemetry", json={"device_id": 2, "readings": [
+        {"metric": "power_w", "value": 40 + n, "ts": now - n} for n in range(5)
+    ] + [{"metric": "bogus"}]})
+    assert response.status_code == 202
+    assert response.get_json()["accepted"] == 5
+    assert response.get_json()["rejected"][0]["index"] == 5
+    assert client.get("/telemetry/2").get_json()["points"] == []  # ✅ Still in the ring
+
+    assert telemetry.flush() == 5
+    points = client.get("/telemetry/2?metric=power_w").get_json()["points"]
+    assert [point["mean"] for point in points] == [44, 43, 42, 41, 40]
+
+    heartbeats = {"readings": [{"device_id": 3, "metric": "heartbeat"}] * 60}
+    assert client.post("/telemetry", json=heartbeats).status_code == 202
+    response = client.post("/telemetry", json=heartbeats)
+    assert response.status_code == 503  # ✅ Ring holds 100: backpressure instead of unbounded memory
+    assert response.headers["Retry-After"] == "1"
+    assert telemetry.status()["refused"] == 60
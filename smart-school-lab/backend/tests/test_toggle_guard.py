@@ -0,0 +1,128 @@
+import threading
+import time
+
+import models.toggle_model as toggle_model
+from models.toggle_model import ToggleGuard, set_toggle_guard
+from utils.rate_limit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_buckets_refill_and_evict_idle_keys():
+    clock = FakeClock(100.0)
+    limiter = TokenBucketLimiter(rate=2, burst=3, max_keys=2, clock=clock)
+    assert [limiter.take("alice") for _ in range(3)] == [0, 0, 0]
+    assert limiter.take("alice") == 0.5  # ✅ Empty: one token back in half a second
+    clock.now += 0.5
+    assert limiter.take("alice") == 0
+
+    limiter.take("bob")
+    limiter.take("carol")  # ✅ Over max_keys: least recently used (alice) evicted
+    assert len(limiter) == 2 and limiter.evicted == 1
+    clock.now += 10  # ✅ Idle long enough to be full again: dropped on the next call
+    limiter.take("dave")
+    assert len(limiter) == 1
+    assert TokenBucketLimiter(rate=0, burst=1).take("anyone") == 0  # ✅ rate 0 → unlimited
+
+
+def test_rapid_toggles_collapse_into_one_net_change(device_registry, log_store):
+    guard = ToggleGuard(debounce=60, user_rate=0, ip_rate=0)
+    start = device_registry.get(1)["status"]
+    flipped = "off" if start == "on" else "on"
+
+    results = [guard.toggle(1, username="student1") for _ in range(4)]
+    assert [coalesced for _, coalesced in results] == [False, True, True, True]
+    assert results[-1][0]["status"] == start and guard.pending() == {1: start}
+    guard.flush()  # ✅ Window ends: leading flip + one net flip back
+    assert device_registry.get(1)["status"] == start
+    assert [record["action"] for record in log_store.all()] == [flipped, start]
+
+    for _ in range(5):  # ✅ Leading flip, then four more that cancel out: no trailing change
+        guard.toggle(2, username="student1")
+    guard.flush()
+    assert len(log_store.all()) == 3 and guard.pending() == {}
+
+
+def test_toggle_route_rate_limits_and_coalesces(client, log_store):
+    set_toggle_guard(ToggleGuard(debounce=0, user_rate=1, user_burst=2, ip_rate=0))
+    assert [client.post("/devices/1/toggle", json={"username": "student1"}).status_code
+            for _ in range(2)] == [200, 200]
+    limited = client.post("/devices/1/toggle", json={"username": "Student1"})
+    assert limited.status_code == 429 and limited.headers["Retry-After"] == "1"
+    assert client.post("/devices/1/toggle", json={"username": "teacher1"}).status_code == 200  # ✅ Own bucket
+
+    guard = ToggleGuard(debounce=60, user_rate=0, ip_rate=1, ip_burst=3)
+    set_toggle_guard(guard)
+    assert client.post("/devices/2/toggle", json={"username": "a"}).status_code == 200
+    coalesced = client.post("/devices/2/toggle", json={"username": "b"})
+    assert coalesced.status_code == 202 and coalesced.json["coalesced"]
+    client.post("/devices/2/toggle", json={"username": "c"})
+    assert client.post("/devices/2/toggle", json={"username": "d"}).status_code == 429  # ✅ Same IP, any user
+    guard.flush()
+    assert len(log_store.all()) == 4  # ✅ 3 direct toggles + the leading flip ("b" & "c" cancelled out)
+
+
+class SlowFirstLock:
+    """ ✅ Lock whose first acquire stalls: widens the gap between publishing a window and locking it """
+
+    def __init__(self):
+        self._lock, self._stalled = threading.Lock(), False
+
+    def acquire(self):
+        if not self._stalled:
+            self._stalled = True
+            time.sleep(0.2)
+        return self._lock.acquire()
+
+    def release(self):
+        self._lock.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *_):
+        self.release()
+
+
+def test_concurrent_toggles_never_see_a_half_opened_window(device_registry, log_store, monkeypatch):
+    original_init = toggle_model._Window.__init__
+
+    def slow_init(window):
+        original_init(window)
+        window.lock = SlowFirstLock()
+
+    monkeypatch.setattr(toggle_model._Window, "__init__", slow_init)
+    guard = ToggleGuard(debounce=60, user_rate=0, ip_rate=0)
+    results, errors = [], []
+
+    def toggle(username):
+        try:
+            results.append(guard.toggle(3, username=username))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=toggle, args=(name,)) for name in ("a", "b")]
+    threads[0].start()
+    time.sleep(0.05)  # ✅ Leader has published its window and is stalled acquiring it
+    threads[1].start()
+    for thread in threads:
+        thread.join(5)
+    assert errors == []
+    assert sorted(coalesced for _, coalesced in results) == [False, True]
+    guard.flush()
+
+
+def test_trailing_state_rechecks_the_device(device_registry, log_store):
+    guard = ToggleGuard(debounce=60, user_rate=0, ip_rate=0)
+    device, _ = guard.toggle(1, username="student1")
+    guard.toggle(1, username="student1")  # ✅ Pending: back to the original state
+    original = "off" if device["status"] == "on" else "on"
+    device_registry.set_status(1, original)  # ✅ e.g. the scheduler got there first
+    guard.flush()
+    assert device_registry.get(1)["status"] == original
+    assert len(log_store.all()) == 1  # ✅ Only the leading flip: no redundant trailing entry
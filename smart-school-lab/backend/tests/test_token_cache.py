@@ -0,0 +1,72 @@
+import jwt
+import pytest
+
+import controllers.auth_controller as auth_controller
+from controllers.auth_controller import issue_tokens, set_token_cache
+from utils.token_cache import VerifiedTokenCache
+
+
+@pytest.fixture
+def token_cache():
+    cache = VerifiedTokenCache(max_entries=8)
+    previous = set_token_cache(cache)
+    yield cache
+    set_token_cache(previous)
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_entries_expire_with_the_token_and_lru_is_bounded():
+    cache = VerifiedTokenCache(max_entries=2)
+    cache.put("a", {"username": "a"}, expires_at=100)
+    cache.put("b", {"username": "b"}, expires_at=200)
+    assert cache.get("a", now=50) == {"username": "a"}  # ✅ "a" is now most recent
+    cache.put("c", {"username": "c"}, expires_at=300)
+    assert cache.get("b", now=50) is None and len(cache) == 2
+    assert cache.get("a", now=100) is None  # ✅ Evicted exactly at expiry
+    assert len(cache) == 1
+
+
+def test_role_permissions_are_enforced(client, token_cache):
+    student, _ = issue_tokens("student1", "student")
+    teacher, _ = issue_tokens("teacher1", "teacher")
+
+    assert client.get("/devices/", headers=bearer(student)).status_code == 200
+    assert client.post("/devices/1/toggle", json={}, headers=bearer(student)).status_code == 403
+    assert client.get("/logs/", headers=bearer(student)).status_code == 403
+    assert client.post("/devices/1/request-access", json={"username": "student1"},
+                       headers=bearer(student)).status_code == 200
+    assert client.post("/devices/1/toggle", json={}, headers=bearer(teacher)).status_code == 200
+    assert client.get("/logs/", headers=bearer(teacher)).status_code == 200
+
+
+def test_invalid_refresh_or_missing_tokens(client, token_cache):
+    _, refresh = issue_tokens("teacher1", "teacher")
+    assert client.get("/devices/", headers=bearer("fake_token")).status_code == 401
+    assert client.get("/devices/", headers=bearer(refresh)).status_code == 401  # ✅ Refresh ≠ access
+    assert client.get("/devices/").status_code == 200  # ✅ Anonymous allowed by default
+
+    client.application.config["AUTH_REQUIRED"] = True
+    try:
+        assert client.get("/devices/").status_code == 401
+    finally:
+        client.application.config["AUTH_REQUIRED"] = False
+
+
+def test_repeat_requests_skip_verification(client, token_cache, monkeypatch):
+    teacher, _ = issue_tokens("teacher1", "teacher")
+    assert client.get("/devices/", headers=bearer(teacher)).status_code == 200
+
+    def fail(*args, **kwargs):
+        raise AssertionError("token decoded again")
+    monkeypatch.setattr(auth_controller.jwt, "decode", fail)
+    assert client.get("/logs/", headers=bearer(teacher)).status_code == 200
+    assert token_cache.hits == 1 and token_cache.misses == 1
+
+
+def test_user_login_issues_role_tokens(client):
+    client.post("/users/signup", json={"username": "t", "email": "t@lab", "password": "pw", "role": "Teacher"})
+    token = client.post("/users/login", json={"email": "t@lab", "password": "pw"}).json["access_token"]
+    assert jwt.decode(token, auth_controller.SECRET_KEY, algorithms=["HS256"])["role"] == "teacher"
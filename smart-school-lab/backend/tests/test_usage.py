@@ -0,0 +1,49 @@
+from models.log_model import LogRecord
+from models.usage_model import UsageTracker, local_seconds
+
+
+def log(action, device, username, timestamp):
+    return {"action": action, "device": device, "username": username, "timestamp": timestamp}
+
+
+HISTORY = [
+    log("on", "Projector", "teacher1", "2025-05-26 08:00:00"),
+    log("on", "Fan", "student1", "2025-05-26 09:00:00"),
+    log("off", "Projector", "teacher1", "2025-05-26 10:30:00"),
+    log("schedule_set", "Fan", "teacher1", "2025-05-26 11:00:00"),
+    log("off", "Fan", "student1", "2025-05-26 12:00:00"),
+    log("on", "Projector", "teacher2", "2025-05-26 23:00:00"),
+    log("off", "Projector", "teacher2", "2025-05-27 01:00:00"),
+    log("on", "Fan", "teacher2", "2025-05-27 08:00:00"),
+]
+NOW = local_seconds("2025-05-27 09:00:00")
+
+
+def test_rebuild_matches_incremental_observe():
+    """ ✅ The vectorized rebuild and the O(1) per-record path agree """
+    rebuilt, from_records, incremental = UsageTracker(), UsageTracker(), UsageTracker()
+    rebuilt.rebuild(HISTORY)
+    from_records.rebuild([LogRecord.from_entry(entry, seq=seq) for seq, entry in enumerate(HISTORY)])  # ✅ Epochs
+    incremental.observe_many(HISTORY)
+
+    for tracker in (rebuilt, from_records, incremental):
+        assert tracker.total_hours("Projector", now=NOW) == 4.5
+        assert tracker.total_hours("Fan", now=NOW) == 4.0  # ✅ 3h closed + 1h still running
+        assert tracker.rollup("day", "device", now=NOW)["Projector"] == {"2025-05-26": 3.5, "2025-05-27": 1.0}
+        assert tracker.rollup("day", "user", now=NOW)["teacher2"] == {"2025-05-26": 1.0, "2025-05-27": 2.0}
+        assert tracker.rollup("week", "user", now=NOW)["student1"] == {"2025-W22": 3.0}
+
+
+def test_analytics_endpoint_reflects_toggles(client, log_store):
+    """ ✅ /devices/analytics totals & rollups come from the tracker, not static fields """
+    for entry in HISTORY:
+        log_store.append(entry)
+    client.post("/devices/2/toggle", json={"username": "teacher1"})  # ✅ observed incrementally
+
+    analytics = {row["name"]: row for row in client.get("/devices/analytics").json}
+    assert analytics["Projector"]["status"] == "on"
+    assert analytics["Projector"]["total_usage_hours"] >= 4.5
+
+    rollup = client.get("/devices/analytics?period=week&by=user&key=student1").json
+    assert rollup["usage_hours"] == {"student1": {"2025-W22": 3.0}}
+    assert client.get("/devices/analytics?period=month").status_code == 400
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from models.user_model import UserExists, UserRepository
+
+
+def test_ids_are_monotonic_and_indexes_unique(tmp_path):
+    users = UserRepository(path=tmp_path / "users.db", seed=False)
+    first = users.add("alice", "alice@lab", "hash", "teacher")
+    second = users.add("bob", "bob@lab", "hash", "student")
+    assert users.delete(second["id"])
+    third = users.add("carol", "carol@lab", "hash", "student")
+    assert third["id"] > second["id"] > first["id"]  # ✅ Deleted ids are never reused
+
+    with pytest.raises(UserExists) as error:
+        users.add("ALICE", "other@lab", "hash", "student")
+    assert error.value.field == "username"
+    with pytest.raises(UserExists):
+        users.add("dave", "Alice@Lab", "hash", "student")
+
+    assert users.get_by_email("ALICE@lab")["id"] == first["id"]
+    assert users.get_by_username("Carol")["email"] == "carol@lab"
+    assert users.get(second["id"]) is None
+    users.close()
+
+    reopened = UserRepository(path=tmp_path / "users.db", seed=False)  # ✅ Durable across restarts
+    assert [user["username"] for user in reopened.page()[0]] == ["alice", "carol"]
+    reopened.close()
+
+
+def test_legacy_lists_are_reconciled_once(tmp_path):
+    (tmp_path / "users.json").write_text(json.dumps([
+        {"id": 1, "username": "Mr. Albert A Allen", "role": "teacher", "permissions": ["control_devices"]},
+        {"id": 2, "username": "Student1", "role": "student", "permissions": ["view_logs"]},
+    ]))
+    users = UserRepository(path=tmp_path / "users.db")
+    assert len(users) == 2  # ✅ No demo accounts seeded alongside the file
+    assert users.get_by_username("student1")["password"] is None  # ✅ Reset required, whatever the file held
+    assert users.get_by_username("Mr. Albert A Allen")["password"] is None
+    users.close()
+
+    fresh = UserRepository(path=tmp_path / "empty" / "users.db")  # ✅ No users.json → nothing seeded
+    assert len(fresh) == 0
+    fresh.close()
+
+
+def test_known_demo_passwords_are_revoked_in_existing_databases(tmp_path):
+    users = UserRepository(path=tmp_path / "users.db", seed=False)
+    users.add("teacher1", None, generate_password_hash("pass123"), "teacher")
+    users.add("student1", None, generate_password_hash("changed"), "student")
+    with users._connection() as connection:
+        connection.execute("PRAGMA user_version = 0")  # ✅ As written before the demo logins were revoked
+    users.close()
+
+    reopened = UserRepository(path=tmp_path / "users.db")
+    assert reopened.get_by_username("teacher1")["password"] is None
+    assert reopened.get_by_username("student1")["password"]  # ✅ Already changed by its owner: kept
+    reopened.close()
+
+
+def test_signup_login_and_paging(client):
+    for n in range(5):
+        response = client.post("/users/signup", json={"username": f"user{n}", "email": f"user{n}@lab",
+                                                      "password": "pw", "role": "Student"})
+        assert response.status_code == 201
+    assert client.post("/users/signup", json={"username": "user0", "email": "new@lab",
+                                              "password": "pw", "role": "student"}).status_code == 400
+
+    login = client.post("/users/login", json={"email": "user3@lab", "password": "pw"})
+    assert login.status_code == 200 and login.json["user"]["permissions"] == ["view_devices"]
+    assert client.post("/users/login", json={"email": "user3@lab", "password": "no"}).status_code == 401
+
+    first = client.get("/users/users?limit=2")
+    assert [user["username"] for user in first.json] == ["user0", "user1"]
+    second = client.get(f"/users/users?limit=2&cursor={first.headers['X-Next-Cursor']}")
+    assert [user["username"] for user in second.json] == ["user2", "user3"]
+    last = client.get(f"/users/users?limit=2&cursor={second.headers['X-Next-Cursor']}")
+    assert len(last.json) == 1 and "X-Next-Cursor" not in last.headers
@@ -0,0 +1,65 @@
+### `utils/dedup.py`
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class DedupIndex:
+    """ ✅ Bounded "have I seen this key?" index with a sliding eviction window.
+
+    Keys are kept in insertion order together with the time they were seen, so
+    eviction only ever pops from the front: O(1) amortized per add and memory
+    bounded by ``max_keys`` no matter how long the server runs.
+    """
+
+    def __init__(self, window_seconds, max_keys):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._keys = OrderedDict()  # ✅ key → (seen_at, value)
+        self._newest = float("-inf")
+        self._lock = threading.Lock()
+
+    def add(self, key, value=None, at=None):
+        """ ✅ Atomically records ``key``; returns False if it was already present """
+        at = time.time() if at is None else at
+        with self._lock:
+            self._evict(at)
+            if key in self._keys:
+                return False
+            self._keys[key] = (at, value)
+            self._newest = max(self._newest, at)
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+            return True
+
+    def get(self, key, default=None):
+        """ ✅ Returns the value stored with ``key`` (or ``default`` if unseen/evicted) """
+        with self._lock:
+            item = self._keys.get(key)
+            return default if item is None else item[1]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._keys
+
+    def set(self, key, value):
+        """ ✅ Updates the value of an existing key without changing its age """
+        with self._lock:
+            if key in self._keys:
+                self._keys[key] = (self._keys[key][0], value)
+
+    def discard(self, key):
+        with self._lock:
+            self._keys.pop(key, None)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _evict(self, now):
+        cutoff = max(now, self._newest) - self.window_seconds
+        while self._keys:
+            seen_at = next(iter(self._keys.values()))[0]
+            if seen_at >= cutoff:
+                break
+            self._keys.popitem(last=False)
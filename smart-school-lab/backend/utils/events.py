@@ -0,0 +1,111 @@
+### `utils/events.py`
+
+import threading
+from collections import deque, namedtuple
+
+from utils.json_codec import dumps_json
+
+# ✅ One published event; ``frame`` is the pre-encoded SSE text shared by every client
+Event = namedtuple("Event", ["id", "type", "data", "frame"])
+
+DEFAULT_HISTORY = 1000  # ✅ Events kept for Last-Event-ID resume
+DEFAULT_CLIENT_BUFFER = 256  # ✅ Events a single slow client may fall behind before resyncing
+
+RESYNC = Event(None, "resync", None, 'event: resync\ndata: {}\n\n')
+
+
+def encode_sse(event_id, event_type, data):
+    return f"id: {event_id}\nevent: {event_type}\ndata: {dumps_json(data)}\n\n"
+
+
+class Subscription:
+    """ ✅ One client's bounded event buffer.
+
+    The publisher never blocks on a client: when the buffer is full it is
+    dropped and the client is told to ``resync`` (re-fetch full state) instead.
+    """
+
+    def __init__(self, max_buffer=DEFAULT_CLIENT_BUFFER):
+        self.max_buffer = max_buffer
+        self._events = deque()
+        self._cond = threading.Condition()
+        self._lagged = False
+        self.closed = False
+
+    def push(self, event):
+        with self._cond:
+            if len(self._events) >= self.max_buffer:
+                self._events.clear()
+                self._lagged = True
+            else:
+                self._events.append(event)
+            self._cond.notify()
+
+    def mark_lagged(self):
+        with self._cond:
+            self._events.clear()
+            self._lagged = True
+
+    def get(self, timeout=None):
+        """ ✅ Waits up to ``timeout`` and returns every buffered event (or [RESYNC]) """
+        with self._cond:
+            self._cond.wait_for(lambda: self._events or self._lagged or self.closed, timeout)
+            if self._lagged:
+                self._lagged = False
+                return [RESYNC]
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+
+class EventBroadcaster:
+    """ ✅ In-process fan-out of small delta events to many subscribers """
+
+    def __init__(self, history=DEFAULT_HISTORY, client_buffer=DEFAULT_CLIENT_BUFFER):
+        self.client_buffer = client_buffer
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, data):
+        """ ✅ Encodes the event once and hands it to every subscriber (O(subscribers), non-blocking) """
+        with self._lock:
+            event = Event(self._next_id, event_type, data, encode_sse(self._next_id, event_type, data))
+            self._next_id += 1
+            self._history.append(event)
+            for subscription in self._subscribers:  # ✅ Under the lock so every client sees id order
+                subscription.push(event)
+        return event
+
+    def subscribe(self, last_event_id=None):
+        """ ✅ Registers a client, replaying events after ``last_event_id`` when still in history """
+        subscription = Subscription(self.client_buffer)
+        with self._lock:
+            if last_event_id is not None:
+                oldest = self._history[0].id if self._history else self._next_id
+                if last_event_id < oldest - 1 or last_event_id >= self._next_id:
+                    subscription.mark_lagged()  # ✅ Gap we can't replay (or id from a previous process)
+                else:
+                    for event in self._history:
+                        if event.id > last_event_id:
+                            subscription.push(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+        subscription.close()
+
+    @property
+    def last_event_id(self):
+        return self._next_id - 1
+
+    def __len__(self):
+        return len(self._subscribers)
@@ -0,0 +1,15 @@
+### `utils/exit_hooks.py`
+
+import atexit
+
+
+def register_exit_hook(hook):
+    """ ✅ Registers ``hook`` to run at exit, once, ahead of every hook registered before this call.
+
+    atexit runs hooks newest first. Moving a singleton's flush to the end each
+    time a new instance is created keeps it ahead of whatever that instance
+    depends on (e.g. the removal of a throwaway data directory), while the
+    process still holds a single hook rather than one per instance ever built.
+    """
+    atexit.unregister(hook)
+    atexit.register(hook)
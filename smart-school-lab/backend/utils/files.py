@@ -0,0 +1,13 @@
+### `utils/files.py`
+
+import os
+
+
+def write_atomic(path, text):
+    """ ✅ Writes text to path via temp file → fsync → rename (never half-written) """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
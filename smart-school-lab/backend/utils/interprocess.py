@@ -0,0 +1,123 @@
+### `utils/interprocess.py`
+
+import fcntl
+import os
+import signal
+import socket
+import threading
+
+SHARED_POLL_SECONDS = 0.1  # ✅ How often idle workers look for other workers' changes
+
+
+def shared_state_enabled():
+    """ ✅ True when several worker processes share data/ (SHARED_STATE=1, set by the pre-fork launcher) """
+    return os.environ.get("SHARED_STATE", "0") == "1"
+
+
+class InterProcessLock:
+    """ ✅ Mutex held across threads *and* worker processes.
+
+    flock() locks belong to the open file, so threads of one process would
+    share it; a plain threading.Lock is taken first and the flock second.
+    Works as a context manager and exposes acquire()/release() like Lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = None
+
+    def acquire(self):
+        self._lock.acquire()
+        try:
+            if self._fd is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except BaseException:
+            self._lock.release()
+            raise
+        return True
+
+    def release(self):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class LeaderElection:
+    """ ✅ Picks one worker for singleton jobs (e.g. firing schedules).
+
+    The first process to flock the file leads until it exits; the kernel
+    drops the lock with the process, so a later ``is_leader()`` call in a
+    surviving worker takes over.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def is_leader(self):
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            self._fd = fd
+        return True
+
+
+# ---------------------------------------------
+# 🔹 Pre-fork launcher (python app.py with WORKERS > 1)
+# ---------------------------------------------
+def serve_prefork(app, host="127.0.0.1", port=5000, workers=2, on_worker_start=None):
+    """ ✅ Binds one listening socket and forks ``workers`` threaded WSGI servers that accept on it.
+
+    The app must not have opened any store yet: each worker opens its own
+    lazily after the fork (``on_worker_start(app)`` runs in each worker once
+    its server is listening, e.g. to pre-warm). Ctrl-C / SIGTERM stops every worker.
+    """
+    from werkzeug.serving import make_server
+
+    os.environ["SHARED_STATE"] = "1"
+    listener = socket.create_server((host, port), backlog=128)
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                server = make_server(host, port, app, threaded=True, fd=listener.fileno())
+                if on_worker_start is not None:
+                    on_worker_start(app)
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children.append(pid)
+    listener.close()
+    print(f"✅ Serving on http://{host}:{port} with {workers} workers (pids {', '.join(map(str, children))})")
+
+    def stop(*_):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        stop()
+        for pid in children:
+            os.waitpid(pid, 0)
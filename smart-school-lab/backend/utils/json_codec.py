@@ -0,0 +1,130 @@
+### `utils/json_codec.py`
+
+import json
+import os
+import threading
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # ✅ Optional: several times faster encoding (pip install orjson)
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    """ ✅ Objects with ``to_dict()`` (e.g. LogRecord) encode as that dict; the rest as Flask would """
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    return DefaultJSONProvider.default(value)
+
+
+def _records_json(obj):
+    """ ✅ Stdlib fast path for log records (anything with ``to_json()``) and lists of them; None otherwise """
+    if hasattr(obj, "to_json"):
+        return obj.to_json().encode("utf-8")
+    if type(obj) is list and obj and hasattr(obj[0], "to_json"):
+        kind = type(obj[0])
+        if all(type(item) is kind for item in obj):
+            return ("[" + ",".join([item.to_json() for item in obj]) + "]").encode("utf-8")
+    return None
+
+
+class StdlibJSONEncoder:
+    """ ✅ Compact stdlib ``json`` encoding (always available) """
+
+    name = "json"
+
+    def dumps(self, obj):
+        encoded = _records_json(obj)
+        if encoded is not None:
+            return encoded
+        return json.dumps(obj, separators=(",", ":"), default=_default).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonEncoder:
+    """ ✅ orjson encoding (Rust, emits UTF-8 bytes directly) """
+
+    name = "orjson"
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)  # ✅ Records via to_dict()
+
+    def loads(self, data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)  # ✅ NaN / huge ints orjson rejects but stdlib json wrote
+
+
+ENCODERS = {"json": StdlibJSONEncoder, "orjson": OrjsonEncoder}
+
+
+def _default_encoder():
+    """ ✅ JSON_ENCODER=json|orjson picks one; default: orjson when installed """
+    name = os.environ.get("JSON_ENCODER") or ("orjson" if orjson is not None else "json")
+    if name == "orjson" and orjson is None:
+        print("⚠️ JSON_ENCODER=orjson but orjson is not installed, using json")
+        name = "json"
+    return ENCODERS[name]()
+
+
+# ---------------------------------------------
+# 🔹 Shared encoder instance (lazy, swappable for tests & benchmarks)
+# ---------------------------------------------
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_json_encoder():
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                _encoder = _default_encoder()
+    return _encoder
+
+
+def set_json_encoder(encoder):
+    """ ✅ Replaces the shared encoder (used by tests & benchmarks) """
+    global _encoder
+    with _encoder_lock:
+        previous, _encoder = _encoder, encoder
+    return previous
+
+
+def dumps_json(obj):
+    """ ✅ Compact JSON text through the current encoder """
+    return get_json_encoder().dumps(obj).decode("utf-8")
+
+
+def loads_json(data):
+    """ ✅ Parses JSON text / bytes through the current encoder (raises ValueError when invalid) """
+    return get_json_encoder().loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """ ✅ Flask JSON provider (``app.json``) that encodes through the pluggable encoder.
+
+    jsonify() and the pre-serialized ResponseCache bodies go through
+    ``dumps_bytes``; debug mode keeps Flask's pretty-printed output.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault("default", _default)
+            return super().dumps(obj, **kwargs)
+        return dumps_json(obj)
+
+    def dumps_bytes(self, obj):
+        return get_json_encoder().dumps(obj)
+
+    def response(self, *args, **kwargs):
+        if self._app.debug:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,208 @@
+### `utils/metrics.py`
+
+import sys
+import threading
+import time
+from collections import Counter
+
+# ✅ Latency histogram bounds (seconds), Prometheus-style cumulative buckets
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class MetricsRegistry:
+    """ ✅ Counters & histograms with lock-free hot paths.
+
+    Every thread writes only to its own shard (a plain dict reached through
+    threading.local), so ``inc``/``observe`` never take a lock or contend.
+    A scrape sums the shards. Shards of finished threads (werkzeug spawns one
+    per request) are folded into a retired total whenever a new thread joins,
+    so the shard list stays as long as the live thread count, scraped or not.
+    Gauges are callbacks evaluated at scrape time.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._local = threading.local()
+        self._shards = []  # ✅ (thread, shard) pairs; the lock guards only this list
+        self._retired = {}
+        self._lock = threading.Lock()
+        self._help = {}  # ✅ metric name → (type, help text)
+        self._gauges = []  # ✅ (name, fn() → {labels tuple: value} or number)
+
+    # ---------------------------------------------
+    # 🔹 Hot path (no locks)
+    # ---------------------------------------------
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:  # ✅ Once per thread
+                self._retire_dead_locked()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_locked(self):
+        """ ✅ Folds shards of finished threads into the retired total (caller holds self._lock) """
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._merge(self._retired, shard)  # ✅ Dead threads never write again
+        self._shards = alive
+
+    def inc(self, name, labels=(), value=1):
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name, seconds, labels=()):
+        shard = self._shard()
+        key = (name, labels)
+        histogram = shard.get(key)
+        if histogram is None:
+            histogram = shard[key] = [0] * (len(self.buckets) + 2)  # ✅ buckets…, count, sum
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                histogram[i] += 1
+                break
+        histogram[-2] += 1
+        histogram[-1] += seconds
+
+    # ---------------------------------------------
+    # 🔹 Declarations & scraping
+    # ---------------------------------------------
+    def describe(self, name, metric_type, help_text):
+        self._help[name] = (metric_type, help_text)
+
+    def gauge(self, name, fn, help_text=""):
+        self.describe(name, "gauge", help_text)
+        self._gauges = [(existing, f) for existing, f in self._gauges if existing != name] + [(name, fn)]  # ✅ Re-registering replaces
+
+    @staticmethod
+    def _merge(total, shard):
+        for key, value in list(shard.items()):
+            if isinstance(value, list):
+                merged = total.get(key)
+                total[key] = list(value) if merged is None else [a + b for a, b in zip(merged, value)]
+            else:
+                total[key] = total.get(key, 0) + value
+
+    def snapshot(self):
+        """ ✅ {(name, labels): number or histogram list} summed over every thread """
+        with self._lock:
+            self._retire_dead_locked()
+            total = {}
+            self._merge(total, self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            self._merge(total, dict(shard))
+        return total
+
+    def value(self, name, labels=()):
+        return self.snapshot().get((name, labels), 0)
+
+    def render(self):
+        """ ✅ Prometheus text exposition format """
+        by_name = {}
+        for (name, labels), value in self.snapshot().items():
+            by_name.setdefault(name, []).append((labels, value))
+        for name, fn in self._gauges:
+            try:
+                value = fn()
+            except Exception as e:
+                print(f"❌ Metrics gauge {name} failed: {str(e)}")
+                continue
+            items = value.items() if isinstance(value, dict) else [((), value)]
+            by_name.setdefault(name, []).extend(items)
+
+        lines = []
+        for name in sorted(by_name):
+            metric_type, help_text = self._help.get(name, ("untyped", ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+                if isinstance(value, list):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, value):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {value[-2]}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value[-2]}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {value[-1]:.6f}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class SlowRequestSampler:
+    """ ✅ Opt-in sampling profiler for slow requests.
+
+    Request threads only register/unregister themselves (two dict writes). A
+    background thread wakes every ``interval`` seconds and, for each request
+    running longer than ``threshold`` seconds, samples its current stack via
+    sys._current_frames(). Samples are aggregated as folded stacks
+    ("route;file:function;...") ready for flamegraph tools.
+    """
+
+    def __init__(self, threshold=0.25, interval=0.01, max_stacks=500):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.samples = Counter()
+        self._in_flight = {}  # ✅ thread id → (started, label)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="slow-request-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def begin(self, label):
+        self._in_flight[threading.get_ident()] = (time.perf_counter(), label)
+
+    def end(self):
+        self._in_flight.pop(threading.get_ident(), None)
+
+    def sample(self, now=None):
+        """ ✅ Takes one stack sample of every request over the threshold """
+        now = time.perf_counter() if now is None else now
+        frames = sys._current_frames()
+        for thread_id, (started, label) in list(self._in_flight.items()):
+            frame = frames.get(thread_id)
+            if frame is None or now - started < self.threshold:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_code.co_filename.rsplit('/', 1)[-1]}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            key = ";".join([label] + stack[::-1])
+            if key in self.samples or len(self.samples) < self.max_stacks:
+                self.samples[key] += 1
+
+    def top(self, limit=50):
+        return [{"stack": stack, "samples": count} for stack, count in self.samples.most_common(limit)]
+
+    def _loop(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+
+# ✅ Process-wide registry shared by the app & models
+METRICS = MetricsRegistry()
@@ -0,0 +1,133 @@
+### `utils/password_pool.py`
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from utils.exit_hooks import register_exit_hook
+
+# ✅ Hash cost & pool sizing (environment overrides; existing hashes keep the cost they were made with)
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 64))
+PASSWORD_HASH_TIMEOUT_SECONDS = 30
+
+
+class PoolSaturated(Exception):
+    """ ✅ Raised instead of queueing when the hashing backlog is full """
+
+    def __init__(self, retry_after):
+        super().__init__(f"Password hashing pool saturated; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PasswordHashPool:
+    """ ✅ Runs password hashing off the request threads on a bounded process pool.
+
+    Hashing is CPU-bound and holds the GIL, so inline it stalls every other
+    request. Here workers are separate processes, and at most ``max_pending``
+    jobs may be queued or running: beyond that callers get PoolSaturated (→ 503
+    with Retry-After) instead of an ever-growing queue. ``workers=0`` hashes
+    inline on the calling thread (no backpressure).
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING,
+                 method=PASSWORD_HASH_METHOD, executor_factory=None, timeout=PASSWORD_HASH_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.method = method
+        self._executor_factory = executor_factory or (lambda count: ProcessPoolExecutor(
+            count, mp_context=multiprocessing.get_context("spawn")))  # ✅ Never fork a threaded server
+        self._executor = None
+        self._pending = 0
+        self._avg_seconds = 0.05  # ✅ Moving average of one job, for Retry-After estimates
+        self._lock = threading.Lock()
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PoolSaturated(self.retry_after())
+            if self._executor is None:
+                self._executor = self._executor_factory(self.workers)
+            self._pending += 1
+        started = time.perf_counter()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._finished(started)
+            raise
+        future.add_done_callback(lambda _: self._finished(started))
+        return future
+
+    def _finished(self, started):
+        with self._lock:
+            self._pending -= 1
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.perf_counter() - started)
+
+    def retry_after(self):
+        """ ✅ Whole seconds until the current backlog should have drained """
+        return max(1, math.ceil(self._pending / max(self.workers, 1) * self._avg_seconds))
+
+    def run(self, fn, *args):
+        """ ✅ Runs ``fn(*args)`` on the pool and waits for it (raises PoolSaturated when full or too slow) """
+        if self.workers <= 0:
+            return fn(*args)
+        future = self._submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise PoolSaturated(self.retry_after()) from None  # ✅ Same 503 + Retry-After as a full pool
+
+    def hash_password(self, password):
+        return self.run(generate_password_hash, password, self.method)
+
+    def check_password(self, password_hash, password):
+        return self.run(check_password_hash, password_hash, password)
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------
+# 🔹 Shared pool (lazy, swappable for tests & benchmarks)
+# ---------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_password_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordHashPool()
+                register_exit_hook(_shutdown_pool_at_exit)
+    return _pool
+
+
+def set_password_pool(pool):
+    """ ✅ Replaces the shared PasswordHashPool (used by tests & benchmarks) """
+    global _pool
+    with _pool_lock:
+        previous, _pool = _pool, pool
+    return previous
+
+
+def _shutdown_pool_at_exit():
+    """ ✅ Stops the current pool's worker processes """
+    if _pool is not None:
+        _pool.shutdown()
@@ -0,0 +1,65 @@
+### `utils/rate_limit.py`
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """ ✅ Per-key token buckets (``rate`` tokens/second, up to ``burst``) in bounded memory.
+
+    Buckets are kept least recently used first. A bucket idle long enough to
+    have refilled completely is indistinguishable from a fresh one, so those
+    are dropped from the front as they are passed; beyond ``max_keys`` the
+    least recently used bucket is evicted as well. ``rate <= 0`` disables
+    limiting (every call is allowed).
+    """
+
+    def __init__(self, rate, burst, max_keys=10_000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()  # ✅ key → [tokens, updated_at], least recently used first
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def take(self, key, cost=1):
+        """ ✅ Spends ``cost`` tokens from ``key``'s bucket: 0 if allowed, else seconds until it would be """
+        if self.rate <= 0:
+            return 0
+        now = self._clock()
+        with self._lock:
+            self._evict_idle(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+                    self.evicted += 1
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0
+            return (cost - bucket[0]) / self.rate
+
+    def _evict_idle(self, now):
+        full_after = self.burst / self.rate  # ✅ Seconds for an empty bucket to refill
+        while self._buckets:
+            _, updated_at = next(iter(self._buckets.values()))
+            if now - updated_at < full_after:
+                break
+            self._buckets.popitem(last=False)
+            self.evicted += 1
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+def retry_after_header(seconds):
+    """ ✅ Retry-After value: whole seconds, at least 1 """
+    return str(max(1, math.ceil(seconds)))
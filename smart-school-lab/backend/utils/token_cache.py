@@ -0,0 +1,55 @@
+### `utils/token_cache.py`
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class VerifiedTokenCache:
+    """ ✅ Bounded LRU of already-verified tokens → decoded claims.
+
+    Each entry expires together with its token's ``exp`` claim, so a cached
+    token is never honoured past the moment ``jwt.decode`` would reject it.
+    ``max_entries=0`` disables caching (every lookup is a miss).
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._tokens = OrderedDict()  # ✅ token → (expires_at, claims), least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token, now=None):
+        """ ✅ Returns the cached claims or None (expired entries are evicted on sight) """
+        now = time.time() if now is None else now
+        with self._lock:
+            item = self._tokens.get(token)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._tokens[token]
+                self.misses += 1
+                return None
+            self._tokens.move_to_end(token)
+            self.hits += 1
+            return item[1]
+
+    def put(self, token, claims, expires_at):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._tokens[token] = (expires_at, claims)
+            self._tokens.move_to_end(token)
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+
+    def discard(self, token):
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self._tokens)
@@ -71,10 +71,7 @@ async function toggleDevice(deviceId) {
 
     if (!res.ok) throw new Error(`Error toggling Device ${deviceId}`);
 
-    alert(`✅ Device ${deviceId} is now ${newStatus.toUpperCase()}`);
-
-    loadTeacherDevices(); // ✅ Refresh devices
-    loadUsageHistory();  // ✅ Refresh usage history
+    alert(`✅ Device ${deviceId} is now ${newStatus.toUpperCase()}`); // ✅ UI updates arrive via the live stream
   } catch (error) {
     console.error(`❌ Error toggling Device ${deviceId}:`, error);
   }
@@ -103,9 +100,7 @@ async function saveSchedule(deviceId) {
 
     if (!res.ok) throw new Error(`Error saving schedule for Device ${deviceId}`);
 
-    alert(`✅ Schedule set for ${deviceId} successfully!`);
-    
-    loadUsageHistory(); // ✅ Update history after scheduling
+    alert(`✅ Schedule set for ${deviceId} successfully!`); // ✅ The schedule log row arrives via the live stream
   } catch (error) {
     console.error(`❌ Failed to save schedule for Device ${deviceId}:`, error);
   }
@@ -159,7 +154,11 @@ async function deleteLogs() {
   }
 
   try {
-    const response = await fetch(`${API_BASE_URL}/devices/delete-logs`, { method: "POST" });
+    const response = await fetch(`${API_BASE_URL}/devices/delete-logs`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ max_age_days: 1 })  // ✅ Cleanup runs in the background on the server
+    });
     const data = await response.json();
     
     alert(data.message); // ✅ Show confirmation message
@@ -176,4 +175,41 @@ async function deleteLogs() {
 document.addEventListener("DOMContentLoaded", () => {
   loadTeacherDevices();
   loadUsageHistory();
+
+  // ✅ Apply pushed deltas instead of re-fetching /devices and /logs after every action
+  connectDeviceStream(API_BASE_URL, {
+    onDevice: updateDeviceButton,
+    onLog: prependUsageLog,
+    onResync: () => {
+      loadTeacherDevices();
+      loadUsageHistory();
+    }
+  });
 });
+
+/**
+ * 🔹 Update one device's button label from a live "device" event
+ */
+function updateDeviceButton(device) {
+  const button = document.querySelector(`.device[data-id="${device.id}"] button`);
+  if (!button) {
+    loadTeacherDevices(); // ✅ New device: rebuild the list once
+    return;
+  }
+  button.textContent = device.status === "on" ? "Turn Off" : "Turn On";
+}
+
+/**
+ * 🔹 Add one row to the usage history from a live "log" event
+ */
+function prependUsageLog(log) {
+  const tbody = document.getElementById("usageLogTable");
+  if (!tbody) return;
+
+  tbody.insertAdjacentHTML("afterbegin", `<tr>
+    <td>${log.username || "System User"}</td>
+    <td>${log.device || "Unknown Device"}</td>
+    <td>${log.action?.toUpperCase() || "Unknown Action"}</td>
+    <td>${log.timestamp || "No Time Available"}</td>
+  </tr>`);
+}
@@ -0,0 +1,27 @@
+// ---------------------------------------------
+// 🔹 Live device updates (Server-Sent Events from /devices/stream)
+// ---------------------------------------------
+
+/**
+ * 🔹 Subscribe to device status & log deltas pushed by the backend
+ * handlers: { onSnapshot(devices), onDevice(device), onLog(log), onAccess(request), onResync() }
+ * EventSource reconnects automatically and resumes via Last-Event-ID.
+ */
+function connectDeviceStream(baseUrl, handlers = {}) {
+  if (!window.EventSource) {
+    console.warn("⚠️ EventSource not supported, live updates disabled.");
+    return null;
+  }
+
+  const source = new EventSource(`${baseUrl}/devices/stream`);
+  const parse = (event) => JSON.parse(event.data || "{}");
+
+  source.addEventListener("snapshot", (event) => handlers.onSnapshot?.(parse(event).devices));
+  source.addEventListener("device", (event) => handlers.onDevice?.(parse(event)));
+  source.addEventListener("log", (event) => handlers.onLog?.(parse(event)));
+  source.addEventListener("access", (event) => handlers.onAccess?.(parse(event))); // ✅ Access request queued / decided / expired
+  source.addEventListener("resync", () => handlers.onResync?.()); // ✅ Fell behind: reload full state
+
+  source.onerror = () => console.warn("⚠️ Live device stream interrupted, reconnecting...");
+  return source;
+}
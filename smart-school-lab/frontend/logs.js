@@ -1,19 +1,26 @@
 // ✅ Define API Base URL
 const API_BASE_URL = "http://localhost:5000";
+const LOGS_PAGE_SIZE = 200; // ✅ Newest logs per page rendered in the table
 
 /**
  * 🔹 Fetch and display logs dynamically
  */
 async function loadLogs() {
   try {
-    // ✅ Get the selected device filter value (with fallback)
+    // ✅ Get the selected device & date filter values (with fallback)
     const filterDevice = document.getElementById("filterDevice")?.value || "All";
+    const filterDate = document.getElementById("filterDate")?.value;
 
-    // ✅ Construct API URL with query parameters
-    let url = `${API_BASE_URL}/logs`;
+    // ✅ Construct API URL with query parameters (filtering & paging happen server-side)
+    const params = new URLSearchParams({ limit: LOGS_PAGE_SIZE, order: "desc" });
     if (filterDevice !== "All") {
-      url += `?device=${encodeURIComponent(filterDevice)}`; // ✅ Prevent query string issues
+      params.set("device", filterDevice);
     }
+    if (filterDate) {
+      params.set("since", `${filterDate} 00:00:00`);
+      params.set("until", `${filterDate} 23:59:59`);
+    }
+    const url = `${API_BASE_URL}/logs?${params.toString()}`;
 
     // ✅ Fetch logs from backend API
     const res = await fetch(url);
@@ -63,6 +70,8 @@ document.addEventListener("DOMContentLoaded", () => {
     console.error("Element 'filterDevice' not found!");
   }
 
+  document.getElementById("filterDate")?.addEventListener("change", loadLogs);
+
   // ✅ Load logs when the logs page is loaded
   if (window.location.pathname.includes("logs.html")) {
     loadLogs();
@@ -140,6 +140,10 @@ document.addEventListener("DOMContentLoaded", () => {
                     });
 
                     const data = await response.json();
+                    if (response.status === 429) {
+                        alert(`⏳ ${data.error} (retry in ${response.headers.get("Retry-After") || 1}s)`);
+                        return;
+                    }
                     if (!response.ok) throw new Error(data.error || "Failed to toggle device.");
 
                     alert(`✅ ${data.message}`);
@@ -22,6 +22,7 @@ async function loadStudentDevices() {
     devices.forEach(device => {
       const deviceDiv = document.createElement("div");
       deviceDiv.className = "device";
+      deviceDiv.dataset.id = device.id;
 
       deviceDiv.innerHTML = `
         <span>${device.name}</span>
@@ -33,7 +34,6 @@ async function loadStudentDevices() {
     });
 
     console.log("Student view loaded successfully!");
-    attachRequestListeners(); // ✅ Attach event listeners correctly after elements exist
 
   } catch (error) {
     console.error("Failed to fetch student view:", error);
@@ -58,8 +58,7 @@ function attachRequestListeners() {
 
         if (!res.ok) throw new Error(`Failed to request access for Device ${deviceId}`);
 
-        alert(`Access request for ${deviceId} sent successfully!`);
-        loadStudentDevices(); // ✅ Refresh device list after request
+        alert(`Access request for ${deviceId} sent successfully!`); // ✅ Status changes arrive via the live stream
 
       } catch (error) {
         console.error(`Error requesting access for Device ${deviceId}:`, error);
@@ -68,7 +67,24 @@ function attachRequestListeners() {
   });
 }
 
+/**
+ * 🔹 Update one device's status badge from a live "device" event
+ */
+function updateStudentDevice(device) {
+  const status = document.querySelector(`.device[data-id="${device.id}"] .status`);
+  if (!status) {
+    loadStudentDevices(); // ✅ New device: rebuild the list once
+    return;
+  }
+  status.className = `status ${device.status}`;
+  status.textContent = device.status.toUpperCase();
+}
+
 /**
  * 🔹 Initialize student dashboard when the page loads
  */
-document.addEventListener("DOMContentLoaded", loadStudentDevices);
+document.addEventListener("DOMContentLoaded", () => {
+  loadStudentDevices();
+  attachRequestListeners(); // ✅ Delegated listener, attach once
+  connectDeviceStream(API_BASE_URL, { onDevice: updateStudentDevice, onResync: loadStudentDevices });
+});
@@ -1,5 +1,6 @@
 // ✅ Define API Base URL
 const API_BASE_URL = "http://localhost:5000";
+const ACTIVITY_LOG_LIMIT = 50; // ✅ Rows shown in the activity table
 
 /**
  * 🔹 Ensure `#deviceList` exists before running functions
@@ -28,14 +29,122 @@ document.addEventListener("DOMContentLoaded", () => {
   loadActivityLogs();
   loadDeviceAnalytics();
   loadTeacherDevices();
+  loadPendingRequests();
+
+  document.getElementById("approveSelected")?.addEventListener("click", () => decideSelectedRequests("approve"));
+  document.getElementById("denySelected")?.addEventListener("click", () => decideSelectedRequests("deny"));
+
+  // ✅ Apply pushed deltas instead of re-fetching /devices and /logs after every action
+  connectDeviceStream(API_BASE_URL, {
+    onDevice: updateTeacherDevice,
+    onLog: prependActivityLog,
+    onAccess: updatePendingRequest,
+    onResync: () => {
+      loadActivityLogs();
+      loadTeacherDevices();
+      loadPendingRequests();
+    }
+  });
 });
 
+/**
+ * 🔹 Fetch only the pending access requests (already in serving order: teachers first, then FIFO)
+ */
+async function loadPendingRequests() {
+  try {
+    const res = await fetch(`${API_BASE_URL}/devices/access-requests`);
+    if (!res.ok) throw new Error(`Failed to fetch access requests: ${res.statusText}`);
+
+    const requests = await res.json();
+    const list = document.getElementById("notificationList");
+    if (!list) return;
+
+    list.innerHTML = ""; // ✅ Clear previous entries
+    requests.forEach(request => list.insertAdjacentHTML("beforeend", pendingRequestItem(request)));
+  } catch (error) {
+    console.error("Error loading access requests:", error);
+  }
+}
+
+function pendingRequestItem(request) {
+  return `<li data-request-id="${request.id}">
+    <label>
+      <input type="checkbox" class="request-select" value="${request.id}">
+      ${request.username} (${request.role}) requests ${request.device} — ${request.created}
+    </label>
+  </li>`;
+}
+
+/**
+ * 🔹 Apply one live "access" event: add new pending requests, drop decided / expired ones
+ */
+function updatePendingRequest(request) {
+  const list = document.getElementById("notificationList");
+  if (!list) return;
+
+  const existing = list.querySelector(`li[data-request-id="${request.id}"]`);
+  if (request.status !== "pending") {
+    existing?.remove();
+  } else if (!existing) {
+    loadPendingRequests(); // ✅ Re-fetch the (small) pending set so priority order stays right
+  }
+}
+
+/**
+ * 🔹 Approve / deny every checked request in one call
+ */
+async function decideSelectedRequests(decision) {
+  const ids = [...document.querySelectorAll("#notificationList .request-select:checked")].map(box => Number(box.value));
+  if (!ids.length) return;
+
+  try {
+    const res = await fetch(`${API_BASE_URL}/devices/access-requests/${decision}`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ ids, username: sessionStorage.getItem("username") || "Teacher" })
+    });
+    if (!res.ok) throw new Error(`Error deciding access requests: ${res.statusText}`);
+
+    const { results } = await res.json();
+    results.forEach(result => document.querySelector(`#notificationList li[data-request-id="${result.id}"]`)?.remove());
+  } catch (error) {
+    console.error("Error deciding access requests:", error);
+  }
+}
+
+/**
+ * 🔹 Update one device checkbox from a live "device" event
+ */
+function updateTeacherDevice(device) {
+  const checkbox = document.querySelector(`.device[data-id="${device.id}"] input[type="checkbox"]`);
+  if (!checkbox) {
+    loadTeacherDevices(); // ✅ New device: rebuild the list once
+    return;
+  }
+  checkbox.checked = device.status === "on";
+}
+
+/**
+ * 🔹 Add one row to the activity log from a live "log" event
+ */
+function prependActivityLog(log) {
+  const logTable = document.getElementById("logTableBody");
+  if (!logTable) return;
+
+  logTable.insertAdjacentHTML("afterbegin", `<tr>
+    <td>${log.username || "Unknown"}</td>
+    <td>${log.device || "Unknown Device"}</td>
+    <td>${log.action?.toUpperCase() || "Unknown Action"}</td>
+    <td>${log.timestamp || "No Time Available"}</td>
+  </tr>`);
+}
+
 /**
  * 🔹 Fetch and display activity logs dynamically
  */
 async function loadActivityLogs() {
   try {
-    const res = await fetch(`${API_BASE_URL}/logs`);
+    const res = await fetch(`${API_BASE_URL}/logs?limit=${ACTIVITY_LOG_LIMIT}&order=desc`); // ✅ Newest page only; later rows arrive live
     if (!res.ok) throw new Error(`Failed to fetch logs: ${res.statusText}`);
 
     const logs = await res.json();
@@ -88,10 +197,14 @@ window.toggleDevice = async function(deviceId) {
       body: JSON.stringify({ action: isOn ? "on" : "off" })
     });
 
+    if (res.status === 429) {
+      deviceElem.checked = !isOn; // ✅ Rate limited: nothing changed, put the switch back
+      alert(`Too many toggles, try again in ${res.headers.get("Retry-After") || 1}s`);
+      return;
+    }
     if (!res.ok) throw new Error(`Error toggling Device ${deviceId}`);
 
-    alert(`Device ${deviceId} is now ${isOn ? "ON" : "OFF"}`);
-    loadTeacherDevices(); // ✅ Refresh UI after toggling
+    alert(`Device ${deviceId} is now ${isOn ? "ON" : "OFF"}`); // ✅ UI updates arrive via the live stream
   } catch (error) {
     console.error(`❌ Error toggling Device ${deviceId}:`, error);
   }